@@ -0,0 +1,89 @@
+"""Streaming exporters vs. building the whole document first, on a large synthetic tree
+
+    python benchmarks/bench_export.py --techs 100000
+
+Times each export and measures its peak Python allocation (tracemalloc, in a
+second pass so tracing does not skew the timings). The "built" rows reproduce
+the old approach: a full report dict for JSON, string concatenation for HTML.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+from synthetic import make_synthetic_techs
+from tech_tree_core import (
+    CATEGORIES, export_techs_csv, export_techs_json, write_html_report, _html_report_chunks
+)
+
+
+def built_json(techs: dict, units: dict, path: str):
+    report = {'stats': {'total_techs': len(techs)}, 'techs': {}}
+    for tid, tech in techs.items():
+        report['techs'][tid] = {
+            'name': tech.short_title,
+            'category': CATEGORIES.get(tech.category, {'name': '?'})['name'],
+            'level': tech.tech_level, 'cost': tech.cost, 'time': tech.time_to_research,
+            'prereqs': [p for p in [tech.prereq_1, tech.prereq_2] if p],
+            'effects': [{'id': eid, 'value': val} for eid, val in tech.effects],
+            'units': [{'id': u.id, 'name': u.name} for u in tech.unlocks_units],
+        }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+def built_html(techs: dict, units: dict, path: str):
+    html = ""
+    for chunk in _html_report_chunks(techs, units):
+        html += chunk
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+def measure(fn: Callable, path: str) -> tuple:
+    start = time.perf_counter()
+    fn(path)
+    elapsed = (time.perf_counter() - start) * 1000
+    size = os.path.getsize(path)
+
+    tracemalloc.start()
+    fn(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--techs", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    techs = make_synthetic_techs(args.techs, seed=args.seed)
+    print(f"{len(techs)} synthetic techs in {time.perf_counter() - start:.1f}s")
+
+    cases = [
+        ("csv", "tech_list.csv", lambda p: export_techs_csv(techs, p)),
+        ("csv.gz", "tech_list.csv.gz", lambda p: export_techs_csv(techs, p)),
+        ("json built", "built.json", lambda p: built_json(techs, {}, p)),
+        ("json stream", "tech_report.json", lambda p: export_techs_json(techs, {}, p)),
+        ("json.gz stream", "tech_report.json.gz", lambda p: export_techs_json(techs, {}, p)),
+        ("html built", "built.html", lambda p: built_html(techs, {}, p)),
+        ("html stream", "tech_report.html", lambda p: write_html_report(techs, {}, p)),
+        ("html.gz stream", "tech_report.html.gz", lambda p: write_html_report(techs, {}, p)),
+    ]
+
+    print(f"{'export':<16} {'time':>10} {'peak alloc':>12} {'file size':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, name, fn in cases:
+            elapsed, peak, size = measure(fn, os.path.join(tmp, name))
+            print(f"{label:<16} {elapsed:>8.0f}ms {peak / 2**20:>10.1f}MB {size / 2**20:>10.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Headless check: tech_tree_core imports and runs with PyQt5 unavailable
+
+    python benchmarks/bench_import.py --runs 7 --budget-ms 50
+
+Each run is a fresh interpreter with a finder that refuses PyQt5, so the
+core cannot pick it up even where it is installed. Exits 1 if Qt leaks in,
+the analysis smoke test fails, or the median import time is over budget.
+"""
+
+import argparse
+import json
+import py_compile
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = r"""
+import sys, time, json
+
+class _NoQt:
+    def find_spec(self, name, path=None, target=None):
+        if name == "PyQt5" or name.startswith("PyQt5."):
+            raise ImportError("PyQt5 is blocked for the headless check")
+        return None
+
+sys.meta_path.insert(0, _NoQt())
+sys.path[:0] = [ROOT, ROOT + "/benchmarks"]
+
+start = time.perf_counter()
+import tech_tree_core as core
+import_ms = (time.perf_counter() - start) * 1000
+
+from synthetic import make_synthetic_techs
+techs = make_synthetic_techs(500, seed=1)
+leaf = max(techs, key=lambda tid: techs[tid].tech_level)
+chain = core.get_full_prereq_chain(leaf, techs)
+reach = core.ReachabilityIndex(techs)
+assert chain == set(reach.ancestors(leaf)), "prereq chain disagrees with reachability index"
+report = core.validate_tech_tree(techs, {})
+core.find_orphan_techs(techs)
+core.analyze_balance(techs)
+
+qt = sorted(m for m in sys.modules if m.split(".")[0] == "PyQt5")
+print(json.dumps({"import_ms": import_ms, "qt_modules": qt, "issues": report.issue_count()}))
+"""
+
+
+def run_once() -> dict:
+    code = CHILD.replace("ROOT", repr(str(ROOT)), 2)
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "child failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    
+    # Time the import, not the compile: the children cannot write bytecode under PYTHONDONTWRITEBYTECODE
+    for module in (ROOT / "tech_tree_core.py", ROOT / "benchmarks" / "synthetic.py"):
+        py_compile.compile(str(module))
+    try:
+        run_once()  # warm the OS file cache
+        results = [run_once() for _ in range(max(1, args.runs))]
+    except RuntimeError as e:
+        print(f"❌ headless run failed: {e}")
+        return 1
+    
+    times = [r["import_ms"] for r in results]
+    median = statistics.median(times)
+    leaked = sorted({m for r in results for m in r["qt_modules"]})
+    print(f"import tech_tree_core: median {median:.1f}ms, min {min(times):.1f}ms, max {max(times):.1f}ms "
+          f"over {len(times)} runs (budget {args.budget_ms:.0f}ms)")
+    
+    if leaked:
+        print(f"❌ Qt modules loaded: {', '.join(leaked)}")
+        return 1
+    if median > args.budget_ms:
+        print("❌ over budget")
+        return 1
+    print("✅ headless core OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
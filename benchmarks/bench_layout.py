@@ -0,0 +1,59 @@
+"""Microbenchmark of SugiyamaLayoutEngine.compute() stages and of the force layout
+
+    python benchmarks/bench_layout.py --techs 2000 5000 --force-techs 20000
+"""
+
+import argparse
+from typing import Dict
+
+from synthetic import make_synthetic_techs
+from tech_tree_core import SugiyamaLayoutEngine, ForceLayoutEngine, PerfRecorder
+
+
+def time_stages(techs: dict) -> Dict[str, float]:
+    """Run compute() with a PerfRecorder attached and return stage times (ms)"""
+    engine = SugiyamaLayoutEngine(use_tech_level_as_layer=True)
+    engine.profiler = PerfRecorder()
+    
+    with engine.profiler.stage('compute_total'):
+        engine.compute(techs)
+    
+    return {path.rpartition("/")[2].replace("sugiyama.", ""): ms for path, ms in engine.profiler.stages}
+
+
+def time_force(techs: dict) -> Dict[str, float]:
+    """ForceLayoutEngine.compute() stages (ms): the Sugiyama seed, the iterations and the final result"""
+    engine = ForceLayoutEngine()
+    engine.profiler = PerfRecorder()
+    
+    with engine.profiler.stage('compute_total'):
+        engine.compute(techs)
+    
+    return {path.rpartition("/")[2].replace("force.", ""): ms for path, ms in engine.profiler.stages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--techs", type=int, nargs="+", default=[1000, 2000, 4000])
+    parser.add_argument("--force-techs", type=int, nargs="*", default=[20000],
+                        help="Tree sizes for the force layout (none to skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    stages = ['layers', 'ordering', 'crossings', 'coordinates', 'clusters', 'finalize', 'compute_total']
+    print(f"{'techs':>7} " + " ".join(f"{s:>15}" for s in stages))
+    for count in args.techs:
+        timings = time_stages(make_synthetic_techs(count, seed=args.seed))
+        print(f"{count:>7} " + " ".join(f"{timings[s]:>13.1f}ms" for s in stages))
+    
+    if args.force_techs:
+        stages = ['seed', 'iterations', 'finalize', 'compute_total']
+        print(f"\nforce   {'iterations':>10} " + " ".join(f"{s:>15}" for s in stages))
+        for count in args.force_techs:
+            timings = time_force(make_synthetic_techs(count, seed=args.seed))
+            print(f"{count:>7} {ForceLayoutEngine().iterations_for(count):>10} "
+                  + " ".join(f"{timings[s]:>13.1f}ms" for s in stages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Performance regression gate over run_benchmarks.py results
+
+    python benchmarks/run_benchmarks.py --out results.json
+    python benchmarks/compare.py store results.json       # keep as benchmarks/results/<commit>.json
+    python benchmarks/compare.py check results.json --tolerance 0.15
+
+A case regresses when its median run is slower than the baseline median by
+more than the tolerance, more than three standard errors of the difference
+of medians (estimated from each side's median absolute deviation, so one
+stray run does not move it) and more than --min-ms. Only parse,
+layout and rebuild cases fail the check (exit 1); the others are reported.
+Stage timings are listed for load_tech_tree, the Sugiyama layout and rebuild().
+Everything is local files: no service, no network.
+"""
+
+import argparse
+import json
+import math
+import shutil
+import statistics
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+GATED = ("load_tech_tree", "load_units", "layout_", "rebuild_")
+STAGED = ("load_tech_tree", "layout_sugiyama", "rebuild_grid", "rebuild_sugiyama")
+NOISE_FACTOR = 3.0
+MAD_TO_SIGMA = 1.4826  # MAD of normal samples -> standard deviation
+MEDIAN_SE = 1.2533     # Standard error of a median is ~1.25 sigma / sqrt(n)
+
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_ERROR = 2
+
+
+def load_results(path: Path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if 'results' not in data:
+        raise ValueError(f"{path} is not a run_benchmarks.py result")
+    return data
+
+
+def find_baseline(current: dict, spec: Optional[str], results_dir: Path) -> Optional[Path]:
+    """--baseline as a file or a stored commit prefix; by default the newest stored run of another commit"""
+    if spec:
+        path = Path(spec)
+        if path.is_file():
+            return path
+        matches = sorted(results_dir.glob(f"{spec}*.json"))
+        return matches[0] if len(matches) == 1 else None
+    
+    commit = current['meta'].get('commit')
+    stored = []
+    for path in results_dir.glob("*.json"):
+        meta = load_results(path)['meta']
+        if meta.get('commit') != commit:
+            stored.append((meta.get('timestamp', ''), path))
+    return max(stored)[1] if stored else None
+
+
+def median_error(runs: List[float]) -> float:
+    """Standard error of the median of runs, with sigma estimated robustly from the MAD"""
+    if len(runs) < 2:
+        return 0.0
+    median = statistics.median(runs)
+    sigma = MAD_TO_SIGMA * statistics.median(abs(r - median) for r in runs)
+    return MEDIAN_SE * sigma / math.sqrt(len(runs))
+
+
+def compare_runs(base: List[float], current: List[float], tolerance: float,
+                 min_ms: float) -> Tuple[float, float, float, str]:
+    """(baseline median, current median, threshold, verdict) with verdict one of 'slower', 'faster', '~'"""
+    base_med, cur_med = statistics.median(base), statistics.median(current)
+    threshold = max(tolerance * base_med, NOISE_FACTOR * math.hypot(median_error(base), median_error(current)), min_ms)
+    delta = cur_med - base_med
+    verdict = 'slower' if delta > threshold else 'faster' if -delta > threshold else '~'
+    return base_med, cur_med, threshold, verdict
+
+
+def _pct(base: float, current: float) -> str:
+    return f"{(current - base) / base * 100:+6.1f}%" if base else "    n/a"
+
+
+def check(current: dict, baseline: dict, tolerance: float, min_ms: float, gated: Tuple[str, ...]) -> int:
+    base_cases: Dict[tuple, dict] = {(r['name'], r['techs']): r for r in baseline['results']}
+    regressions = []
+    
+    print(f"{'case':<22} {'techs':>6} {'baseline':>11} {'current':>11} {'change':>8} {'noise+tol':>10}")
+    for r in current['results']:
+        key = (r['name'], r['techs'])
+        if key not in base_cases:
+            print(f"{r['name']:<22} {r['techs']:>6} {'-':>11} {r['median_ms']:>9.1f}ms      new")
+            continue
+        base_med, cur_med, threshold, verdict = compare_runs(base_cases.pop(key)['runs_ms'], r['runs_ms'],
+                                                             tolerance, min_ms)
+        is_gated = r['name'].startswith(gated)
+        mark = {'slower': "❌ slower" if is_gated else "⚠ slower", 'faster': "✅ faster", '~': ""}[verdict]
+        print(f"{r['name']:<22} {r['techs']:>6} {base_med:>9.1f}ms {cur_med:>9.1f}ms {_pct(base_med, cur_med):>8} "
+              f"{threshold:>8.1f}ms  {mark}")
+        if verdict == 'slower' and is_gated:
+            regressions.append(f"{r['name']}@{r['techs']}")
+    for name, techs in base_cases:
+        print(f"{name:<22} {techs:>6}  (not in current run)")
+    
+    print_stages(current, baseline)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond tolerance: {', '.join(regressions)}")
+        return EXIT_REGRESSION
+    print("\n✅ no gated regressions")
+    return EXIT_OK
+
+
+def print_stages(current: dict, baseline: dict):
+    base_cases = {(r['name'], r['techs']): r for r in baseline['results']}
+    for r in current['results']:
+        base = base_cases.get((r['name'], r['techs']))
+        if r['name'] not in STAGED or not base or not r.get('stages'):
+            continue
+        print(f"\n{r['name']} @ {r['techs']} techs, stage medians")
+        for path, runs in r['stages'].items():
+            cur_med = statistics.median(runs)
+            base_runs = base.get('stages', {}).get(path)
+            if base_runs:
+                base_med = statistics.median(base_runs)
+                print(f"   {path:<40} {base_med:>9.1f}ms -> {cur_med:>9.1f}ms {_pct(base_med, cur_med):>8}")
+            else:
+                print(f"   {path:<40} {'-':>11} -> {cur_med:>9.1f}ms      new")
+
+
+def warn_mismatch(current: dict, baseline: dict):
+    """Timings from different machines or settings are not comparable; say so, but still compare"""
+    for key in ('platform', 'python', 'cpus', 'repeat', 'seed', 'units_per_tech', 'qt'):
+        a, b = baseline['meta'].get(key), current['meta'].get(key)
+        if a != b:
+            print(f"⚠ {key} differs: baseline {a!r}, current {b!r}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--results-dir", type=Path, default=RESULTS_DIR, help="Where stored runs live")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    store = sub.add_parser("store", help="Keep a result as <results-dir>/<commit>.json")
+    store.add_argument("results", type=Path)
+    
+    chk = sub.add_parser("check", help="Compare a result against a baseline; exit 1 on a gated regression")
+    chk.add_argument("results", type=Path)
+    chk.add_argument("--baseline", default=None, metavar="FILE|COMMIT",
+                     help="Default: the newest stored run from another commit")
+    chk.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown as a fraction (default 0.10)")
+    chk.add_argument("--min-ms", type=float, default=1.0, help="Ignore changes smaller than this")
+    chk.add_argument("--gate", nargs="+", default=list(GATED), metavar="PREFIX",
+                     help="Case name prefixes that fail the check")
+    args = parser.parse_args(argv)
+    
+    try:
+        current = load_results(args.results)
+        if args.command == 'store':
+            name = current['meta'].get('commit') or current['meta'].get('timestamp', 'unknown').replace(":", "")
+            args.results_dir.mkdir(parents=True, exist_ok=True)
+            target = args.results_dir / f"{name}.json"
+            shutil.copyfile(args.results, target)
+            print(f"Stored {args.results} as {target}")
+            return EXIT_OK
+        
+        baseline_path = find_baseline(current, args.baseline, args.results_dir)
+        if baseline_path is None:
+            print(f"No baseline found in {args.results_dir}; store one with: compare.py store RESULTS",
+                  file=sys.stderr)
+            return EXIT_ERROR
+        baseline = load_results(baseline_path)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_ERROR
+    
+    print(f"Baseline {baseline['meta'].get('commit') or baseline_path} vs current "
+          f"{current['meta'].get('commit') or args.results}  (tolerance {args.tolerance:.0%}, min {args.min_ms}ms)")
+    warn_mismatch(current, baseline)
+    return check(current, baseline, args.tolerance, args.min_ms, tuple(args.gate))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
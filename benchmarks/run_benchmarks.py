@@ -0,0 +1,173 @@
+"""Timing suite over the hot paths, on generated TTRX/UNIT files
+
+    python benchmarks/run_benchmarks.py --techs 2000 10000 --repeat 5 --out results.json
+
+Covers parsing, the cache round trip, depths, both layout engines, validation
+and the balance analyses; with PyQt5 installed also TechTreeView.rebuild()
+and each BalanceAnalyzerDialog analysis, on the offscreen platform. Every
+case runs once to warm up and then --repeat times; the JSON written to --out
+keeps every run so results can be compared across commits.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from synthetic import write_synthetic_files
+import tech_tree_core as core
+from tech_tree_core import (
+    GridLayoutEngine, SugiyamaLayoutEngine, PerfRecorder, UnitIndex, load_tech_tree, load_units, link_units_to_techs,
+    save_to_cache, load_from_cache, _calculate_depths, validate_tech_tree, analyze_balance
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+_qt_objects: list = []  # Application and widgets stay alive until exit; sip teardown mid-run calls back into them
+
+
+def time_case(fn: Callable, repeat: int,
+              recorder: Optional[PerfRecorder] = None) -> Tuple[List[float], Dict[str, List[float]]]:
+    """Run times in ms after one warm-up call, plus per-stage times when the case reports to a recorder"""
+    runs, stages = [], {}
+    with redirect_stdout(io.StringIO()):  # parser chatter
+        fn()
+        for _ in range(repeat):
+            if recorder:
+                recorder.reset()
+            start = time.perf_counter()
+            fn()
+            runs.append((time.perf_counter() - start) * 1000)
+            for path, ms in (recorder.stages if recorder else ()):
+                stages.setdefault(path, []).append(ms)
+    return runs, stages
+
+
+# Each case is fn or (fn, recorder); recorder stages are kept for load_tech_tree, Sugiyama and rebuild()
+
+def _sugiyama(techs: dict, recorder: PerfRecorder):
+    engine = SugiyamaLayoutEngine(use_tech_level_as_layer=True)
+    engine.profiler = recorder
+    engine.compute(techs)
+
+
+def core_cases(ttrx_path: str, unit_path: str) -> Dict[str, object]:
+    with redirect_stdout(io.StringIO()):
+        techs = load_tech_tree(ttrx_path)
+    units = load_units(unit_path)
+    link_units_to_techs(techs, units)
+    save_to_cache(ttrx_path, unit_path, techs, units)
+    parse_rec, layout_rec = PerfRecorder(), PerfRecorder()
+    
+    return {
+        'load_tech_tree': (lambda: load_tech_tree(ttrx_path, profiler=parse_rec), parse_rec),
+        'load_units': lambda: load_units(unit_path),
+        'cache_save': lambda: save_to_cache(ttrx_path, unit_path, techs, units),
+        'cache_load': lambda: load_from_cache(ttrx_path, unit_path),
+        'calculate_depths': lambda: _calculate_depths(techs),
+        'layout_grid': lambda: GridLayoutEngine().compute(techs),
+        'layout_sugiyama': (lambda: _sugiyama(techs, layout_rec), layout_rec),
+        'validate': lambda: validate_tech_tree(techs, units, ttrx_path),
+        'analyze_balance': lambda: analyze_balance(techs),
+    }
+
+
+def gui_cases(ttrx_path: str, unit_path: str) -> Dict[str, object]:
+    """Widget-level cases; empty when PyQt5 is not installed"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt5.QtWidgets import QApplication
+        import tech_tree_analyzer as gui
+    except ImportError:
+        return {}
+    if not _qt_objects:
+        _qt_objects.append(QApplication.instance() or QApplication([]))
+    
+    with redirect_stdout(io.StringIO()):
+        techs = load_tech_tree(ttrx_path)
+    units = load_units(unit_path)
+    link_units_to_techs(techs, units)
+    view = gui.TechTreeView()
+    view.load_data(techs)
+    dialog = gui.BalanceAnalyzerDialog(techs, unit_index=UnitIndex(units))
+    gui.TaskRunner.instance().pool.waitForDone()  # Its background run must not overlap the timings
+    _qt_objects.extend((view, dialog))
+    
+    def rebuild(layout: str):
+        # Cold rebuild: the layout cache would otherwise answer every run after the first
+        view.current_layout = layout
+        view._layout_cache.clear()
+        view.rebuild()
+    
+    return {
+        'rebuild_grid': (lambda: rebuild('grid'), view.profiler),
+        'rebuild_sugiyama': (lambda: rebuild('sugiyama'), view.profiler),
+        # Compute and fill the table in one go, as the dialog does once a task finishes
+        'balance_cost_ratio': lambda: dialog._show_cost_ratio(dialog._analyze_cost_ratio()),
+        'balance_dead_ends': lambda: dialog._show_dead_ends(dialog._find_dead_ends()),
+        'balance_bottlenecks': lambda: dialog._show_bottlenecks(dialog._find_bottlenecks()),
+        'balance_unit_value': lambda: dialog._show_unit_value(dialog._analyze_unit_value()),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--techs", type=int, nargs="+", default=[2000, 10000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--units-per-tech", type=float, default=0.5)
+    parser.add_argument("--no-gui", action="store_true", help="Skip the widget cases even if PyQt5 is installed")
+    parser.add_argument("--only", nargs="+", default=None, metavar="CASE", help="Run just these cases")
+    parser.add_argument("--out", default="benchmark_results.json", help="JSON results file")
+    args = parser.parse_args()
+    
+    results = []
+    qt = False
+    with tempfile.TemporaryDirectory() as tmp:
+        core.CACHE_DIR = Path(tmp) / "cache"  # never touch the user's cache
+        for count in args.techs:
+            ttrx_path, unit_path = write_synthetic_files(tmp, count, args.seed, args.units_per_tech)
+            cases = core_cases(ttrx_path, unit_path)
+            if not args.no_gui:
+                widget_cases = gui_cases(ttrx_path, unit_path)
+                qt = qt or bool(widget_cases)
+                cases.update(widget_cases)
+            
+            print(f"== {count} techs")
+            for name, case in cases.items():
+                if args.only and name not in args.only:
+                    continue
+                fn, recorder = case if isinstance(case, tuple) else (case, None)
+                runs, stages = time_case(fn, max(1, args.repeat), recorder)
+                results.append({'name': name, 'techs': count, 'median_ms': round(statistics.median(runs), 3),
+                                'min_ms': round(min(runs), 3), 'max_ms': round(max(runs), 3),
+                                'runs_ms': [round(r, 3) for r in runs],
+                                'stages': {path: [round(ms, 3) for ms in times] for path, times in stages.items()}})
+                print(f"   {name:<22} median {statistics.median(runs):>9.1f}ms   min {min(runs):>9.1f}ms")
+    
+    meta = {'timestamp': datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'seed': args.seed, 'repeat': args.repeat, 'units_per_tech': args.units_per_tech, 'qt': qt}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2)
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Deterministic synthetic tech trees for benchmarks
+
+    python benchmarks/synthetic.py out/ --techs 20000 --units-per-tech 0.5
+
+Trees come either in memory (make_synthetic_techs) or as TTRX/UNIT files in
+the game's CSV layout (write_synthetic_files), so the parsers and the cache
+can be measured on the same shapes the analyses see.
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tech_tree_core import TechData, UnitData, _calculate_depths, CATEGORIES, CLASS_INFO, EFFECT_DEFINITIONS
+
+TTRX_COLUMNS = 30
+UNIT_COLUMNS = 30
+REGIONS = ["US", "EU", "RU", "CN", ""]
+
+
+def make_synthetic_techs(count: int = 2000, seed: int = 0, levels: int = 130,
+                         prereq_window: int = 200, level_skew: float = 1.0,
+                         prereq_probs: Tuple[float, float] = (0.9, 0.4),
+                         max_effects: int = 3) -> Dict[int, TechData]:
+    """Build an in-memory tree shaped like the game data.
+    
+    Levels grow with the tech id (level_skew > 1 crowds the low levels,
+    < 1 the high ones); prerequisites are picked among the previous
+    `prereq_window` techs of a lower level, each of the two slots filled
+    with its probability in `prereq_probs`. Each tech gets 0..max_effects
+    effects (at most 4, the TTRX slot count).
+    """
+    rng = random.Random(seed)
+    effect_ids = sorted(EFFECT_DEFINITIONS)
+    categories = sorted(CATEGORIES)
+    max_effects = min(max_effects, 4)
+    techs: Dict[int, TechData] = {}
+    
+    for tid in range(1, count + 1):
+        level = min(levels, int(levels * tid ** level_skew / count ** level_skew) + rng.randint(0, 3))
+        candidates = [c for c in range(max(1, tid - prereq_window), tid) if techs[c].tech_level < level]
+        
+        t = TechData(id=tid, category=rng.choice(categories), tech_level=level,
+                     short_title=f"Synthetic Tech {tid}")
+        if candidates and rng.random() < prereq_probs[0]:
+            t.prereq_1 = rng.choice(candidates)
+        if candidates and rng.random() < prereq_probs[1]:
+            t.prereq_2 = rng.choice(candidates)
+        for eid in rng.sample(effect_ids, rng.randint(0, max_effects)):
+            t.effects.append((eid, round(rng.uniform(-0.2, 0.5), 3)))
+        t.time_to_research = rng.randint(30, 900)
+        t.cost = rng.randint(1, 500) * 1e6
+        t.pop_support = 0.5
+        techs[tid] = t
+    
+    for tid, tech in techs.items():
+        for prereq in (tech.prereq_1, tech.prereq_2):
+            if prereq:
+                techs[prereq].prerequisite_of.append(tid)
+    _calculate_depths(techs)
+    
+    return techs
+
+
+def make_synthetic_units(techs: Dict[int, TechData], units_per_tech: float = 0.5,
+                         seed: int = 0) -> Dict[int, UnitData]:
+    """Units unlocked by random techs; the unit's year follows its tech's level"""
+    rng = random.Random(seed + 1)  # Own stream: the tree does not change with the unit count
+    classes = sorted(CLASS_INFO)
+    tech_ids = sorted(techs)
+    units: Dict[int, UnitData] = {}
+    
+    for uid in range(1, int(len(techs) * units_per_tech) + 1):
+        tech = techs[rng.choice(tech_ids)]
+        units[uid] = UnitData(id=uid, name=f"Synthetic Unit {uid}", class_num=rng.choice(classes),
+                              year=str(1960 + min(tech.tech_level, 139)), req_tech_id=tech.id,
+                              cost=round(rng.uniform(0.5, 20), 1) * 1e6, region=rng.choice(REGIONS))
+    return units
+
+
+def write_ttrx(techs: Dict[int, TechData], path: str):
+    """Write techs in the TTRX layout load_tech_tree reads"""
+    with open(path, "w", encoding="Windows-1252", newline="\n") as f:
+        f.write("// Synthetic tech tree\n&&TTR\n")
+        for tid in sorted(techs):
+            t = techs[tid]
+            row = [""] * TTRX_COLUMNS
+            row[0:6] = [str(tid), str(t.category), str(t.tech_level), "0",
+                        str(t.prereq_1 or 0), str(t.prereq_2 or 0)]
+            for slot, (eid, value) in enumerate(t.effects[:4]):
+                row[6 + slot], row[10 + slot] = str(eid), repr(value)
+            row[14], row[15], row[16], row[20] = (str(t.time_to_research), repr(t.cost), repr(t.pop_support),
+                                                  str(t.set_by_default))
+            f.write(",".join(row) + f"// {t.short_title}\n")
+
+
+def write_units(units: Dict[int, UnitData], path: str):
+    """Write units in the UNIT layout load_units reads (strength 1, so the cost is per piece)"""
+    with open(path, "w", encoding="latin-1", newline="\n") as f:
+        f.write("&&UNITS\n")
+        for uid in sorted(units):
+            u = units[uid]
+            row = [""] * UNIT_COLUMNS
+            row[0], row[1], row[2] = str(uid), f'"{u.name}"', str(u.class_num)
+            row[4] = str(int(u.year) - 1900) if u.year else ""
+            row[12], row[13], row[23], row[26] = u.region, "1", str(u.req_tech_id), repr(u.cost / 1e6)
+            f.write(",".join(row) + "\n")
+
+
+def write_synthetic_files(directory: str, count: int = 2000, seed: int = 0,
+                          units_per_tech: float = 0.5, **tree_options) -> Tuple[str, str]:
+    """Generate a tree and its units and write SYNTH_<count>.TTRX/.UNIT; returns both paths"""
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    techs = make_synthetic_techs(count, seed=seed, **tree_options)
+    ttrx_path, unit_path = out / f"SYNTH_{count}.TTRX", out / f"SYNTH_{count}.UNIT"
+    write_ttrx(techs, str(ttrx_path))
+    write_units(make_synthetic_units(techs, units_per_tech, seed), str(unit_path))
+    return str(ttrx_path), str(unit_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--techs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--levels", type=int, default=130)
+    parser.add_argument("--level-skew", type=float, default=1.0)
+    parser.add_argument("--prereq-probs", type=float, nargs=2, default=(0.9, 0.4), metavar=("FIRST", "SECOND"))
+    parser.add_argument("--max-effects", type=int, default=3)
+    parser.add_argument("--units-per-tech", type=float, default=0.5)
+    args = parser.parse_args()
+    
+    paths = write_synthetic_files(args.out_dir, args.techs, args.seed, args.units_per_tech, levels=args.levels,
+                                  level_skew=args.level_skew, prereq_probs=tuple(args.prereq_probs),
+                                  max_effects=args.max_effects)
+    print("\n".join(paths))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,10 @@
 import sys
-import csv
-import json
-import math
-import pickle
-import hashlib
+import time
+import threading
 import argparse
 from pathlib import Path
-from dataclasses import dataclass, field
-from typing import Dict, List, Set, Optional, Tuple
-from collections import defaultdict, Counter
-from datetime import datetime
+from typing import Callable, Dict, List, Set, Optional, Tuple
+from collections import OrderedDict, defaultdict
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -23,12 +18,12 @@ from PyQt5.QtWidgets import (
     QProgressBar, QStatusBar, QMenuBar, QMenu, QAction, QToolBar,
     QDockWidget, QTextEdit, QSpinBox, QDoubleSpinBox, QGridLayout,
     QStackedWidget, QButtonGroup, QRadioButton, QDialog, QDialogButtonBox,
-    QAbstractItemView, QShortcut, QCompleter, QStyledItemDelegate
+    QAbstractItemView, QTreeView, QShortcut, QCompleter, QStyledItemDelegate, QProgressDialog
 )
 from PyQt5.QtCore import (
     Qt, QRectF, QPointF, QLineF, pyqtSignal, QTimer, QPropertyAnimation,
     QEasingCurve, QParallelAnimationGroup, QSequentialAnimationGroup,
-    QSize, QSortFilterProxyModel, QStringListModel, QThread, QObject,QVariantAnimation
+    QSize, QSortFilterProxyModel, QAbstractTableModel, QModelIndex, QStringListModel, QThread, QThreadPool, QRunnable, QObject,QVariantAnimation
 )
 
 from PyQt5.QtGui import (
@@ -37,13 +32,29 @@ from PyQt5.QtGui import (
     QPalette, QKeySequence, QFontDatabase
 )
 
+from tech_tree_core import (
+    VERSION, APP_NAME, CATEGORIES, CLASS_INFO, EFFECT_DEFINITIONS, TechData, UnitData,
+    LayoutResult, ValidationReport, ResearchSchedule, ModDiff, MergeResult, PerfRecorder,
+    GridLayoutEngine, SugiyamaLayoutEngine, ForceLayoutEngine, CommunityClusterEngine,
+    SpatialGrid, load_tech_tree, load_units, link_units_to_techs, CACHE_DIR,
+    load_from_cache, save_to_cache, clear_cache, get_full_prereq_chain,
+    get_all_descendants, ReachabilityIndex, compute_graph_metrics, schedule_research,
+    targets_for_unit_class, targets_for_effect, plan_multi_target,
+    cumulative_level_curves, OUTLIER_Z, analyze_balance, export_balance_csv, tree_fingerprint,
+    BalanceReport, GraphMetrics, format_effect_value,
+    _format_cost, WhatIfOverlay, diff_mods, find_unit_file, merge_mods,
+    calculate_chain_cost, find_orphan_techs, EffectIndex, UnitIndex,
+    find_techs_by_effect, validate_tech_tree, export_techs_csv, export_techs_json,
+    write_html_report, write_interactive_report, write_svg
+)
+import tech_tree_cli
+import tech_tree_tiles
+
+
 # =============================================================================
 # CONSTANTS & STYLING
 # =============================================================================
 
-VERSION = "2.1.0"
-APP_NAME = "Supreme Ruler 2030 Tech Tree Analyzer beta"
-
 # Dark theme colors
 COLORS = {
     'bg_dark': '#0d1117',
@@ -64,183 +75,6 @@ COLORS = {
     'accent_cyan': '#39c5cf',
 }
 
-# Category definitions with icons and colors
-#from wiki
-CATEGORIES = {
-    1: {'name': 'Warfare',        'icon': '⚔', 'color': '#f85149', 'bg': '#3d1a1a'},  # Military/Weaponry
-    2: {'name': 'Transportation', 'icon': '⛟', 'color': '#d29922', 'bg': '#3d2a1a'},  # Infrastructure/Logistics
-    3: {'name': 'Science',        'icon': '⚗', 'color': '#3fb950', 'bg': '#1a3d1a'},  # Physics/Chemistry
-    4: {'name': 'Technology',     'icon': '⚙', 'color': '#58a6ff', 'bg': '#1a2a3d'},  # Industrial/Engineering
-    5: {'name': 'Medical',        'icon': '✚', 'color': '#db61a2', 'bg': '#3d1a2a'},  # Health/Bio
-    6: {'name': 'Society',        'icon': '🏛', 'color': '#a371f7', 'bg': '#2a1a3d'},  # Culture/Politics
-}
-
-# -----------------------------------------------------------------------------
-# UNIT CLASS DEFINITIONS (NATO)
-# -----------------------------------------------------------------------------
-CLASS_INFO = {
-    1:  {'name': 'Reconnaissance',      'icon': '◉'}, # Scope / Target
-    2:  {'name': 'Armor / Tank',        'icon': '▭'}, # Flattened rectangle (Tracks)
-    3:  {'name': 'Anti-Tank',           'icon': '⟁'}, # Triangle (Directional)
-    4:  {'name': 'Infantry',            'icon': '⊠'}, # Box with X (Standard NATO)
-    5:  {'name': 'Artillery',           'icon': '⊙'}, # Dot in Circle (Standard NATO)
-    6:  {'name': 'Air Defense',         'icon': '⌒'}, # Dome / Radar Coverage
-    7:  {'name': 'Helicopter',          'icon': '✕'}, # Rotor blade
-    8:  {'name': 'Missile',             'icon': '⇡'}, # Upward trajectory
-    9:  {'name': 'Fighter',             'icon': '↛'}, # Interception
-    10: {'name': 'Attack Aircraft',     'icon': '↣'}, # Direct Attack
-    11: {'name': 'Interceptor',         'icon': '↟'}, # Fast climb/High alt
-    12: {'name': 'Bomber',              'icon': '▼'}, # Drop payload
-    13: {'name': 'ASW Aircraft',        'icon': '∿'}, # Wave/Sonar
-    14: {'name': 'Transport Aircraft',  'icon': '□'}, # Cargo Capacity
-    15: {'name': 'Submarine',           'icon': '∩'}, # Hull profile
-    16: {'name': 'Aircraft Carrier',    'icon': '⌧'}, # Flat deck
-    17: {'name': 'Capital Ship',        'icon': '▇'}, # Heavy mass
-    18: {'name': 'Destroyer/Escort',    'icon': 'shield'}, # Using shape or 🛡 if supported
-    19: {'name': 'Patrol Craft',        'icon': '⌖'}, # Radar/Light
-    20: {'name': 'Transport Ship',      'icon': '⫷'}, # Cargo
-    21: {'name': 'Installation',        'icon': '⌂'}, # Base/Facility
-}
-
-# -----------------------------------------------------------------------------
-# EFFECT DEFINITIONS (Comprehensive Wiki Mapping)
-# -----------------------------------------------------------------------------
-EFFECT_DEFINITIONS = {
-    # --- Global / Economic Effects ---
-    2:  {'name': 'Finished Goods Fac. Cost',   'category': 'Industry',    'icon': '🏗'},
-    3:  {'name': 'Facility Material Usage',    'category': 'Industry',    'icon': '🧱'},
-    5:  {'name': 'Research Efficiency',        'category': 'Science',     'icon': '⚗'},
-    6:  {'name': 'Counter-Intel Efficiency',   'category': 'Intel',       'icon': '⊘'},
-    7:  {'name': 'Intelligence Efficiency',    'category': 'Intel',       'icon': '👁'},
-    8:  {'name': 'Military Efficiency',        'category': 'Military',    'icon': '⚔'},
-    9:  {'name': 'Power Generation Output',    'category': 'Energy',      'icon': '⚡'},
-    13: {'name': 'Fuel Consumption Rate',      'category': 'Logistics',   'icon': '⛽'},
-    14: {'name': 'Motorized Unit Cost',        'category': 'Production',  'icon': '⛟'},
-    15: {'name': 'Unit Build Speed',           'category': 'Production',  'icon': '⏱'},
-    16: {'name': 'Facility Build Speed',       'category': 'Production',  'icon': '🏗'},
-    18: {'name': 'Finished Goods Efficiency',  'category': 'Industry',    'icon': '⚙'},
-    19: {'name': 'Finished Goods Cost',        'category': 'Industry',    'icon': '💲'},
-    20: {'name': 'Transportation Improvement', 'category': 'Logistics',    'icon': '⛽'},
-    21: {'name': 'Space Knowledge',            'category': 'Space',       'icon': '☄'},
-    22: {'name': 'Nuclear Plant Maint.',       'category': 'Energy',      'icon': '☢'},
-
-    # --- Resource Usage (Raw Material to Finished Goods) ---
-    24: {'name': 'Agri Usage (Mfg)',           'category': 'Resource',    'icon': '🌾'},
-    25: {'name': 'Rubber Usage (Mfg)',         'category': 'Resource',    'icon': '⚫'},
-    27: {'name': 'Petrol Usage (Mfg)',         'category': 'Resource',    'icon': '🛢'},
-    29: {'name': 'Ore Usage (Mfg)',            'category': 'Resource',    'icon': '⛏'},
-    33: {'name': 'Industrial Raw Usage',       'category': 'Resource',    'icon': '🔩'},
-    34: {'name': 'Military Raw Usage',         'category': 'Resource',    'icon': '🛡'},
-
-    # --- Production Output (Facilities) ---
-    35: {'name': 'Synth. Rubber Production',   'category': 'Output',      'icon': '⚗'},
-    38: {'name': 'Synth. Fuel Production',     'category': 'Output',      'icon': '🛢'},
-    40: {'name': 'Nuclear Power Output',       'category': 'Energy',      'icon': '☢'},
-    44: {'name': 'Consumer Goods Output',      'category': 'Output',      'icon': '🛍'},
-    45: {'name': 'Industrial Goods Output',    'category': 'Output',      'icon': '🏭'},
-    46: {'name': 'Military Goods Output',      'category': 'Output',      'icon': '🔫'},
-
-    # --- Races / Milestones ---
-    56: {'name': 'Atomic Race Capability',     'category': 'Strategic',   'icon': '☢'},
-    57: {'name': 'Bio/Pandemic Research',      'category': 'Strategic',   'icon': '☣'},
-    58: {'name': 'Internet Infrastructure',    'category': 'Strategic',   'icon': '🌐'},
-    59: {'name': 'Mars/Space Mission',         'category': 'Strategic',   'icon': '🚀'},
-
-    # --- Population Usage Modifiers (60-71) ---
-    63: {'name': 'Pop. Petrol Usage',          'category': 'Society',     'icon': '⛽'},
-    67: {'name': 'Pop. Power Usage',           'category': 'Society',     'icon': '⚡'},
-    68: {'name': 'Pop. Consumer Goods Usage',  'category': 'Society',     'icon': '🛒'},
-
-    # --- Resource Output Modifiers (72-83) ---
-    72: {'name': 'Agriculture Output',         'category': 'Economy',     'icon': '🌾'},
-    75: {'name': 'Petroleum Output',           'category': 'Economy',     'icon': '🛢'},
-    77: {'name': 'Ore Output',                 'category': 'Economy',     'icon': '⛏'},
-    79: {'name': 'Power Output (All)',         'category': 'Economy',     'icon': '⚡'},
-
-    # --- Resource Efficiency Modifiers (84-94) ---
-    84: {'name': 'Agriculture Efficiency',     'category': 'Economy',     'icon': '📈'},
-    87: {'name': 'Petroleum Efficiency',       'category': 'Economy',     'icon': '📈'},
-    93: {'name': 'Industrial Efficiency',      'category': 'Economy',     'icon': '📈'},
-    94: {'name': 'Military Goods Efficiency',  'category': 'Economy',     'icon': '📈'},
-    96: {'name': 'Garrison Infantry Level',  'category': 'Defense',     'icon': '🛡'},
-    97: {'name': 'Locomotive Unit Level',  'category': 'Logistics',     'icon': '⛽'},
-
-    # --- Social Ratings & Costs (100-115) ---
-    100: {'name': 'Healthcare Rating',         'category': 'Social',      'icon': '✚'},
-    101: {'name': 'Education Rating',          'category': 'Social',      'icon': '🎓'},
-    102: {'name': 'Infrastructure Rating',     'category': 'Social',      'icon': '🛣'},
-    103: {'name': 'Environment Rating',        'category': 'Social',      'icon': '🌲'},
-    105: {'name': 'Law Enforcement Rating',    'category': 'Social',      'icon': '⚖'},
-    108: {'name': 'Healthcare Cost',           'category': 'Finance',     'icon': '💲'},
-    109: {'name': 'Education Cost',            'category': 'Finance',     'icon': '💲'},
-    113: {'name': 'Law Enforcement Cost',      'category': 'Finance',     'icon': '💲'},
-
-    # --- Global Military Stats (116-127) ---
-    116: {'name': 'Hard Target Defense (All)', 'category': 'Defense',     'icon': '🛡'},
-    117: {'name': 'Soft Target Defense (All)', 'category': 'Defense',     'icon': '🛡'},
-    118: {'name': 'Ground Attack (All)',       'category': 'Offense',     'icon': '⚔'},
-    119: {'name': 'Anti-Air Attack (All)',     'category': 'Offense',     'icon': '⇡'},
-    120: {'name': 'Anti-Ship Attack (All)',    'category': 'Offense',     'icon': '⚓'},
-    122: {'name': 'Ballistic/Arty Range',      'category': 'Range',       'icon': '⤳'},
-    123: {'name': 'Missile Accuracy',          'category': 'Combat',      'icon': '🎯'},
-    124: {'name': 'Stealth Level (All)',       'category': 'Stealth',     'icon': '👻'},
-    125: {'name': 'Spotting Range (All)',      'category': 'Intel',       'icon': '🔭'},
-    127: {'name': 'Fortification Defense',     'category': 'Defense',     'icon': '🏰'},
-
-    # --- Space / Futuristic (128-139) ---
-    128: {'name': 'FTL Range',                 'category': 'Space',       'icon': '🌌'},
-    130: {'name': 'Space Beam Defense',        'category': 'Space',       'icon': '🛡'},
-    132: {'name': 'Space Beam Attack',         'category': 'Space',       'icon': '⚡'},
-    135: {'name': 'Shield Efficiency',         'category': 'Tech',        'icon': '🛡'},
-
-    # --- Unit Upgrade Techs (140-149: Attack Modifiers) ---
-    140: {'name': 'Soft Attack Upgrade',       'category': 'Offense',     'icon': '⨂'},
-    141: {'name': 'Hard Attack Upgrade',       'category': 'Offense',     'icon': '⨂'},
-    142: {'name': 'Fortification Attack',      'category': 'Offense',     'icon': '⌖'},
-    143: {'name': 'Low-Air Attack',            'category': 'Offense',     'icon': '⇡'},
-    144: {'name': 'Mid-Air Attack',            'category': 'Offense',     'icon': '⇡'},
-    145: {'name': 'High-Air Attack',           'category': 'Offense',     'icon': '⇡'},
-    146: {'name': 'Naval Surface Attack',      'category': 'Offense',     'icon': '⚓'},
-    147: {'name': 'Submarine Attack',          'category': 'Offense',     'icon': '⇝'},
-    148: {'name': 'Close Combat Attack',       'category': 'Offense',     'icon': '⚔'},
-
-    # --- Unit Upgrade Techs (150-153: Range Modifiers) ---
-    150: {'name': 'Ground Range Upgrade',      'category': 'Range',       'icon': '↦'},
-    151: {'name': 'Air Range Upgrade',         'category': 'Range',       'icon': '↝'},
-    152: {'name': 'Naval Range Upgrade',       'category': 'Range',       'icon': '〰'},
-
-    # --- Unit Upgrade Techs (154-157: Defense Modifiers) ---
-    154: {'name': 'Ground Defense Upgrade',    'category': 'Defense',     'icon': '🛡'},
-    155: {'name': 'Air Defense Upgrade',       'category': 'Defense',     'icon': '☂'},
-    156: {'name': 'Indirect Defense',          'category': 'Defense',     'icon': '⛨'},
-    157: {'name': 'Close Defense Upgrade',     'category': 'Defense',     'icon': '🛡'},
-
-    # --- Unit Specs & Logistics (158-170) ---
-    158: {'name': 'Unit Speed',                'category': 'Mobility',    'icon': '⏩'},
-    159: {'name': 'Unit Stealth',              'category': 'Stealth',     'icon': '∅'},
-    160: {'name': 'Unit Initiative',           'category': 'Combat',      'icon': '⚡'},
-    161: {'name': 'Combat Time/Ammo Eff.',     'category': 'Logistics',   'icon': '📦'},
-    162: {'name': 'Air/Sea Fuel Usage',        'category': 'Logistics',   'icon': '⛽'},
-    163: {'name': 'Missile Capacity',          'category': 'Loadout',     'icon': '🚀'},
-    164: {'name': 'Unit Efficiency',           'category': 'Combat',      'icon': '⭐'},
-    165: {'name': 'Ammo Capacity',             'category': 'Loadout',     'icon': '▮'},
-    166: {'name': 'Fuel Capacity',             'category': 'Logistics',   'icon': '🛢'},
-    167: {'name': 'Spotting Range 1',          'category': 'Intel',       'icon': '👁'},
-
-    # --- Boolean Flags / Unlocks (200+) ---
-    201: {'name': 'Enable SOSUS Spotting',     'category': 'Unlock',      'icon': '〰'},
-    202: {'name': 'Enable Nuclear Weapons',    'category': 'Unlock',      'icon': '☢'},
-    203: {'name': 'Enable Chemical Weapons',   'category': 'Unlock',      'icon': '☠'},
-    204: {'name': 'Enable Bio Weapons',        'category': 'Unlock',      'icon': '☣'},
-    205: {'name': 'Enable ComSat',             'category': 'Space',       'icon': '📡'},
-    206: {'name': 'Enable ReconSat',           'category': 'Space',       'icon': '🛰'},
-    209: {'name': 'Enable Cyberattack',        'category': 'Intel',       'icon': '💻'},
-    232: {'name': 'Enable Shields',            'category': 'Tech',        'icon': '🛡'},
-    233: {'name': 'Enable Beam Weapons',       'category': 'Tech',        'icon': '⚡'},
-    234: {'name': 'Unit ECM Equipped',         'category': 'Electronic',  'icon': '📶'},
-}
-
-
 STYLESHEET = f"""
 QMainWindow {{
     background-color: {COLORS['bg_dark']};
@@ -392,7 +226,7 @@ QTabBar::tab:hover:!selected {{
     background-color: {COLORS['bg_light']};
 }}
 
-QTreeWidget, QListWidget, QTableWidget {{
+QTreeView, QListWidget, QTableWidget {{
     background-color: {COLORS['bg_medium']};
     border: 1px solid {COLORS['border']};
     border-radius: 8px;
@@ -400,17 +234,17 @@ QTreeWidget, QListWidget, QTableWidget {{
     alternate-background-color: {COLORS['bg_light']};
 }}
 
-QTreeWidget::item, QListWidget::item {{
+QTreeView::item, QListWidget::item {{
     padding: 8px;
     border-radius: 4px;
     margin: 1px 2px;
 }}
 
-QTreeWidget::item:hover, QListWidget::item:hover {{
+QTreeView::item:hover, QListWidget::item:hover {{
     background-color: {COLORS['bg_hover']};
 }}
 
-QTreeWidget::item:selected, QListWidget::item:selected {{
+QTreeView::item:selected, QListWidget::item:selected {{
     background-color: {COLORS['bg_light']};
     color: {COLORS['accent_blue']};
 }}
@@ -560,373 +394,6 @@ QFrame#techCard:hover {{
 """
 
 
-# =============================================================================
-# DATA STRUCTURES
-# =============================================================================
-
-@dataclass
-class TechData:
-    id: int = 0
-    category: int = 0
-    tech_level: int = 0
-    short_title: str = ""
-    prereq_1: int = 0
-    prereq_2: int = 0
-    leads_to_1: int = 0
-    leads_to_2: int = 0
-    effects: List[Tuple[int, float]] = field(default_factory=list)
-    time_to_research: int = 0
-    cost: float = 0.0
-    pop_support: float = 0.0
-    set_by_default: int = 0
-    unlocks_units: List['UnitData'] = field(default_factory=list)
-    prerequisite_of: List[int] = field(default_factory=list)
-    # Computed fields
-    depth: int = 0  # Distance from root techs
-    chain_cost: float = 0.0  # Total cost including prerequisites
-
-
-@dataclass
-class NodePosition:
-    """Position data for a single node"""
-    x: float = 0.0
-    y: float = 0.0
-    layer: int = 0
-    position_in_layer: int = 0
-    cluster_id: int = 0
-
-@dataclass  
-class UnitData:
-    id: int = 0
-    name: str = ""
-    class_num: int = 0
-    year: str = ""
-    req_tech_id: int = 0
-    cost: float = 0.0
-    region: str = ""
-
-@dataclass  
-class LayoutResult:
-    """Complete layout computation result"""
-    positions: Dict[int, NodePosition] = field(default_factory=dict)
-    width: float = 0.0
-    height: float = 0.0
-    layer_positions: Dict[int, float] = field(default_factory=dict)
-    clusters: Dict[int, Set[int]] = field(default_factory=dict)
-    cluster_colors: Dict[int, str] = field(default_factory=dict)
-
-
-class GridLayoutEngine:
-    """Layout engine che usa tech_level come colonne"""
-    
-    NODE_WIDTH = 200
-    NODE_HEIGHT = 70
-    H_SPACING = 320
-    V_SPACING = 130
-    MARGIN = 50
-    TOP_MARGIN = 120
-    
-    def compute(self, techs: dict, category_filter: int = 0) -> LayoutResult:
-        result = LayoutResult()
-        
-        filtered = {
-            tid: t for tid, t in techs.items()
-            if category_filter == 0 or t.category == category_filter
-        }
-        
-        if not filtered:
-            return result
-        
-        by_level = defaultdict(list)
-        for tid, tech in filtered.items():
-            by_level[tech.tech_level].append(tid)
-        
-        for level in by_level:
-            by_level[level].sort(key=lambda t: (filtered[t].category, filtered[t].short_title))
-        
-        levels = sorted(by_level.keys())
-        max_in_level = max(len(by_level[l]) for l in levels) if levels else 1
-        
-        for col, level in enumerate(levels):
-            x = self.MARGIN + col * self.H_SPACING
-            center_x = x + self.NODE_WIDTH / 2
-            result.layer_positions[level] = center_x
-            
-            for row, tid in enumerate(by_level[level]):
-                y = self.TOP_MARGIN + row * self.V_SPACING
-                result.positions[tid] = NodePosition(x=x, y=y, layer=level, position_in_layer=row)
-        
-        if result.positions:
-            max_x = max(p.x for p in result.positions.values())
-            max_y = max(p.y for p in result.positions.values())
-            result.width = max_x + self.NODE_WIDTH + self.MARGIN
-            result.height = max_y + self.NODE_HEIGHT + self.MARGIN
-        
-        return result
-
-
-class SugiyamaLayoutEngine:
-    """Sugiyama hierarchical layout con crossing minimization"""
-    
-    NODE_WIDTH = 200
-    NODE_HEIGHT = 70
-    H_SPACING = 280
-    V_SPACING = 100
-    MARGIN = 80
-    TOP_MARGIN = 120
-    
-    def __init__(self, use_tech_level_as_layer: bool = True):
-        self.use_tech_level_as_layer = use_tech_level_as_layer
-    
-    def compute(self, techs: dict, category_filter: int = 0) -> LayoutResult:
-        result = LayoutResult()
-        
-        filtered = {
-            tid: t for tid, t in techs.items()
-            if category_filter == 0 or t.category == category_filter
-        }
-        
-        if not filtered:
-            return result
-        
-        # Step 1: Layer assignment
-        layers = self._assign_layers(filtered)
-        
-        # Step 2: Initial ordering
-        layer_order = self._initial_ordering(filtered, layers)
-        
-        # Step 3: Crossing minimization (4 passes)
-        layer_order = self._minimize_crossings(filtered, layers, layer_order, passes=4)
-        
-        # Step 4: Coordinate assignment
-        positions = self._assign_coordinates(filtered, layers, layer_order)
-        
-        # Step 5: Detect clusters
-        clusters, cluster_colors = self._detect_clusters(filtered)
-        
-        # Build result
-        for tid, (x, y) in positions.items():
-            layer = layers[tid]
-            pos_in_layer = layer_order[layer].index(tid) if tid in layer_order.get(layer, []) else 0
-            cluster_id = next((cid for cid, members in clusters.items() if tid in members), 0)
-            
-            result.positions[tid] = NodePosition(
-                x=x, y=y, layer=layer, 
-                position_in_layer=pos_in_layer,
-                cluster_id=cluster_id
-            )
-        
-        for layer, tids in layer_order.items():
-            if tids and tids[0] in positions:
-                result.layer_positions[layer] = positions[tids[0]][0] + self.NODE_WIDTH / 2
-        
-        result.clusters = clusters
-        result.cluster_colors = cluster_colors
-        
-        if positions:
-            max_x = max(p[0] for p in positions.values())
-            max_y = max(p[1] for p in positions.values())
-            result.width = max_x + self.NODE_WIDTH + self.MARGIN
-            result.height = max_y + self.NODE_HEIGHT + self.MARGIN
-        
-        return result
-    
-    def _assign_layers(self, techs: dict) -> Dict[int, int]:
-        if self.use_tech_level_as_layer:
-            return {tid: t.tech_level for tid, t in techs.items()}
-        
-        layers = {}
-        def get_layer(tid):
-            if tid in layers:
-                return layers[tid]
-            if tid not in techs:
-                return 0
-            tech = techs[tid]
-            prereq_layers = []
-            if tech.prereq_1 and tech.prereq_1 in techs:
-                prereq_layers.append(get_layer(tech.prereq_1))
-            if tech.prereq_2 and tech.prereq_2 in techs:
-                prereq_layers.append(get_layer(tech.prereq_2))
-            layer = (max(prereq_layers) + 1) if prereq_layers else 0
-            layers[tid] = layer
-            return layer
-        
-        for tid in techs:
-            get_layer(tid)
-        return layers
-    
-    def _initial_ordering(self, techs: dict, layers: Dict[int, int]) -> Dict[int, List[int]]:
-        layer_order: Dict[int, List[int]] = defaultdict(list)
-        for tid, layer in layers.items():
-            layer_order[layer].append(tid)
-        
-        for layer in layer_order:
-            layer_order[layer].sort(key=lambda t: (techs[t].category, techs[t].short_title))
-        
-        return dict(layer_order)
-    
-    def _minimize_crossings(self, techs: dict, layers: Dict[int, int], 
-                           layer_order: Dict[int, List[int]], passes: int = 4) -> Dict[int, List[int]]:
-        sorted_layers = sorted(layer_order.keys())
-        
-        for _ in range(passes):
-            # Forward sweep
-            for i in range(1, len(sorted_layers)):
-                prev_layer = sorted_layers[i - 1]
-                curr_layer = sorted_layers[i]
-                layer_order[curr_layer] = self._reorder_by_barycenter(
-                    techs, layers, layer_order, curr_layer, prev_layer, forward=True
-                )
-            
-            # Backward sweep
-            for i in range(len(sorted_layers) - 2, -1, -1):
-                next_layer = sorted_layers[i + 1]
-                curr_layer = sorted_layers[i]
-                layer_order[curr_layer] = self._reorder_by_barycenter(
-                    techs, layers, layer_order, curr_layer, next_layer, forward=False
-                )
-        
-        return layer_order
-    
-    def _reorder_by_barycenter(self, techs: dict, layers: Dict[int, int],
-                               layer_order: Dict[int, List[int]], 
-                               curr_layer: int, ref_layer: int, forward: bool) -> List[int]:
-        curr_nodes = layer_order.get(curr_layer, [])
-        ref_nodes = layer_order.get(ref_layer, [])
-        
-        if not curr_nodes or not ref_nodes:
-            return curr_nodes
-        
-        ref_pos = {tid: i for i, tid in enumerate(ref_nodes)}
-        barycenters = []
-        
-        for tid in curr_nodes:
-            tech = techs[tid]
-            connected_positions = []
-            
-            if forward:
-                for prereq in [tech.prereq_1, tech.prereq_2]:
-                    if prereq and prereq in ref_pos:
-                        connected_positions.append(ref_pos[prereq])
-            else:
-                for other_tid, other_tech in techs.items():
-                    if layers.get(other_tid) == ref_layer:
-                        if other_tech.prereq_1 == tid or other_tech.prereq_2 == tid:
-                            if other_tid in ref_pos:
-                                connected_positions.append(ref_pos[other_tid])
-            
-            if connected_positions:
-                barycenter = sum(connected_positions) / len(connected_positions)
-            else:
-                barycenter = curr_nodes.index(tid)
-            
-            barycenters.append((tid, barycenter))
-        
-        barycenters.sort(key=lambda x: x[1])
-        return [tid for tid, _ in barycenters]
-    
-    def _assign_coordinates(self, techs: dict, layers: Dict[int, int],
-                           layer_order: Dict[int, List[int]]) -> Dict[int, Tuple[float, float]]:
-        positions = {}
-        sorted_layers = sorted(layer_order.keys())
-        max_in_any_layer = max(len(layer_order[l]) for l in sorted_layers) if sorted_layers else 1
-        
-        for i, layer in enumerate(sorted_layers):
-            x = self.MARGIN + i * self.H_SPACING
-            nodes = layer_order[layer]
-            
-            total_height = len(nodes) * self.V_SPACING
-            start_y = self.TOP_MARGIN + (max_in_any_layer * self.V_SPACING - total_height) / 2
-            
-            for j, tid in enumerate(nodes):
-                y = self._compute_median_y(tid, techs, positions, start_y + j * self.V_SPACING)
-                positions[tid] = (x, y)
-        
-        positions = self._resolve_overlaps(positions, layer_order)
-        return positions
-    
-    def _compute_median_y(self, tid: int, techs: dict, 
-                         existing_positions: Dict[int, Tuple[float, float]],
-                         default_y: float) -> float:
-        tech = techs[tid]
-        connected_ys = []
-        
-        for prereq in [tech.prereq_1, tech.prereq_2]:
-            if prereq and prereq in existing_positions:
-                connected_ys.append(existing_positions[prereq][1])
-        
-        if connected_ys:
-            return sum(connected_ys) / len(connected_ys)
-        return default_y
-    
-    def _resolve_overlaps(self, positions: Dict[int, Tuple[float, float]],
-                         layer_order: Dict[int, List[int]]) -> Dict[int, Tuple[float, float]]:
-        for layer, nodes in layer_order.items():
-            if len(nodes) <= 1:
-                continue
-            
-            nodes_with_y = [(tid, positions[tid][1]) for tid in nodes if tid in positions]
-            nodes_with_y.sort(key=lambda x: x[1])
-            
-            for i in range(1, len(nodes_with_y)):
-                prev_tid, prev_y = nodes_with_y[i - 1]
-                curr_tid, curr_y = nodes_with_y[i]
-                
-                min_y = prev_y + self.V_SPACING
-                if curr_y < min_y:
-                    x = positions[curr_tid][0]
-                    positions[curr_tid] = (x, min_y)
-                    nodes_with_y[i] = (curr_tid, min_y)
-        
-        return positions
-    
-    def _detect_clusters(self, techs: dict) -> Tuple[Dict[int, Set[int]], Dict[int, str]]:
-        adjacency: Dict[int, Set[int]] = defaultdict(set)
-        for tid, tech in techs.items():
-            if tech.prereq_1 and tech.prereq_1 in techs:
-                adjacency[tid].add(tech.prereq_1)
-                adjacency[tech.prereq_1].add(tid)
-            if tech.prereq_2 and tech.prereq_2 in techs:
-                adjacency[tid].add(tech.prereq_2)
-                adjacency[tech.prereq_2].add(tid)
-        
-        visited = set()
-        clusters: Dict[int, Set[int]] = {}
-        cluster_id = 0
-        
-        for tid in techs:
-            if tid in visited:
-                continue
-            
-            component = set()
-            queue = [tid]
-            while queue:
-                current = queue.pop(0)
-                if current in visited:
-                    continue
-                visited.add(current)
-                component.add(current)
-                for neighbor in adjacency[current]:
-                    if neighbor not in visited:
-                        queue.append(neighbor)
-            
-            if component:
-                clusters[cluster_id] = component
-                cluster_id += 1
-        
-        cluster_palette = [
-            '#58a6ff20', '#3fb95020', '#f8514920', '#d2992220',
-            '#a371f720', '#db61a220', '#39c5cf20', '#8b949e20'
-        ]
-        
-        cluster_colors = {
-            cid: cluster_palette[cid % len(cluster_palette)]
-            for cid in clusters
-        }
-        
-        return clusters, cluster_colors
-
-
 # =============================================================================
 # CLUSTER BACKGROUND
 # =============================================================================
@@ -1115,6 +582,76 @@ class MiniMapWidget(QFrame):
         self.viewport_changed.emit(QPointF(scene_x, scene_y))
 
 
+# =============================================================================
+# MINI CHART
+# =============================================================================
+
+class MiniChartWidget(QWidget):
+    """Compact line or bar chart for analysis series"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.points: List[Tuple[float, float]] = []
+        self.title = ""
+        self.bars = False
+        self.setMinimumHeight(140)
+    
+    def set_series(self, points: List[Tuple[float, float]], title: str = "", bars: bool = False):
+        self.points = list(points)
+        self.title = title
+        self.bars = bars
+        self.update()
+    
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(self.rect(), QColor(COLORS['bg_dark']))
+        painter.setFont(QFont("Segoe UI", 8))
+        
+        if not self.points:
+            painter.setPen(QColor(COLORS['text_muted']))
+            painter.drawText(self.rect(), Qt.AlignCenter, "No data")
+            return
+        
+        plot = QRectF(self.rect()).adjusted(44, 20, -10, -18)
+        xs = [x for x, _ in self.points]
+        ys = [y for _, y in self.points]
+        x_min, x_max = min(xs), max(xs)
+        y_min, y_max = min(0.0, min(ys)), max(0.0, max(ys))
+        x_span = (x_max - x_min) or 1.0
+        y_span = (y_max - y_min) or 1.0
+        
+        def to_px(x: float, y: float) -> QPointF:
+            return QPointF(plot.left() + (x - x_min) / x_span * plot.width(),
+                           plot.bottom() - (y - y_min) / y_span * plot.height())
+        
+        # Axes and labels
+        painter.setPen(QColor(COLORS['text_secondary']))
+        painter.drawText(QRectF(0, 2, self.width(), 16), Qt.AlignCenter, self.title)
+        painter.drawText(QRectF(0, plot.top() - 6, 40, 12), Qt.AlignRight | Qt.AlignVCenter, f"{y_max:.3g}")
+        painter.drawText(QRectF(0, plot.bottom() - 6, 40, 12), Qt.AlignRight | Qt.AlignVCenter, f"{y_min:.3g}")
+        painter.drawText(QRectF(plot.left(), plot.bottom() + 2, 60, 14), Qt.AlignLeft, f"{x_min:.0f}")
+        painter.drawText(QRectF(plot.right() - 60, plot.bottom() + 2, 60, 14), Qt.AlignRight, f"{x_max:.0f}")
+        painter.setPen(QPen(QColor(COLORS['border']), 1))
+        painter.drawLine(to_px(x_min, 0.0), to_px(x_max, 0.0))
+        painter.drawLine(plot.bottomLeft(), plot.topLeft())
+        
+        color = QColor(COLORS['accent_blue'])
+        if self.bars:
+            width = max(1.0, plot.width() / len(self.points) - 1)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QBrush(color))
+            for x, y in self.points:
+                top, base = to_px(x, y), to_px(x, 0.0)
+                painter.drawRect(QRectF(top.x() - width / 2, min(top.y(), base.y()), width, abs(base.y() - top.y())))
+        else:
+            path = QPainterPath(to_px(*self.points[0]))
+            for x, y in self.points[1:]:
+                path.lineTo(to_px(x, y))
+            painter.setPen(QPen(color, 2))
+            painter.drawPath(path)
+
+
 # =============================================================================
 # LAYOUT SELECTOR
 # =============================================================================
@@ -1141,6 +678,7 @@ class LayoutSelector(QFrame):
         self.combo = QComboBox()
         self.combo.addItem("📅 By Year", "grid")
         self.combo.addItem("🌳 Hierarchical", "sugiyama")
+        self.combo.addItem("🕸 Force-Directed", "force")
         self.combo.setMinimumWidth(140)
         self.combo.currentIndexChanged.connect(self._on_changed)
         layout.addWidget(self.combo)
@@ -1150,324 +688,6 @@ class LayoutSelector(QFrame):
         self.layout_changed.emit(engine)
         
 
-# =============================================================================
-# PARSERS
-# =============================================================================
-
-def parse_int(v: str) -> int:
-    try: return int(float(v.strip())) if v.strip() else 0
-    except: return 0
-
-def parse_float(v: str) -> float:
-    try: return float(v.strip()) if v.strip() else 0.0
-    except: return 0.0
-
-
-def load_tech_tree(path: str) -> Dict[int, TechData]:
-    techs = {}
-    try:
-        with open(path, "r", encoding="Windows-1252", errors="replace") as f:
-            lines = f.readlines()
-    except Exception as e:
-        print(f"Error reading file: {e}")
-        return techs
-    
-    start_idx = next((i+1 for i, l in enumerate(lines) if l.strip().startswith("&&TTR")), 0)
-    
-    count = 0  # <--- NUOVO: Inizializza contatore
-    
-    for row in csv.reader(lines[start_idx:], delimiter=","):
-        count += 1  # <--- NUOVO: Incrementa
-        
-        # <--- NUOVO: Stampa ogni 1000 righe per far vedere che è vivo
-        if count % 1000 == 0:
-            print(f"Reading row {count}...") 
-            
-        if len(row) < 30 or not row[0].strip():
-            continue
-        try:
-            tid = parse_int(row[0])
-            if tid <= 0: continue
-            
-            t = TechData(id=tid)
-            t.category = parse_int(row[1])
-            t.tech_level = parse_int(row[2])
-            t.prereq_1 = parse_int(row[4])
-            t.prereq_2 = parse_int(row[5])
-            
-            for ec, vc in [(6,10), (7,11), (8,12), (9,13)]:
-                eid = parse_int(row[ec])
-                if eid > 0:
-                    t.effects.append((eid, parse_float(row[vc])))
-            
-            t.time_to_research = parse_int(row[14])
-            t.cost = parse_float(row[15])
-            t.pop_support = parse_float(row[16])
-            t.set_by_default = parse_int(row[20])
-            
-            if len(row) > 28: t.leads_to_1 = parse_int(row[28])
-            if len(row) > 29: t.leads_to_2 = parse_int(row[29])
-            
-            if "//" in row[-1]:
-                t.short_title = row[-1].split("//")[-1].strip()
-            
-            techs[tid] = t
-        except: continue
-    
-    # Build reverse links
-    print("Building reverse links...") # <--- NUOVO: Debug info
-    for tid, tech in techs.items():
-        for prereq in [tech.prereq_1, tech.prereq_2]:
-            if prereq and prereq in techs:
-                techs[prereq].prerequisite_of.append(tid)
-    
-    # Calculate depths
-    print("Calculating depths...") # <--- N: Debug 
-    _calculate_depths(techs)
-    
-    print("Tech tree loaded successfully.") #
-    return techs
-
-
-def _calculate_depths(techs: Dict[int, TechData]):
-    """Calculate depth (distance from root) for each tech - OPTIMIZED"""
-    depth_cache = {}
-    path_visited = set()
-    
-    sys.setrecursionlimit(5000)
-    
-    def get_depth(tid: int) -> int:
-        if tid not in techs:
-            return 0
-            
-        if tid in depth_cache:
-            return depth_cache[tid]
-            
-        if tid in path_visited:
-            return 0
-            
-        path_visited.add(tid)
-        tech = techs[tid]
-        
-        d1 = get_depth(tech.prereq_1) if tech.prereq_1 else 0
-        d2 = get_depth(tech.prereq_2) if tech.prereq_2 else 0
-        
-        res = max(d1, d2) + 1
-        
-        depth_cache[tid] = res
-        path_visited.remove(tid)
-        
-        tech.depth = res
-        return res
-    
-    for tid in techs:
-        get_depth(tid)
-
-
-def load_units(path: str) -> Dict[int, UnitData]:
-    units = {}
-    try:
-        with open(path, "r", encoding="latin-1", errors="replace") as f:
-            lines = f.readlines()
-    except: return units
-    
-    start_idx = next((i+1 for i, l in enumerate(lines) if l.strip().startswith("&&UNITS")), 0)
-    
-    for row in csv.reader(lines[start_idx:], delimiter=",", quotechar='"'):
-        if not row or len(row) < 30 or row[0].strip().startswith("//"):
-            continue
-        try:
-            u = UnitData()
-            u.id = parse_int(row[0])
-            u.name = row[1].strip().strip('"')
-            u.class_num = parse_int(row[2])
-            year_val = parse_int(row[4])
-            u.year = str(1900 + year_val) if year_val > 0 else ""
-            
-            # Tech Requirement is at column 23
-            u.req_tech_id = parse_int(row[23]) if len(row) > 23 else 0
-            u.region = row[12].strip() if len(row) > 12 else ""
-            
-            # Strength (numero soldati/veicoli) è alla colonna 13
-            strength = parse_int(row[13]) or 1
-            
-            # --- CORREZIONE DEFINITIVA ---
-            # 1. Usiamo la colonna 26 (come nel tuo file per Pennsylvania, Moltke, ecc.)
-            # 2. Moltiplichiamo per 1.000.000 (il file dice "11.1" per 11.1 Milioni)
-            # 3. Moltiplichiamo per strength (il costo nel file è solitamente per singolo pezzo)
-            cost_per_unit_m = parse_float(row[26]) if len(row) > 26 else 0.0
-            u.cost = cost_per_unit_m * 1000000.0 * strength
-            # -----------------------------
-            
-            if u.id > 0:
-                units[u.id] = u
-        except: continue
-    
-    return units
-
-
-def link_units_to_techs(techs: Dict[int, TechData], units: Dict[int, UnitData]):
-    for u in units.values():
-        if u.req_tech_id and u.req_tech_id in techs:
-            techs[u.req_tech_id].unlocks_units.append(u)
-
-
-# =============================================================================
-# CACHE SYSTEM
-# =============================================================================
-
-CACHE_DIR = Path.home() / "Documents" / "SR2030_Logger" / "cache"
-CACHE_VERSION = 2  # Increment if data structure changes
-
-def _get_file_hash(path: str) -> str:
-    """Get modification time + size as a quick hash"""
-    try:
-        p = Path(path)
-        stat = p.stat()
-        return f"{stat.st_mtime}_{stat.st_size}"
-    except:
-        return ""
-
-def _get_cache_path(ttrx_path: str, unit_path: str) -> Path:
-    """Generate cache filename based on source files"""
-    # Use hash of paths for unique cache file
-    key = f"{ttrx_path}|{unit_path}"
-    hash_name = hashlib.md5(key.encode()).hexdigest()[:12]
-    return CACHE_DIR / f"techcache_{hash_name}.pkl"
-
-def load_from_cache(ttrx_path: str, unit_path: str) -> Optional[Tuple[Dict[int, TechData], Dict[int, UnitData]]]:
-    """Try to load data from cache if valid"""
-    cache_path = _get_cache_path(ttrx_path, unit_path)
-    
-    if not cache_path.exists():
-        return None
-    
-    try:
-        with open(cache_path, 'rb') as f:
-            cache_data = pickle.load(f)
-        
-        # Validate cache
-        if cache_data.get('version') != CACHE_VERSION:
-            return None
-        if cache_data.get('ttrx_hash') != _get_file_hash(ttrx_path):
-            return None
-        if cache_data.get('unit_hash') != _get_file_hash(unit_path):
-            return None
-        
-        return cache_data['techs'], cache_data['units']
-    except:
-        return None
-
-def save_to_cache(ttrx_path: str, unit_path: str, techs: Dict[int, TechData], units: Dict[int, UnitData]):
-    """Save parsed data to cache"""
-    try:
-        CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        
-        cache_data = {
-            'version': CACHE_VERSION,
-            'ttrx_hash': _get_file_hash(ttrx_path),
-            'unit_hash': _get_file_hash(unit_path),
-            'ttrx_path': ttrx_path,
-            'unit_path': unit_path,
-            'cached_at': datetime.now().isoformat(),
-            'techs': techs,
-            'units': units,
-        }
-        
-        cache_path = _get_cache_path(ttrx_path, unit_path)
-        with open(cache_path, 'wb') as f:
-            pickle.dump(cache_data, f, protocol=pickle.HIGHEST_PROTOCOL)
-        
-        return True
-    except Exception as e:
-        print(f"Cache save failed: {e}")
-        return False
-
-def clear_cache():
-    """Clear all cached data"""
-    try:
-        if CACHE_DIR.exists():
-            for f in CACHE_DIR.glob("techcache_*.pkl"):
-                f.unlink()
-        return True
-    except:
-        return False
-
-
-# =============================================================================
-# ANALYSIS FUNCTIONS
-# =============================================================================
-
-def get_full_prereq_chain(tech_id: int, techs: Dict[int, TechData]) -> Set[int]:
-    """Get all prerequisites recursively"""
-    chain = set()
-    visited = set()
-    
-    def traverse(tid):
-        if tid in visited or tid not in techs:
-            return
-        visited.add(tid)
-        chain.add(tid)
-        t = techs[tid]
-        if t.prereq_1: traverse(t.prereq_1)
-        if t.prereq_2: traverse(t.prereq_2)
-    
-    if tech_id in techs:
-        t = techs[tech_id]
-        if t.prereq_1: traverse(t.prereq_1)
-        if t.prereq_2: traverse(t.prereq_2)
-    
-    return chain
-
-
-def get_all_descendants(tech_id: int, techs: Dict[int, TechData]) -> Set[int]:
-    """Get all techs that eventually require this one"""
-    descendants = set()
-    visited = set()
-    
-    def traverse(tid):
-        if tid in visited or tid not in techs:
-            return
-        visited.add(tid)
-        descendants.add(tid)
-        for child in techs[tid].prerequisite_of:
-            traverse(child)
-    
-    if tech_id in techs:
-        for child in techs[tech_id].prerequisite_of:
-            traverse(child)
-    
-    return descendants
-
-
-def calculate_chain_cost(tech_id: int, techs: Dict[int, TechData]) -> float:
-    """Calculate total cost including all prerequisites"""
-    chain = get_full_prereq_chain(tech_id, techs)
-    chain.add(tech_id)
-    return sum(techs[tid].cost for tid in chain if tid in techs)
-
-
-def find_orphan_techs(techs: Dict[int, TechData]) -> List[int]:
-    """Find techs with missing prerequisites"""
-    orphans = []
-    for tid, tech in techs.items():
-        if tech.prereq_1 and tech.prereq_1 not in techs:
-            orphans.append((tid, tech.prereq_1, 'prereq_1'))
-        if tech.prereq_2 and tech.prereq_2 not in techs:
-            orphans.append((tid, tech.prereq_2, 'prereq_2'))
-    return orphans
-
-
-def find_techs_by_effect(effect_id: int, techs: Dict[int, TechData]) -> List[Tuple[int, float]]:
-    """Find all techs that have a specific effect"""
-    results = []
-    for tid, tech in techs.items():
-        for eid, val in tech.effects:
-            if eid == effect_id:
-                results.append((tid, val))
-    return sorted(results, key=lambda x: x[1], reverse=True)
-
-
 # =============================================================================
 # GRAPHICS: TECH NODE
 # =============================================================================
@@ -1641,6 +861,13 @@ class ConnectionLine(QGraphicsPathItem):
         
         self.setPen(QPen(color, width, Qt.SolidLine, Qt.RoundCap))
         
+        # Endpoint tech ids, set by the view so lines can follow moving nodes
+        self.prereq_id = 0
+        self.tech_id = 0
+        
+        self.set_endpoints(start, end)
+    
+    def set_endpoints(self, start: QPointF, end: QPointF):
         path = QPainterPath()
         path.moveTo(start)
         
@@ -1658,20 +885,55 @@ class ConnectionLine(QGraphicsPathItem):
 class TimelineRuler(QGraphicsItem):
     """Draws a timeline bar at the TOP"""
     
-    def __init__(self, level_positions: Dict[int, float], graph_height: float, width: float):
+    BAND_HEIGHT = 60
+    
+    def __init__(self, level_positions: Dict[int, float], graph_height: float, width: float,
+                 band: Optional[Dict[int, float]] = None, band_label: str = ""):
         super().__init__()
         self.level_positions = level_positions
         self.graph_height = graph_height # We need to know how deep the graph is
         self.total_width = width
+        self.band = band or {}  # level -> cumulative value, drawn above the years
+        self.band_label = band_label
         self.setZValue(-1) 
         
     def boundingRect(self):
         # The bounding rect now covers the whole height to allow drawing grid lines
-        return QRectF(0, 0, self.total_width, self.graph_height)
+        top = -self.BAND_HEIGHT - 10 if self.band else 0
+        return QRectF(0, top, self.total_width, self.graph_height - top)
+    
+    def _paint_band(self, painter: QPainter):
+        """Filled cumulative curve over the year bubbles"""
+        points = sorted((self.level_positions[lvl], val) for lvl, val in self.band.items()
+                        if lvl in self.level_positions)
+        peak = max((val for _, val in points), default=0)
+        if not points or peak <= 0:
+            return
+        
+        base = -5
+        path = QPainterPath(QPointF(points[0][0], base))
+        for x, val in points:
+            path.lineTo(QPointF(x, base - val / peak * self.BAND_HEIGHT))
+        path.lineTo(QPointF(points[-1][0], base))
+        path.closeSubpath()
+        
+        color = QColor(COLORS['accent_purple'])
+        painter.setPen(QPen(color, 1.5))
+        color.setAlpha(60)
+        painter.setBrush(QBrush(color))
+        painter.drawPath(path)
+        
+        painter.setFont(QFont("Segoe UI", 9))
+        painter.setPen(QColor(COLORS['text_secondary']))
+        painter.drawText(QRectF(points[0][0], base - self.BAND_HEIGHT - 5, 400, 16),
+                         Qt.AlignLeft | Qt.AlignVCenter, self.band_label)
         
     def paint(self, painter, option, widget):
         painter.setRenderHint(QPainter.Antialiasing)
         
+        if self.band:
+            self._paint_band(painter)
+        
         # Header background for the years (optional, makes it look like a bar)
         header_rect = QRectF(0, 0, self.total_width, 40)
         # painter.setBrush(QBrush(QColor(COLORS['bg_medium']))) # Optional background
@@ -1716,6 +978,178 @@ class TimelineRuler(QGraphicsItem):
 
 
 
+# =============================================================================
+# BACKGROUND WORKERS
+# =============================================================================
+
+class CancelToken:
+    """Cancellation flag shared by the GUI and one task; long tasks poll cancelled()"""
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        self._event.set()
+    
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class TaskSignals(QObject):
+    """Signals of a Task (QRunnable is not a QObject); delivered on the GUI thread"""
+    
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int, int)  # done, total; only with report_progress
+    done = pyqtSignal()
+
+
+class Task(QRunnable):
+    """One job submitted to a TaskRunner: a Qt-free function run on a pool thread"""
+    
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict, cache_key: Optional[tuple] = None):
+        super().__init__()
+        self.setAutoDelete(False)  # The runner holds it until its signals are delivered
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.cache_key = cache_key
+        self.token = CancelToken()
+        self.signals = TaskSignals()
+    
+    def cancel(self):
+        """Drop the result: no callback fires after this, even if the function runs to the end"""
+        self.token.cancel()
+    
+    def cancelled(self) -> bool:
+        return self.token.cancelled()
+    
+    def run(self):
+        if self.token.cancelled():  # Cancelled while still queued
+            self.signals.done.emit()
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.token.cancelled():
+                self.signals.failed.emit(str(e))
+        else:
+            if not self.token.cancelled():
+                self.signals.result_ready.emit(result)
+        finally:
+            self.signals.done.emit()
+
+
+class TaskRunner(QObject):
+    """Shared thread pool for analyses, so dialogs open at once and fill in as results arrive.
+    
+    submit() runs fn(*args, **kwargs) on a pool thread and calls the given
+    callbacks on the GUI thread; independent tasks run side by side. With
+    report_progress fn also gets a progress(done, total) callback, with
+    cancellable a cancelled() predicate to stop early. Results of tasks given a cache_key
+    (e.g. (name, tree_fingerprint(techs))) are kept and handed back on the
+    next submit with the same key without running fn again.
+    """
+    
+    CACHE_SIZE = 32
+    _instance: Optional['TaskRunner'] = None
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        # Tasks mostly wait on the GIL, files or process pools; a few extra threads keep short ones from queueing
+        self.pool.setMaxThreadCount(max(4, QThread.idealThreadCount()))
+        self._cache: 'OrderedDict[tuple, object]' = OrderedDict()
+        self._tasks: Set[Task] = set()
+    
+    @classmethod
+    def instance(cls) -> 'TaskRunner':
+        if cls._instance is None:
+            app = QApplication.instance()
+            cls._instance = TaskRunner(app)
+            app.aboutToQuit.connect(cls._instance.shutdown)
+        return cls._instance
+    
+    def submit(self, fn: Callable, *args, cache_key: Optional[tuple] = None,
+               report_progress: bool = False, cancellable: bool = False,
+               on_result: Optional[Callable[[object], None]] = None,
+               on_error: Optional[Callable[[str], None]] = None,
+               on_progress: Optional[Callable[[int, int], None]] = None,
+               on_done: Optional[Callable[[], None]] = None, **kwargs) -> Task:
+        """Queue fn; callbacks run on the GUI thread, on_done last and always, unless the task is cancelled"""
+        task = Task(fn, args, kwargs, cache_key)
+        if report_progress:
+            kwargs['progress'] = task.signals.progress.emit
+        if cancellable:
+            kwargs['cancelled'] = task.token.cancelled
+        
+        def deliver(result):
+            if task.cache_key is not None:
+                self._remember(task.cache_key, result)
+            if on_result and not task.cancelled():
+                on_result(result)
+        
+        def finish():
+            self._tasks.discard(task)
+            if on_done and not task.cancelled():
+                on_done()
+        
+        task.signals.result_ready.connect(deliver)
+        task.signals.done.connect(finish)
+        if on_error:
+            task.signals.failed.connect(lambda msg: None if task.cancelled() else on_error(msg))
+        if on_progress:
+            task.signals.progress.connect(lambda done, total: None if task.cancelled() else on_progress(done, total))
+        self._tasks.add(task)
+        
+        if cache_key is not None and cache_key in self._cache:
+            # Answer from the cache on the next event loop turn, like a task that finished at once
+            self._cache.move_to_end(cache_key)
+            result = self._cache[cache_key]
+            QTimer.singleShot(0, lambda: (deliver(result), finish()))
+        else:
+            self.pool.start(task)
+        return task
+    
+    def _remember(self, key: tuple, result):
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    def clear_cache(self):
+        self._cache.clear()
+    
+    def shutdown(self):
+        """Cancel everything and wait for running tasks, so no thread outlives the interpreter"""
+        for task in list(self._tasks):
+            task.cancel()
+        self.pool.clear()
+        self.pool.waitForDone()
+
+
+class ForceLayoutWorker(QThread):
+    """Runs ForceLayoutEngine.iterate off the GUI thread, streaming frames"""
+    
+    frame_ready = pyqtSignal(object)   # Dict[int, Tuple[float, float]]
+    layout_ready = pyqtSignal(object)  # Final LayoutResult
+    
+    def __init__(self, engine: ForceLayoutEngine, techs: Dict[int, TechData],
+                 seed: LayoutResult, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.techs = techs
+        self.seed = seed
+    
+    def run(self):
+        positions = None
+        for positions in self.engine.iterate(self.techs, self.seed, cancelled=self.isInterruptionRequested):
+            self.frame_ready.emit(positions)
+        
+        if positions is not None and not self.isInterruptionRequested():
+            self.layout_ready.emit(self.engine.build_result(self.seed, positions))
+
+
 # =============================================================================
 # TECH TREE VIEW
 # =============================================================================
@@ -1726,10 +1160,14 @@ class TechTreeView(QGraphicsView):
     viewport_changed = pyqtSignal(QRectF)
     tech_selected = pyqtSignal(object)
     tech_double_clicked = pyqtSignal(object)
+    rebuild_profiled = pyqtSignal(object)
+    
+    LAYOUT_CACHE_SIZE = 16
+    MIN_CLUSTER_SIZE = 3
     
     def __init__(self):
         super().__init__()
-        self.scene = QGraphicsScene()
+        self.scene = QGraphicsScene(self)  # Owned by the view, so it cannot be deleted first at exit
         self.setScene(self.scene)
         
         self.setRenderHint(QPainter.Antialiasing)
@@ -1743,11 +1181,16 @@ class TechTreeView(QGraphicsView):
         self.techs: Dict[int, TechData] = {}
         self.nodes: Dict[int, TechNode] = {}
         self.connections: List[ConnectionLine] = []
-        self.cluster_backgrounds: List[ClusterBackground] = []
+        self.cluster_backgrounds: Dict[int, ClusterBackground] = {}
+        self._visible_clusters: Set[int] = set()
+        self.cluster_index = SpatialGrid()
+        self.show_clusters = True
         
         self.category_filter = 0
         self.search_filter = ""
         self.effect_filter = 0
+        self.effect_index = EffectIndex({})
+        self.timeline_band = ''
         self.highlighted_chain: Set[int] = set()
         
         self._zoom = 1.0
@@ -1755,20 +1198,32 @@ class TechTreeView(QGraphicsView):
         # Layout engines
         self.layout_engines = {
             'grid': GridLayoutEngine(),
-            'sugiyama': SugiyamaLayoutEngine(use_tech_level_as_layer=True),
+            'sugiyama': SugiyamaLayoutEngine(use_tech_level_as_layer=True,
+                                             cluster_engine=CommunityClusterEngine()),
         }
+        self.layout_engines['force'] = ForceLayoutEngine(seed_engine=self.layout_engines['sugiyama'])
         self.current_layout = 'grid'
+        self._layout_cache: Dict[tuple, LayoutResult] = {}
+        
+        # Stage timings of the last rebuild (see PerfDebugDialog)
+        self.profiler = PerfRecorder()
+        
+        # Progressive force layout running in the background
+        self._force_worker: Optional[ForceLayoutWorker] = None
+        self._force_seed: Optional[LayoutResult] = None
         
         # Animator per chain highlight
         self.animator = ChainAnimator(self)
         
-        # Timer per aggiornare minimap
-        self._viewport_timer = QTimer()
+        # Timer per aggiornare minimap (owned by the view: it must not fire once the scene is gone)
+        self._viewport_timer = QTimer(self)
         self._viewport_timer.timeout.connect(self._emit_viewport_update)
         self._viewport_timer.setInterval(100)
     
-    def load_data(self, techs: Dict[int, TechData]):
+    def load_data(self, techs: Dict[int, TechData], effect_index: Optional[EffectIndex] = None):
         self.techs = techs
+        self.effect_index = effect_index or EffectIndex(techs)
+        self._layout_cache.clear()
         self.rebuild()
     
     def set_layout_engine(self, engine_name: str):
@@ -1778,13 +1233,31 @@ class TechTreeView(QGraphicsView):
             self.rebuild()
     
     def rebuild(self):
-        self.scene.clear()
-        self.nodes.clear()
-        self.connections.clear()
-        self.cluster_backgrounds.clear()
+        prof = self.profiler
+        prof.reset()
+        prof.meta.update(layout=self.current_layout, category=self.category_filter, techs=len(self.techs))
+        
+        with prof.profile(), prof.stage('rebuild'):
+            self._rebuild(prof)
+        
+        prof.meta['nodes'] = len(self.nodes)
+        self.rebuild_profiled.emit(prof)
+    
+    def _rebuild(self, prof: PerfRecorder):
+        self._stop_force_worker()
+        
+        with prof.stage('clear'):
+            # Drop references first: scene.clear() can scroll and trigger viewport updates
+            self.nodes.clear()
+            self.connections.clear()
+            self.cluster_backgrounds.clear()
+            self._visible_clusters = set()
+            self.cluster_index = SpatialGrid()
+            self.scene.clear()
         
         # Apply filters
-        filtered = self._apply_filters()
+        with prof.stage('filters'):
+            filtered = self._apply_filters()
         
         if not filtered:
             text = self.scene.addText("No technologies match current filters", 
@@ -1794,79 +1267,137 @@ class TechTreeView(QGraphicsView):
         
         self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         
-        # Layout nodes 
-        if self.current_layout == 'sugiyama':
-            self._layout_nodes_sugiyama(filtered)
-        else:
-            self._layout_nodes_grid(filtered)
+        # Layout nodes
+        with prof.stage('layout'):
+            layout = self._compute_layout(filtered)
+        with prof.stage('nodes'):
+            self._place_nodes(layout, filtered)
         
         # Draw connections
-        self._draw_connections(filtered)
+        with prof.stage('connections'):
+            self._draw_connections(filtered)
         
         # Apply highlighting
-        self._apply_highlighting()
+        with prof.stage('highlight'):
+            self._apply_highlighting()
         
-        self.scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
-        self.scene.setSceneRect(self.scene.itemsBoundingRect().adjusted(-100, -100, 100, 100))
+        with prof.stage('bsp_index'):
+            self.scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+            self.scene.setSceneRect(self.scene.itemsBoundingRect().adjusted(-100, -100, 100, 100))
+        self._cull_to_viewport()
         
         # Avvia viewport tracking per minimap
         self._viewport_timer.start()
-    
-    def _layout_nodes_grid(self, techs: Dict[int, TechData]):
-        """Layout GRID originale - per anno/tech_level"""
-        by_level = defaultdict(list)
-        for tech in techs.values():
-            by_level[tech.tech_level].append(tech)
         
-        H_SPACE = 320  
-        V_SPACE = 130
-        TOP_MARGIN = 120 
-        
-        col = 0
-        count = 0
-        level_x_positions = {}
-        max_rows = 0 
+        if self._force_seed is not None:
+            self._start_force_worker(self._force_seed)
+    
+    def _layout_key(self, name: str) -> tuple:
+        """Cache key: grid depends on every filter, the others only on category"""
+        if name == 'grid':
+            return (name, self.category_filter, self.search_filter, self.effect_filter)
+        return (name, self.category_filter)
+    
+    def _compute_layout(self, filtered: Dict[int, TechData], name: Optional[str] = None) -> LayoutResult:
+        """Run (or reuse) a layout engine, the current one by default"""
+        name = name or self.current_layout
+        self._force_seed = None
+        
+        key = self._layout_key(name)
+        if key in self._layout_cache:
+            self.profiler.meta['layout_cached'] = True
+            return self._layout_cache[key]
+        
+        if name == 'force':
+            # Show the hierarchical seed now, stream the force layout on top of it
+            seed = self._compute_layout(filtered, 'sugiyama')
+            self._force_seed = seed
+            return seed
+        
+        # Grid packs only the visible techs; hierarchical keeps positions
+        # stable while searching and lays out the whole category
+        source = filtered if name == 'grid' else self.techs
+        engine = self.layout_engines[name]
+        previous, engine.profiler = engine.profiler, self.profiler
+        try:
+            layout = engine.compute(source, self.category_filter)
+        finally:
+            engine.profiler = previous
         
-        for level in sorted(by_level.keys()):
-            level_techs = sorted(by_level[level], key=lambda t: (t.category, t.id))
-            
-            center_x = 50 + col * H_SPACE + (TechNode.WIDTH / 2)
-            level_x_positions[level] = center_x
-            
-            if len(level_techs) > max_rows:
-                max_rows = len(level_techs)
-            
-            for row, tech in enumerate(level_techs):
-                x = 50 + col * H_SPACE
-                y = TOP_MARGIN + (row * V_SPACE)
-                
-                node = TechNode(tech, self)
+        self._store_layout(key, layout)
+        return layout
+    
+    def _store_layout(self, key: tuple, layout: LayoutResult):
+        # Search typing produces many one-off grid keys: keep the cache small
+        if len(self._layout_cache) >= self.LAYOUT_CACHE_SIZE:
+            self._layout_cache.pop(next(iter(self._layout_cache)))
+        self._layout_cache[key] = layout
+    
+    # =========================================================================
+    # PROGRESSIVE FORCE LAYOUT
+    # =========================================================================
+    
+    def _start_force_worker(self, seed: LayoutResult):
+        self._force_seed = None
+        worker = ForceLayoutWorker(self.layout_engines['force'], self.techs, seed, self)
+        worker.frame_ready.connect(self._on_force_frame)
+        worker.layout_ready.connect(self._on_force_finished)
+        self._force_worker = worker
+        worker.start()
+    
+    def shutdown(self):
+        """Stop background work before the scene goes away (window closing)"""
+        self._viewport_timer.stop()
+        self._stop_force_worker()
+    
+    def _stop_force_worker(self):
+        worker = self._force_worker
+        if worker is None:
+            return
+        self._force_worker = None
+        worker.frame_ready.disconnect(self._on_force_frame)
+        worker.layout_ready.disconnect(self._on_force_finished)
+        worker.requestInterruption()
+        worker.wait()
+    
+    def _on_force_frame(self, positions: Dict[int, Tuple[float, float]]):
+        if self.sender() is not self._force_worker:
+            return  # Frame from a worker stopped by a rebuild
+        for tid, (x, y) in positions.items():
+            node = self.nodes.get(tid)
+            if node is not None:
                 node.setPos(x, y)
-                self.scene.addItem(node)
-                self.nodes[tech.id] = node
-                
-                count += 1
-                if count % 1000 == 0:
-                    QApplication.processEvents()
-            
-            col += 1
-        
-        # Timeline
-        total_graph_height = TOP_MARGIN + (max_rows * V_SPACE) + 100
-        total_width = 50 + (col * H_SPACE)
-        timeline = TimelineRuler(level_x_positions, total_graph_height, total_width)
-        self.scene.addItem(timeline)
+        self._update_connection_paths()
     
-    def _layout_nodes_sugiyama(self, techs: Dict[int, TechData]):
-        """Layout SUGIYAMA gerarchico con cluster visualization"""
-        engine = self.layout_engines['sugiyama']
-        layout = engine.compute(self.techs, self.category_filter)
+    def _on_force_finished(self, layout: LayoutResult):
+        if self.sender() is not self._force_worker:
+            return
+        # Snap to the normalized final layout and cache it for the next rebuild
+        self._force_worker = None
+        self._store_layout(self._layout_key('force'), layout)
         
+        for tid, pos in layout.positions.items():
+            node = self.nodes.get(tid)
+            if node is not None:
+                node.setPos(pos.x, pos.y)
+        self._update_connection_paths()
+        if self.show_clusters and layout.clusters:
+            self._draw_cluster_backgrounds(layout)
+        self._add_timeline(layout, {tid: node.tech for tid, node in self.nodes.items()})
+        self.scene.setSceneRect(self.scene.itemsBoundingRect().adjusted(-100, -100, 100, 100))
+        self._cull_to_viewport()
+    
+    def _place_nodes(self, layout: LayoutResult, techs: Dict[int, TechData]):
+        """Create a TechNode for every laid out tech that passes the filters"""
         if not layout.positions:
             return
         
+        # A force seed is about to move: its backgrounds and timeline would be stale
+        streaming = self._force_seed is not None
+        
         #  cluster backgrounds 
-        #self._draw_cluster_backgrounds(layout)
+        if self.show_clusters and layout.clusters and not streaming:
+            self._draw_cluster_backgrounds(layout)
         
         # nodes
         count = 0
@@ -1874,8 +1405,7 @@ class TechTreeView(QGraphicsView):
             if tid not in techs:
                 continue
             
-            tech = techs[tid]
-            node = TechNode(tech, self)
+            node = TechNode(techs[tid], self)
             node.setPos(pos.x, pos.y)
             node.cluster_id = pos.cluster_id  # Save
             self.scene.addItem(node)
@@ -1886,42 +1416,81 @@ class TechTreeView(QGraphicsView):
                 QApplication.processEvents()
         
         # Timeline
-        if layout.layer_positions:
-            timeline = TimelineRuler(
-                layout.layer_positions, 
-                layout.height, 
-                layout.width
-            )
-            self.scene.addItem(timeline)
+        if not streaming:
+            self._add_timeline(layout, techs)
+    
+    def _add_timeline(self, layout: LayoutResult, techs: Dict[int, TechData]):
+        if not layout.layer_positions:
+            return
+        band, band_label = self._timeline_band(techs)
+        timeline = TimelineRuler(
+            layout.layer_positions, 
+            layout.height, 
+            layout.width,
+            band,
+            band_label
+        )
+        self.scene.addItem(timeline)
+    
+    def _timeline_band(self, techs: Dict[int, TechData]) -> Tuple[Dict[int, float], str]:
+        """Cumulative curve of the visible techs for the timeline overlay"""
+        if not self.timeline_band:
+            return {}, ""
+        curves = cumulative_level_curves(techs, self.effect_filter)
+        values = dict(curves.series(self.timeline_band))
+        if not values:
+            return {}, ""
+        total = values[curves.levels[-1]]
+        if self.timeline_band == 'cost':
+            label = f"Cumulative cost: ${total/1e9:.1f}B"
+        elif self.timeline_band == 'time':
+            label = f"Cumulative research time: {total:,.0f} days"
+        else:
+            name = EFFECT_DEFINITIONS.get(self.effect_filter, {'name': 'all effects'})['name']
+            label = f"Cumulative effect ({name}): {total:.2f}"
+        return values, label
     
     def _draw_cluster_backgrounds(self, layout: LayoutResult):
-        for cluster_id, tech_ids in layout.clusters.items():
-            if len(tech_ids) < 3:
+        """Add hidden cluster backgrounds; _cull_to_viewport shows the visible ones once the scene rect is set"""
+        for cluster_id, (x, y, w, h) in layout.cluster_bounds.items():
+            if len(layout.clusters.get(cluster_id, ())) < self.MIN_CLUSTER_SIZE:
                 continue
             
-            positions = [
-                layout.positions[tid] 
-                for tid in tech_ids 
-                if tid in layout.positions
-            ]
-            
-            if not positions:
-                continue
-            
-            min_x = min(p.x for p in positions)
-            min_y = min(p.y for p in positions)
-            max_x = max(p.x for p in positions) + TechNode.WIDTH
-            max_y = max(p.y for p in positions) + TechNode.HEIGHT
-            
-            bounds = QRectF(min_x, min_y, max_x - min_x, max_y - min_y)
             color = layout.cluster_colors.get(cluster_id, '#88888820')
-            
-            bg = ClusterBackground(bounds, color, cluster_id)
-            self.cluster_backgrounds.append(bg)
+            bg = ClusterBackground(QRectF(x, y, w, h), color, cluster_id)
+            bg.setVisible(False)
+            self.cluster_backgrounds[cluster_id] = bg
+            self.cluster_index.insert(cluster_id, (x, y, w, h))
             self.scene.addItem(bg)
     
+    def _cull_to_viewport(self):
+        self._cull_cluster_backgrounds(self.mapToScene(self.viewport().rect()).boundingRect())
+    
+    def _cull_cluster_backgrounds(self, viewport_rect: QRectF):
+        """Toggle only the backgrounds entering or leaving the viewport"""
+        if not self.cluster_backgrounds:
+            return
+        visible = self.cluster_index.query(
+            (viewport_rect.x(), viewport_rect.y(), viewport_rect.width(), viewport_rect.height())
+        )
+        for cluster_id in self._visible_clusters - visible:
+            self.cluster_backgrounds[cluster_id].setVisible(False)
+        for cluster_id in visible - self._visible_clusters:
+            self.cluster_backgrounds[cluster_id].setVisible(True)
+        self._visible_clusters = visible
+    
+    def set_show_clusters(self, show: bool):
+        self.show_clusters = show
+        self.rebuild()
+    
+    def set_timeline_band(self, metric: str):
+        """'' (off), 'cost', 'time' or 'effect'"""
+        self.timeline_band = metric
+        self.rebuild()
+    
     def _apply_filters(self) -> Dict[int, TechData]:
         result = {}
+        effect_techs = self.effect_index.techs_with(self.effect_filter) if self.effect_filter else set()
         for tid, tech in self.techs.items():
             if self.category_filter and tech.category != self.category_filter:
                 continue
@@ -1931,9 +1500,8 @@ class TechTreeView(QGraphicsView):
                 if q not in tech.short_title.lower() and str(tid) != self.search_filter:
                     continue
             
-            if self.effect_filter:
-                if not any(eid == self.effect_filter for eid, _ in tech.effects):
-                    continue
+            if self.effect_filter and tid not in effect_techs:
+                continue
             
             result[tid] = tech
         
@@ -1957,9 +1525,19 @@ class TechTreeView(QGraphicsView):
                     
                     highlight = tid in self.highlighted_chain and prereq_id in self.highlighted_chain
                     line = ConnectionLine(start_pt, end_pt, highlight)
+                    line.prereq_id, line.tech_id = prereq_id, tid
                     self.scene.addItem(line)
                     self.connections.append(line)
     
+    def _update_connection_paths(self):
+        """Re-route existing lines after nodes moved"""
+        half_h = TechNode.HEIGHT / 2
+        for line in self.connections:
+            start = self.nodes[line.prereq_id].pos()
+            end = self.nodes[line.tech_id].pos()
+            line.set_endpoints(QPointF(start.x() + TechNode.WIDTH, start.y() + half_h),
+                               QPointF(end.x(), end.y() + half_h))
+    
     def _apply_highlighting(self):
         for tid, node in self.nodes.items():
             if self.highlighted_chain:
@@ -2072,6 +1650,7 @@ class TechTreeView(QGraphicsView):
     def _emit_viewport_update(self):
         """Emette il rect della viewport corrente per la minimap"""
         viewport_rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        self._cull_cluster_backgrounds(viewport_rect)
         self.viewport_changed.emit(viewport_rect)
     
     def scrollContentsBy(self, dx, dy):
@@ -2135,8 +1714,7 @@ class TechTreeView(QGraphicsView):
             html += "<hr style='border-color: #444;'><div style='color: #58a6ff;'>Effects:</div>"
             for eid, val in tech.effects:
                 eff = EFFECT_DEFINITIONS.get(eid, {'name': f'Effect {eid}', 'icon': '•'})
-                sign = '+' if val >= 0 else ''
-                val_str = f"{sign}{val*100:.0f}%" if abs(val) < 10 else f"{sign}{val:.1f}"
+                val_str = format_effect_value(val)
                 color = '#3fb950' if val >= 0 else '#f85149'
                 html += f"<div style='color: {color};'>{eff['icon']} {eff['name']}: {val_str}</div>"
         
@@ -2155,6 +1733,123 @@ class TechTreeView(QGraphicsView):
         self.highlight_chain_animated(tech.id)
         self.tech_double_clicked.emit(tech)
 
+# =============================================================================
+# TABLE MODELS
+# =============================================================================
+
+class ArrayTableModel(QAbstractTableModel):
+    """Read-only table over a list of row tuples holding raw values.
+    
+    Text, colours and tooltips are produced in data(), i.e. only for the
+    cells a view actually paints; sorting compares the raw values, with
+    numbers as float so mixed int/float columns order correctly.
+    formats maps a column to value -> str, colors a column to
+    source row -> colour name or None, tooltip is source row -> str.
+    """
+    
+    SORT_ROLE = Qt.UserRole
+    
+    def __init__(self, headers: List[str], formats: Optional[Dict[int, Callable]] = None, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.formats = formats or {}
+        self.rows: List[tuple] = []
+        self.colors: Dict[int, Callable[[int], Optional[str]]] = {}
+        self.tooltip: Optional[Callable[[int], str]] = None
+        self._brushes: Dict[str, QBrush] = {}
+    
+    def set_rows(self, rows: List[tuple],
+                 colors: Optional[Dict[int, Callable[[int], Optional[str]]]] = None,
+                 tooltip: Optional[Callable[[int], str]] = None):
+        self.beginResetModel()
+        self.rows = rows
+        self.colors = colors or {}
+        self.tooltip = tooltip
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.headers)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        row, col = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            value = self.rows[row][col]
+            fmt = self.formats.get(col)
+            return fmt(value) if fmt else str(value)
+        if role == self.SORT_ROLE:
+            # QVariant compares int and float by type, not value: sort numbers as float
+            value = self.rows[row][col]
+            return float(value) if isinstance(value, (int, float)) else value
+        if role == Qt.ForegroundRole and col in self.colors:
+            color = self.colors[col](row)
+            if color:
+                if color not in self._brushes:
+                    self._brushes[color] = QBrush(QColor(color))
+                return self._brushes[color]
+            return None
+        if role == Qt.ToolTipRole and self.tooltip:
+            return self.tooltip(row)
+        return None
+
+
+class ArrayTableView(QTreeView):
+    """Flat list over an ArrayTableModel, sortable by any column and filterable through a proxy.
+    
+    Rows keep the model's order until a header is clicked. Row heights are
+    uniform and columns are not sized to contents, so the cost of showing a
+    table does not grow with its length.
+    """
+    
+    def __init__(self, headers: List[str], formats: Optional[Dict[int, Callable]] = None,
+                 stretch_column: Optional[int] = 0, parent=None):
+        super().__init__(parent)
+        self.table = ArrayTableModel(headers, formats, self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.table)
+        self.proxy.setSortRole(ArrayTableModel.SORT_ROLE)
+        self.proxy.setFilterKeyColumn(-1)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setModel(self.proxy)
+        
+        self.setRootIsDecorated(False)
+        self.setUniformRowHeights(True)
+        self.setAlternatingRowColors(True)
+        self.header().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setSortingEnabled(True)
+        if stretch_column is not None:
+            self.header().setSectionResizeMode(stretch_column, QHeaderView.Stretch)
+    
+    def set_rows(self, rows: List[tuple],
+                 colors: Optional[Dict[int, Callable[[int], Optional[str]]]] = None,
+                 tooltip: Optional[Callable[[int], str]] = None):
+        self.table.set_rows(rows, colors, tooltip)
+    
+    def clear(self):
+        self.table.set_rows([])
+
+
+def make_filter_box(views: List[ArrayTableView], placeholder: str = "🔍 Filter rows...") -> QLineEdit:
+    """Line edit that filters every given table on any column as the user types"""
+    edit = QLineEdit()
+    edit.setPlaceholderText(placeholder)
+    edit.setClearButtonEnabled(True)
+    for view in views:
+        edit.textChanged.connect(view.proxy.setFilterFixedString)
+    return edit
+
+
+# Old values red, new values green in the ID/Name/Field/Old/New change tables
+CHANGE_COLORS = {3: lambda r: COLORS['accent_red'], 4: lambda r: COLORS['accent_green']}
+
+
 # =============================================================================
 # SIDE PANELS
 # =============================================================================
@@ -2167,6 +1862,7 @@ class TechDetailPanel(QWidget):
     def __init__(self):
         super().__init__()
         self.techs: Dict[int, TechData] = {}
+        self.unit_index: Optional[UnitIndex] = None
         self._setup_ui()
     
     def _setup_ui(self):
@@ -2281,7 +1977,7 @@ class TechDetailPanel(QWidget):
         units_layout.setContentsMargins(0, 15, 0, 0)
         
         self.units_tree = QTreeWidget()
-        self.units_tree.setHeaderLabels(["Unit Name", "Class", "Cost"])
+        self.units_tree.setHeaderLabels(["Unit Name", "Class", "Year", "Cost"])
         self.units_tree.setAlternatingRowColors(True)
         self.units_tree.setRootIsDecorated(False)
         self.units_tree.setMinimumHeight(300)
@@ -2290,6 +1986,7 @@ class TechDetailPanel(QWidget):
         header.setSectionResizeMode(0, QHeaderView.Stretch)
         header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
         header.setDefaultAlignment(Qt.AlignLeft)
         
         units_layout.addWidget(self.units_tree)
@@ -2301,8 +1998,9 @@ class TechDetailPanel(QWidget):
         scroll.setWidget(content)
         layout.addWidget(scroll)
 
-    def set_techs(self, techs: Dict[int, TechData]):
+    def set_techs(self, techs: Dict[int, TechData], unit_index: Optional[UnitIndex] = None):
         self.techs = techs
+        self.unit_index = unit_index
     
     def show_tech(self, tech: TechData):
         cat = CATEGORIES.get(tech.category, {'name': '?', 'icon': '?', 'color': '#888'})
@@ -2344,8 +2042,7 @@ class TechDetailPanel(QWidget):
         self.effects_list.clear()
         for eid, val in tech.effects:
             eff = EFFECT_DEFINITIONS.get(eid, {'name': f'Effect {eid}', 'icon': '•', 'category': '?'})
-            sign = '+' if val >= 0 else ''
-            val_str = f"{sign}{val*100:.0f}%" if abs(val) < 10 else f"{sign}{val:.1f}"
+            val_str = format_effect_value(val)
             
             item = QListWidgetItem(f"  {eff['icon']} {eff['name']}: {val_str}")
             color = COLORS['accent_green'] if val >= 0 else COLORS['accent_red']
@@ -2357,13 +2054,15 @@ class TechDetailPanel(QWidget):
         
         # Units
         self.units_tree.clear()
-        for unit in tech.unlocks_units:
+        units = self.unit_index.for_tech(tech.id) if self.unit_index else tech.unlocks_units
+        for unit in units:
             cls = CLASS_INFO.get(unit.class_num, {'name': f'{unit.class_num}', 'icon': '?'})
             cost_str = f"${unit.cost/1e6:.1f}M" if unit.cost else "-"
             
             item = QTreeWidgetItem([
                 f"  {unit.name}",
                 f"{cls['icon']} {cls['name']}",
+                unit.year or "-",
                 cost_str
             ])
             self.units_tree.addTopLevelItem(item)
@@ -2421,6 +2120,10 @@ class AnalysisPanel(QWidget):
         super().__init__()
         self.techs: Dict[int, TechData] = {}
         self.units: Dict[int, UnitData] = {}
+        self.ttrx_path = ""
+        self.effect_index = EffectIndex({})
+        self._reach: Optional[ReachabilityIndex] = None
+        self._validation_task: Optional[Task] = None
         self._setup_ui()
     
     def _setup_ui(self):
@@ -2456,9 +2159,7 @@ class AnalysisPanel(QWidget):
         cat_group = QGroupBox("Category Distribution")
         cat_layout = QVBoxLayout(cat_group)
         cat_layout.setContentsMargins(8, 16, 8, 8)
-        self.cat_tree = QTreeWidget()
-        self.cat_tree.setHeaderLabels(["Category", "Count", "With Units", "Effects"])
-        self.cat_tree.setAlternatingRowColors(True)
+        self.cat_tree = ArrayTableView(["Category", "Count", "With Units", "Effects"], stretch_column=None)
         self.cat_tree.setMinimumHeight(180)
         cat_layout.addWidget(self.cat_tree)
         overview_layout.addWidget(cat_group)
@@ -2479,26 +2180,66 @@ class AnalysisPanel(QWidget):
             self.effect_combo.addItem(f"{info['icon']} {info['name']}", eid)
         effects_layout.addWidget(self.effect_combo)
         
-        self.effect_results = QTreeWidget()
-        self.effect_results.setHeaderLabels(["Tech", "Value", "Category"])
-        self.effect_results.setAlternatingRowColors(True)
+        self.effect_results = ArrayTableView(["Tech", "Value", "Chain Total", "Category"],
+                                             formats={1: format_effect_value, 2: format_effect_value})
         self.effect_results.setMinimumHeight(200)
-        self.effect_results.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        effects_layout.addWidget(make_filter_box([self.effect_results], "🔍 Filter techs..."))
         effects_layout.addWidget(self.effect_results)
         
+        self.effect_chart = MiniChartWidget()
+        self.effect_chart.setToolTip("Cumulative effect available by year (tech level)")
+        effects_layout.addWidget(self.effect_chart)
+        
         self.effect_combo.currentIndexChanged.connect(self._on_effect_selected)
         
         tabs.addTab(effects, "⚡ Effect Finder")
         
+        # Cumulative curves tab
+        curves = QWidget()
+        curves_layout = QVBoxLayout(curves)
+        curves_layout.setContentsMargins(8, 8, 8, 8)
+        curves_layout.setSpacing(8)
+        
+        curves_form = QGridLayout()
+        self.curve_metric = QComboBox()
+        self.curve_metric.addItem("💰 Research Cost", 'cost')
+        self.curve_metric.addItem("⏱️ Research Time", 'time')
+        self.curve_metric.addItem("⚡ Effect Value", 'effect')
+        self.curve_category = QComboBox()
+        self.curve_category.addItem("All Categories", 0)
+        for cid, info in CATEGORIES.items():
+            self.curve_category.addItem(f"{info['icon']} {info['name']}", cid)
+        self.curve_effect = QComboBox()
+        self.curve_effect.addItem("All effects (magnitude)", 0)
+        for eid, info in sorted(EFFECT_DEFINITIONS.items(), key=lambda x: x[1]['name']):
+            self.curve_effect.addItem(f"{info['icon']} {info['name']}", eid)
+        curves_form.addWidget(QLabel("Metric:"), 0, 0)
+        curves_form.addWidget(self.curve_metric, 0, 1)
+        curves_form.addWidget(QLabel("Category:"), 1, 0)
+        curves_form.addWidget(self.curve_category, 1, 1)
+        curves_form.addWidget(QLabel("Effect:"), 2, 0)
+        curves_form.addWidget(self.curve_effect, 2, 1)
+        curves_layout.addLayout(curves_form)
+        
+        self.curve_chart = MiniChartWidget()
+        self.curve_chart.setMinimumHeight(220)
+        curves_layout.addWidget(self.curve_chart)
+        curves_layout.addStretch()
+        
+        for combo in (self.curve_metric, self.curve_category, self.curve_effect):
+            combo.currentIndexChanged.connect(self._refresh_curves)
+        
+        tabs.addTab(curves, "📈 Curves")
+        
         # Validation tab
         validation = QWidget()
         validation_layout = QVBoxLayout(validation)
         validation_layout.setContentsMargins(8, 8, 8, 8)
         validation_layout.setSpacing(8)
         
-        validate_btn = QPushButton("🔍 Run Validation")
-        validate_btn.clicked.connect(self._run_validation)
-        validation_layout.addWidget(validate_btn)
+        self.validate_btn = QPushButton("🔍 Run Validation")
+        self.validate_btn.clicked.connect(self._run_validation)
+        validation_layout.addWidget(self.validate_btn)
         
         self.validation_results = QTextEdit()
         self.validation_results.setReadOnly(True)
@@ -2532,10 +2273,15 @@ class AnalysisPanel(QWidget):
         card.value_label = val
         return card
     
-    def update_data(self, techs: Dict[int, TechData], units: Dict[int, UnitData]):
+    def update_data(self, techs: Dict[int, TechData], units: Dict[int, UnitData], ttrx_path: str = "",
+                    effect_index: Optional[EffectIndex] = None):
         self.techs = techs
         self.units = units
+        self.ttrx_path = ttrx_path
+        self.effect_index = effect_index or EffectIndex(techs)
+        self._reach = None
         self._refresh_stats()
+        self._refresh_curves()
     
     def _refresh_stats(self):
         # Basic stats
@@ -2553,7 +2299,6 @@ class AnalysisPanel(QWidget):
             self.orphan_count.value_label.setStyleSheet(f"color: {COLORS['accent_green']}; font-size: 24px; font-weight: bold;")
         
         # Category breakdown
-        self.cat_tree.clear()
         cat_stats = defaultdict(lambda: {'count': 0, 'with_units': 0, 'effects': 0})
         
         for tech in self.techs.values():
@@ -2562,99 +2307,280 @@ class AnalysisPanel(QWidget):
                 cat_stats[tech.category]['with_units'] += 1
             cat_stats[tech.category]['effects'] += len(tech.effects)
         
+        rows = []
         for cat_id, stats in sorted(cat_stats.items()):
             cat = CATEGORIES.get(cat_id, {'name': f'Category {cat_id}', 'icon': '?'})
-            item = QTreeWidgetItem([
-                f"  {cat['icon']} {cat['name']}",
-                str(stats['count']),
-                str(stats['with_units']),
-                str(stats['effects'])
-            ])
-            self.cat_tree.addTopLevelItem(item)
+            rows.append((f"  {cat['icon']} {cat['name']}", stats['count'], stats['with_units'], stats['effects']))
+        self.cat_tree.set_rows(rows)
+    
+    def _refresh_curves(self):
+        metric = self.curve_metric.currentData()
+        category = self.curve_category.currentData()
+        curves = cumulative_level_curves(self.techs, self.curve_effect.currentData())
+        self.curve_chart.set_series(
+            [(1900 + level, value) for level, value in curves.series(metric, category)],
+            f"Cumulative {self.curve_metric.currentText().split(' ', 1)[1].lower()} by year"
+        )
     
     def _on_effect_selected(self, index):
         eff_id = self.effect_combo.itemData(index)
         self.effect_results.clear()
         
         if not eff_id:
+            self.effect_chart.set_series([], "")
             return
         
-        results = find_techs_by_effect(eff_id, self.techs)
+        results = find_techs_by_effect(eff_id, self.techs, self.effect_index)
+        if self._reach is None:
+            self._reach = ReachabilityIndex(self.techs)
+        chain_totals = self.effect_index.chain_totals(eff_id, self._reach)
         
+        rows = []
         for tid, val in results:
             tech = self.techs[tid]
             cat = CATEGORIES.get(tech.category, {'name': '?', 'icon': '?'})
-            
-            sign = '+' if val >= 0 else ''
-            val_str = f"{sign}{val*100:.0f}%" if abs(val) < 10 else f"{sign}{val:.1f}"
-            
-            item = QTreeWidgetItem([
-                f"  {tech.short_title} (ID: {tid})",
-                val_str,
-                f"{cat['icon']} {cat['name']}"
-            ])
-            
-            color = COLORS['accent_green'] if val >= 0 else COLORS['accent_red']
-            item.setForeground(1, QBrush(QColor(color)))
-            
-            self.effect_results.addTopLevelItem(item)
+            rows.append((f"  {tech.short_title} (ID: {tid})", val, chain_totals[tid], f"{cat['icon']} {cat['name']}"))
+        self.effect_results.set_rows(rows, colors={
+            1: lambda r: COLORS['accent_green'] if rows[r][1] >= 0 else COLORS['accent_red']
+        })
+        
+        name = EFFECT_DEFINITIONS.get(eff_id, {'name': f'Effect {eff_id}'})['name']
+        self.effect_chart.set_series(
+            [(1900 + level, cumulative) for level, _, cumulative in self.effect_index.totals_by_level(eff_id)],
+            f"{name}: cumulative by year"
+        )
     
     def _run_validation(self):
+        if self._validation_task is not None:
+            return
+        
+        self.validate_btn.setEnabled(False)
+        self.validation_results.setText(f"Validating {len(self.techs)} techs...")
+        
+        self._validation_task = TaskRunner.instance().submit(
+            validate_tech_tree, self.techs, self.units, self.ttrx_path,
+            on_result=self._show_validation,
+            on_error=lambda msg: self.validation_results.setText(f"❌ Validation failed: {msg}"),
+            on_done=self._on_validation_finished
+        )
+    
+    def _on_validation_finished(self):
+        self._validation_task = None
+        self.validate_btn.setEnabled(True)
+    
+    def _tech_label(self, tid: int) -> str:
+        tech = self.techs.get(tid)
+        return f"Tech {tid} ({tech.short_title})" if tech else f"Tech {tid}"
+    
+    def _show_validation(self, report: ValidationReport):
+        max_listed = 20
         lines = ["=" * 50, "TECH TREE VALIDATION REPORT", "=" * 50, ""]
         
-        # Check orphan techs
-        orphans = find_orphan_techs(self.techs)
-        if orphans:
-            lines.append(f"⚠️  BROKEN PREREQUISITE LINKS: {len(orphans)}")
-            for tid, missing_id, field in orphans:
-                tech = self.techs[tid]
-                lines.append(f"   Tech {tid} ({tech.short_title}): {field} references missing tech {missing_id}")
-            lines.append("")
-        else:
-            lines.append("✅ All prerequisite links valid")
+        def section(items, title, ok_text, fmt):
+            if not items:
+                lines.append(f"✅ {ok_text}")
+            else:
+                lines.append(f"⚠️  {title}: {len(items)}")
+                for item in items[:max_listed]:
+                    lines.append(f"   {fmt(item)}")
+                if len(items) > max_listed:
+                    lines.append(f"   ... and {len(items) - max_listed} more")
             lines.append("")
         
-        # Check for cycles (basic)
-        lines.append("Checking for circular dependencies...")
-        cycles_found = False
-        for tid, tech in self.techs.items():
-            chain = get_full_prereq_chain(tid, self.techs)
-            if tid in chain:
-                lines.append(f"⚠️  CYCLE DETECTED: Tech {tid} ({tech.short_title})")
-                cycles_found = True
-        
-        if not cycles_found:
-            lines.append("✅ No circular dependencies found")
-        lines.append("")
-        
-        # Unlinked units
-        unlinked_units = [u for u in self.units.values() if u.req_tech_id and u.req_tech_id not in self.techs]
-        if unlinked_units:
-            lines.append(f"⚠️  UNITS WITH MISSING TECH REQUIREMENTS: {len(unlinked_units)}")
-            for u in unlinked_units[:10]:
-                lines.append(f"   Unit {u.id} ({u.name}): requires missing tech {u.req_tech_id}")
-            if len(unlinked_units) > 10:
-                lines.append(f"   ... and {len(unlinked_units) - 10} more")
-            lines.append("")
-        else:
-            lines.append("✅ All unit tech requirements valid")
-            lines.append("")
+        section(report.orphans, "BROKEN PREREQUISITE LINKS", "All prerequisite links valid",
+                lambda o: f"{self._tech_label(o[0])}: {o[2]} references missing tech {o[1]}")
+        section(report.cycles, "CIRCULAR DEPENDENCIES", "No circular dependencies found",
+                lambda c: "Cycle among: " + ", ".join(self._tech_label(t) for t in c))
+        section(report.broken_units, "UNITS WITH MISSING TECH REQUIREMENTS", "All unit tech requirements valid",
+                lambda u: f"Unit {u[0]} ({self.units[u[0]].name}): requires missing tech {u[1]}")
+        section(report.leads_to_mismatches, "LEADS_TO MISMATCHES", "All leads_to links consistent",
+                lambda m: f"{self._tech_label(m[0])}: {m[2]} → {m[1]}: {m[3]}")
+        if self.ttrx_path:
+            section(report.duplicate_ids, "DUPLICATE TECH IDS", "No duplicate tech IDs",
+                    lambda tid: f"ID {tid} defined more than once (last definition wins)")
         
         # Summary
         lines.append("=" * 50)
-        issues = len(orphans) + (1 if cycles_found else 0) + len(unlinked_units)
+        issues = report.issue_count()
         if issues == 0:
             lines.append("✅ VALIDATION PASSED - No issues found")
         else:
             lines.append(f"⚠️  VALIDATION COMPLETE - {issues} issue(s) found")
+        lines.append(f"   ({report.elapsed_ms:.0f} ms)")
         
         self.validation_results.setText("\n".join(lines))
 
 
+class UnitBrowserPanel(QWidget):
+    """Browse units by class, region, year and name"""
+    
+    navigate_to_tech = pyqtSignal(int)
+    
+    MAX_ROWS = 2000
+    
+    def __init__(self):
+        super().__init__()
+        self.techs: Dict[int, TechData] = {}
+        self.unit_index = UnitIndex({})
+        self._setup_ui()
+    
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(8)
+        
+        filters = QGridLayout()
+        self.class_combo = QComboBox()
+        self.class_combo.addItem("All Classes", None)
+        for class_num, info in sorted(CLASS_INFO.items()):
+            self.class_combo.addItem(f"{info['icon']} {info['name']}", class_num)
+        self.region_combo = QComboBox()
+        self.region_combo.addItem("All Regions", None)
+        
+        self.year_from = QSpinBox()
+        self.year_to = QSpinBox()
+        for spin in (self.year_from, self.year_to):
+            spin.setRange(1900, 2200)
+            spin.setSpecialValueText("Any")
+        self.year_from.setValue(1900)
+        self.year_to.setValue(2200)
+        
+        self.name_edit = QLineEdit()
+        self.name_edit.setPlaceholderText("Unit name...")
+        
+        filters.addWidget(QLabel("Class:"), 0, 0)
+        filters.addWidget(self.class_combo, 0, 1, 1, 3)
+        filters.addWidget(QLabel("Region:"), 1, 0)
+        filters.addWidget(self.region_combo, 1, 1, 1, 3)
+        filters.addWidget(QLabel("Years:"), 2, 0)
+        filters.addWidget(self.year_from, 2, 1)
+        filters.addWidget(QLabel("to"), 2, 2)
+        filters.addWidget(self.year_to, 2, 3)
+        filters.addWidget(QLabel("Name:"), 3, 0)
+        filters.addWidget(self.name_edit, 3, 1, 1, 3)
+        layout.addLayout(filters)
+        
+        self.results = QTreeWidget()
+        self.results.setHeaderLabels(["Unit", "Class", "Year", "Region", "Cost", "Unlocked By"])
+        self.results.setAlternatingRowColors(True)
+        self.results.setRootIsDecorated(False)
+        self.results.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.results.itemDoubleClicked.connect(self._on_item_double_clicked)
+        layout.addWidget(self.results)
+        
+        self.count_label = QLabel("")
+        self.count_label.setStyleSheet(f"color: {COLORS['text_secondary']};")
+        layout.addWidget(self.count_label)
+        
+        for combo in (self.class_combo, self.region_combo):
+            combo.currentIndexChanged.connect(self._refresh)
+        for spin in (self.year_from, self.year_to):
+            spin.valueChanged.connect(self._refresh)
+        self.name_edit.textChanged.connect(self._refresh)
+    
+    def set_data(self, techs: Dict[int, TechData], unit_index: UnitIndex):
+        self.techs = techs
+        self.unit_index = unit_index
+        
+        current = self.region_combo.currentData()
+        self.region_combo.blockSignals(True)
+        self.region_combo.clear()
+        self.region_combo.addItem("All Regions", None)
+        for region in unit_index.regions():
+            self.region_combo.addItem(region, region)
+        self.region_combo.setCurrentIndex(max(0, self.region_combo.findData(current)))
+        self.region_combo.blockSignals(False)
+        self._refresh()
+    
+    def _refresh(self):
+        year_from = self.year_from.value()
+        year_to = self.year_to.value()
+        units = self.unit_index.query(
+            class_num=self.class_combo.currentData(),
+            region=self.region_combo.currentData(),
+            year_from=year_from if year_from > self.year_from.minimum() else None,
+            year_to=year_to if year_to < self.year_to.maximum() else None,
+            name=self.name_edit.text().strip()
+        )
+        
+        self.results.clear()
+        for unit in units[:self.MAX_ROWS]:
+            cls = CLASS_INFO.get(unit.class_num, {'name': f'{unit.class_num}', 'icon': '?'})
+            tech = self.techs.get(unit.req_tech_id)
+            item = QTreeWidgetItem([
+                f"  {unit.name}",
+                f"{cls['icon']} {cls['name']}",
+                unit.year or "-",
+                unit.region or "-",
+                f"${unit.cost/1e6:.1f}M" if unit.cost else "-",
+                f"{tech.short_title} (ID: {tech.id})" if tech else "-"
+            ])
+            item.setData(0, Qt.UserRole, unit.req_tech_id if tech else 0)
+            self.results.addTopLevelItem(item)
+        
+        shown = min(len(units), self.MAX_ROWS)
+        self.count_label.setText(f"{len(units)} units" + (f" (showing {shown})" if shown < len(units) else ""))
+    
+    def _on_item_double_clicked(self, item, column):
+        tech_id = item.data(0, Qt.UserRole)
+        if tech_id:
+            self.navigate_to_tech.emit(tech_id)
+
+
 # =============================================================================
 # ADVANCED MODDING TOOLS
 # =============================================================================
 
+class ScheduleTimelineWidget(QWidget):
+    """Per-slot Gantt chart of a ResearchSchedule"""
+    
+    ROW_HEIGHT = 26
+    LABEL_WIDTH = 60
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.techs: Dict[int, TechData] = {}
+        self.schedule: Optional[ResearchSchedule] = None
+        self.critical: Set[int] = set()
+        self.setMinimumHeight(self.ROW_HEIGHT * 2)
+    
+    def set_schedule(self, schedule: ResearchSchedule, techs: Dict[int, TechData]):
+        self.schedule = schedule
+        self.techs = techs
+        self.critical = set(schedule.critical_path)
+        self.setMinimumHeight(self.ROW_HEIGHT * (schedule.slots + 1))
+        self.update()
+    
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(COLORS['bg_dark']))
+        if not self.schedule or not self.schedule.makespan:
+            return
+        
+        scale = (self.width() - self.LABEL_WIDTH - 10) / self.schedule.makespan
+        painter.setFont(QFont("Segoe UI", 8))
+        
+        for slot in range(self.schedule.slots):
+            y = 4 + slot * self.ROW_HEIGHT
+            painter.setPen(QColor(COLORS['text_secondary']))
+            painter.drawText(QRectF(0, y, self.LABEL_WIDTH - 6, self.ROW_HEIGHT - 4),
+                             Qt.AlignRight | Qt.AlignVCenter, f"Slot {slot + 1}")
+        
+        for tid, slot, start, end in self.schedule.entries:
+            tech = self.techs[tid]
+            rect = QRectF(self.LABEL_WIDTH + start * scale, 4 + slot * self.ROW_HEIGHT,
+                          max(1.0, (end - start) * scale), self.ROW_HEIGHT - 6)
+            color = QColor(CATEGORIES.get(tech.category, {'color': '#8b949e'})['color'])
+            painter.setPen(QPen(QColor(COLORS['accent_orange']), 2) if tid in self.critical
+                           else QPen(color.darker(150), 1))
+            painter.setBrush(QBrush(color.darker(120)))
+            painter.drawRect(rect)
+            if rect.width() > 40:
+                painter.setPen(QColor(COLORS['text_primary']))
+                painter.drawText(rect.adjusted(3, 0, -3, 0), Qt.AlignLeft | Qt.AlignVCenter,
+                                 painter.fontMetrics().elidedText(tech.short_title, Qt.ElideRight, int(rect.width()) - 6))
+
+
 class PathFinderDialog(QDialog):
     """Find optimal research path to a target tech"""
     
@@ -2662,7 +2588,7 @@ class PathFinderDialog(QDialog):
         super().__init__(parent)
         self.techs = techs
         self.setWindowTitle("🎯 Optimal Path Finder")
-        self.setMinimumSize(600, 500)
+        self.setMinimumSize(700, 600)
         self._setup_ui()
     
     def _setup_ui(self):
@@ -2678,16 +2604,73 @@ class PathFinderDialog(QDialog):
             self.target_combo.addItem(f"{tech.short_title} (ID: {tid})", tid)
         target_layout.addWidget(self.target_combo, 1)
         
+        add_btn = QPushButton("➕ Add")
+        add_btn.setToolTip("Add the selected tech to the goal list")
+        add_btn.clicked.connect(self._add_target)
+        target_layout.addWidget(add_btn)
+        
+        add_cat_btn = QPushButton("➕ Category")
+        add_cat_btn.setToolTip("Add every tech in the selected tech's category")
+        add_cat_btn.clicked.connect(self._add_category)
+        target_layout.addWidget(add_cat_btn)
+        
         layout.addLayout(target_layout)
         
+        # Goal sets: every tech unlocking a unit class or carrying an effect
+        goal_set_layout = QHBoxLayout()
+        goal_set_layout.addWidget(QLabel("Goal Set:"))
+        self.goal_set_combo = QComboBox()
+        for class_num, info in sorted(CLASS_INFO.items()):
+            self.goal_set_combo.addItem(f"Unit class: {info['name']}", ('class', class_num))
+        for eid, info in sorted(EFFECT_DEFINITIONS.items(), key=lambda x: x[1]['name']):
+            self.goal_set_combo.addItem(f"Effect: {info['icon']} {info['name']}", ('effect', eid))
+        goal_set_layout.addWidget(self.goal_set_combo, 1)
+        
+        add_set_btn = QPushButton("➕ Add Set")
+        add_set_btn.clicked.connect(self._add_goal_set)
+        goal_set_layout.addWidget(add_set_btn)
+        layout.addLayout(goal_set_layout)
+        
+        # Multi-target goals (empty = just the combo selection)
+        goals_layout = QHBoxLayout()
+        self.targets_list = QListWidget()
+        self.targets_list.setMaximumHeight(80)
+        self.targets_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        goals_layout.addWidget(self.targets_list, 1)
+        
+        goal_btns = QVBoxLayout()
+        remove_btn = QPushButton("➖ Remove")
+        remove_btn.clicked.connect(self._remove_targets)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.targets_list.clear)
+        goal_btns.addWidget(remove_btn)
+        goal_btns.addWidget(clear_btn)
+        goal_btns.addStretch()
+        goals_layout.addLayout(goal_btns)
+        layout.addLayout(goals_layout)
+        
         # Options
         options_layout = QHBoxLayout()
         self.optimize_cost = QRadioButton("Minimize Cost")
-        self.optimize_cost.setChecked(True)
+        self.optimize_cost.setToolTip("Cheapest techs first, to get the most out of a budget")
         self.optimize_time = QRadioButton("Minimize Time")
+        self.optimize_time.setToolTip("Longest remaining chain first (critical path)")
+        self.optimize_time.setChecked(True)
         options_layout.addWidget(self.optimize_cost)
         options_layout.addWidget(self.optimize_time)
         options_layout.addStretch()
+        
+        options_layout.addWidget(QLabel("Research slots:"))
+        self.slots_spin = QSpinBox()
+        self.slots_spin.setRange(1, 32)
+        self.slots_spin.setValue(1)
+        options_layout.addWidget(self.slots_spin)
+        
+        options_layout.addWidget(QLabel("Budget ($B, 0 = none):"))
+        self.budget_spin = QDoubleSpinBox()
+        self.budget_spin.setRange(0, 1e6)
+        self.budget_spin.setDecimals(2)
+        options_layout.addWidget(self.budget_spin)
         layout.addLayout(options_layout)
         
         # Calculate button
@@ -2697,85 +2680,146 @@ class PathFinderDialog(QDialog):
         layout.addWidget(calc_btn)
         
         # Results
-        self.results_tree = QTreeWidget()
-        self.results_tree.setHeaderLabels(["Step", "Tech", "Cost", "Time", "Cumulative"])
-        self.results_tree.header().setSectionResizeMode(1, QHeaderView.Stretch)
-        layout.addWidget(self.results_tree)
+        results_tabs = QTabWidget()
+        
+        days = lambda d: f"{d}d"
+        millions = lambda c: f"${c/1e6:.1f}M"
+        self.results_tree = ArrayTableView(["Step", "Tech", "Slot", "Start", "End", "Cost", "Cumulative"],
+                                           formats={3: days, 4: days, 5: millions, 6: millions}, stretch_column=1)
+        results_tabs.addTab(self.results_tree, "📋 Order")
+        
+        self.timeline = ScheduleTimelineWidget()
+        timeline_scroll = QScrollArea()
+        timeline_scroll.setWidgetResizable(True)
+        timeline_scroll.setWidget(self.timeline)
+        results_tabs.addTab(timeline_scroll, "📅 Slot Timeline")
+        
+        billions = lambda c: f"${c/1e9:.2f}B"
+        self.marginal_tree = ArrayTableView(["Target", "Own Chain", "Marginal"], formats={1: billions, 2: billions})
+        self.marginal_tree.setToolTip("Marginal = cost saved by dropping the target, prerequisites shared with other targets excluded")
+        results_tabs.addTab(self.marginal_tree, "💸 Per-Target Cost")
+        
+        layout.addWidget(results_tabs)
         
         # Summary
         self.summary_label = QLabel("")
+        self.summary_label.setWordWrap(True)
         self.summary_label.setStyleSheet(f"color: {COLORS['accent_green']}; font-weight: bold; padding: 10px;")
         layout.addWidget(self.summary_label)
     
-    def _calculate_path(self):
+    def _add_target(self):
+        tid = self.target_combo.currentData()
+        if tid in self.techs:
+            self._add_targets([tid])
+    
+    def _add_targets(self, tids: List[int]):
+        present = {self.targets_list.item(i).data(Qt.UserRole) for i in range(self.targets_list.count())}
+        for tid in tids:
+            if tid not in present:
+                item = QListWidgetItem(f"{self.techs[tid].short_title} (ID: {tid})")
+                item.setData(Qt.UserRole, tid)
+                self.targets_list.addItem(item)
+    
+    def _add_category(self):
+        tid = self.target_combo.currentData()
+        if tid not in self.techs:
+            return
+        category = self.techs[tid].category
+        self._add_targets([other_id for other_id, tech in sorted(self.techs.items()) if tech.category == category])
+    
+    def _add_goal_set(self):
+        kind, key = self.goal_set_combo.currentData()
+        if kind == 'class':
+            self._add_targets(targets_for_unit_class(key, self.techs))
+        else:
+            self._add_targets(targets_for_effect(key, self.techs))
+    
+    def _remove_targets(self):
+        for item in self.targets_list.selectedItems():
+            self.targets_list.takeItem(self.targets_list.row(item))
+    
+    def _targets(self) -> List[int]:
+        if self.targets_list.count():
+            return [self.targets_list.item(i).data(Qt.UserRole) for i in range(self.targets_list.count())]
         tid = self.target_combo.currentData()
-        if not tid or tid not in self.techs:
+        return [tid] if tid in self.techs else []
+    
+    def _calculate_path(self):
+        targets = self._targets()
+        if not targets:
             return
         
-        # Get full prerequisite chain with topological sort
-        chain = self._get_ordered_chain(tid)
+        budget = self.budget_spin.value() * 1e9 or None
+        schedule = schedule_research(
+            targets, self.techs, slots=self.slots_spin.value(), budget=budget,
+            priority='cost' if self.optimize_cost.isChecked() else 'time'
+        )
+        target_set = set(targets)
+        critical = set(schedule.critical_path)
         
-        self.results_tree.clear()
+        rows = []
         total_cost = 0
-        total_time = 0
-        
-        for i, tech_id in enumerate(chain, 1):
+        for i, (tech_id, slot, start, end) in enumerate(schedule.entries, 1):
             tech = self.techs[tech_id]
             total_cost += tech.cost
-            total_time += tech.time_to_research
-            
-            cost_str = f"${tech.cost/1e6:.1f}M"
-            cum_str = f"${total_cost/1e6:.1f}M / {total_time}d"
-            
             cat = CATEGORIES.get(tech.category, {'icon': '?'})
-            item = QTreeWidgetItem([
-                str(i),
-                f"{cat['icon']} {tech.short_title}",
-                cost_str,
-                f"{tech.time_to_research}d",
-                cum_str
-            ])
-            
-            if tech_id == tid:
-                item.setForeground(1, QBrush(QColor(COLORS['accent_green'])))
-                item.setForeground(0, QBrush(QColor(COLORS['accent_green'])))
-            
-            self.results_tree.addTopLevelItem(item)
+            rows.append((i, f"{cat['icon']} {tech.short_title}", slot + 1, start, end, tech.cost, total_cost))
         
-        self.summary_label.setText(
-            f"📊 Total: {len(chain)} techs | 💰 ${total_cost/1e9:.2f}B | ⏱️ {total_time} days ({total_time/365:.1f} years)"
-        )
-    
-    def _get_ordered_chain(self, target_id: int) -> List[int]:
-        """Get prerequisites in research order (topological sort)"""
-        chain = []
-        visited = set()
+        def step_color(r: int) -> Optional[str]:
+            return COLORS['accent_green'] if schedule.entries[r][0] in target_set else None
         
-        def visit(tid):
-            if tid in visited or tid not in self.techs:
-                return
-            visited.add(tid)
-            tech = self.techs[tid]
-            if tech.prereq_1: visit(tech.prereq_1)
-            if tech.prereq_2: visit(tech.prereq_2)
-            chain.append(tid)
+        def tech_color(r: int) -> Optional[str]:
+            tech_id = schedule.entries[r][0]
+            if tech_id in target_set:
+                return COLORS['accent_green']
+            return COLORS['accent_orange'] if tech_id in critical else None
         
-        visit(target_id)
-        return chain
+        self.results_tree.set_rows(rows, colors={0: step_color, 1: tech_color})
+        
+        self.timeline.set_schedule(schedule, self.techs)
+        
+        plan = plan_multi_target(targets, self.techs)
+        self.marginal_tree.set_rows([
+            (f"{self.techs[tid].short_title} (ID: {tid})", plan.standalone_cost[tid], plan.marginal_cost[tid])
+            for tid in sorted(plan.targets, key=lambda t: plan.marginal_cost[t], reverse=True)
+        ])
+        
+        summary = (
+            f"📊 Total: {len(schedule.entries)} techs | 💰 ${schedule.total_cost/1e9:.2f}B | "
+            f"⏱️ {schedule.makespan} days ({schedule.makespan/365:.1f} years) on {schedule.slots} slot(s) | "
+            f"🔥 Critical path: {len(schedule.critical_path)} techs, {schedule.critical_time} days"
+        )
+        if schedule.unscheduled:
+            summary += f"\n⚠️ {len(schedule.unscheduled)} tech(s) not reached (budget cap or circular dependency)"
+        max_listed = 5
+        missed = list(schedule.unscheduled_targets.items())
+        for tid, reason in missed[:max_listed]:
+            title = self.techs[tid].short_title if tid in self.techs else f"Tech {tid}"
+            summary += f"\n   🎯 {title} (ID: {tid}): {reason}"
+        if len(missed) > max_listed:
+            summary += f"\n   ... and {len(missed) - max_listed} more target(s)"
+        self.summary_label.setText(summary)
 
 
 class BalanceAnalyzerDialog(QDialog):
     """Analyze tech tree balance for modders"""
     
-    def __init__(self, techs: Dict[int, TechData], parent=None):
+    def __init__(self, techs: Dict[int, TechData], parent=None, unit_index: Optional[UnitIndex] = None):
         super().__init__(parent)
         self.techs = techs
+        self.unit_index = unit_index
+        self._tasks: List[Task] = []
+        self._pending = 0
+        self._started = 0.0
+        self._report: Optional[BalanceReport] = None  # Last cost analysis, for the CSV export
+        self._export_task: Optional[Task] = None
         self.setWindowTitle("⚖️ Balance Analyzer")
         self.setMinimumSize(800, 600)
         self._setup_ui()
     
     def _setup_ui(self):
         layout = QVBoxLayout(self)
+        millions = lambda c: f"${c/1e6:.0f}M"
         
         # Analysis tabs
         tabs = QTabWidget()
@@ -2784,13 +2828,25 @@ class BalanceAnalyzerDialog(QDialog):
         ratio_tab = QWidget()
         ratio_layout = QVBoxLayout(ratio_tab)
         
-        ratio_layout.addWidget(QLabel("Techs with unusual cost-to-effect ratios (potential balance issues):"))
+        ratio_layout.addWidget(QLabel(
+            f"Robust outliers (|modified z| > {OUTLIER_Z}): cost against its category's cost-by-level curve, "
+            "and value as effects (normalized per effect type) per cost:"
+        ))
         
-        self.ratio_tree = QTreeWidget()
-        self.ratio_tree.setHeaderLabels(["Tech", "Cost", "Effects", "Score", "Assessment"])
-        self.ratio_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.ratio_tree = ArrayTableView(["Tech", "Cost", "Level", "Effect Score", "Z", "Assessment"],
+                                         formats={1: millions, 3: lambda v: f"{v:.2f}", 4: lambda v: f"{v:+.1f}"})
         ratio_layout.addWidget(self.ratio_tree)
         
+        ratio_footer = QHBoxLayout()
+        self.curves_label = QLabel("")
+        self.curves_label.setWordWrap(True)
+        self.curves_label.setStyleSheet(f"color: {COLORS['text_secondary']};")
+        ratio_footer.addWidget(self.curves_label, 1)
+        export_btn = QPushButton("💾 Export CSV...")
+        export_btn.clicked.connect(self._export_balance)
+        ratio_footer.addWidget(export_btn)
+        ratio_layout.addLayout(ratio_footer)
+        
         tabs.addTab(ratio_tab, "💰 Cost Analysis")
         
         # Dead-end techs
@@ -2799,9 +2855,8 @@ class BalanceAnalyzerDialog(QDialog):
         
         deadend_layout.addWidget(QLabel("Techs that lead nowhere (no dependent techs, no unit unlocks):"))
         
-        self.deadend_tree = QTreeWidget()
-        self.deadend_tree.setHeaderLabels(["Tech", "Category", "Level", "Has Effects"])
-        self.deadend_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.deadend_tree = ArrayTableView(["Tech", "Category", "Level", "Has Effects"],
+                                           formats={3: lambda v: "Yes" if v else "No"})
         deadend_layout.addWidget(self.deadend_tree)
         
         tabs.addTab(deadend_tab, "🛑 Dead Ends")
@@ -2810,11 +2865,13 @@ class BalanceAnalyzerDialog(QDialog):
         bottleneck_tab = QWidget()
         bottleneck_layout = QVBoxLayout(bottleneck_tab)
         
-        bottleneck_layout.addWidget(QLabel("Critical techs that many others depend on:"))
+        bottleneck_layout.addWidget(QLabel(
+            "Chokepoint techs: 'Dominates' counts techs whose every prerequisite path runs through them "
+            "(hover a row to list them)."
+        ))
         
-        self.bottleneck_tree = QTreeWidget()
-        self.bottleneck_tree.setHeaderLabels(["Tech", "Dependents", "Total Chain", "Category"])
-        self.bottleneck_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.bottleneck_tree = ArrayTableView(["Tech", "Dominates", "Dependents", "Total Chain", "Criticality", "Category"],
+                                              formats={4: lambda v: f"{v * 100:.1f}%"})
         bottleneck_layout.addWidget(self.bottleneck_tree)
         
         tabs.addTab(bottleneck_tab, "🔗 Bottlenecks")
@@ -2825,160 +2882,243 @@ class BalanceAnalyzerDialog(QDialog):
         
         unit_layout.addWidget(QLabel("Tech cost vs units unlocked (value assessment):"))
         
-        self.unit_tree = QTreeWidget()
-        self.unit_tree.setHeaderLabels(["Tech", "Tech Cost", "Units", "Avg Unit Cost", "Value Score"])
-        self.unit_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.unit_tree = ArrayTableView(["Tech", "Tech Cost", "Units", "Avg Unit Cost", "Value Score"],
+                                        formats={1: millions, 3: lambda v: f"${v/1e6:.1f}M" if v else "-",
+                                                 4: lambda v: f"{v:.2f}"})
         unit_layout.addWidget(self.unit_tree)
         
         tabs.addTab(unit_tab, "🔧 Unit Value")
         
+        layout.addWidget(make_filter_box([self.ratio_tree, self.deadend_tree, self.bottleneck_tree, self.unit_tree],
+                                         "🔍 Filter every tab by tech, category or value..."))
         layout.addWidget(tabs)
         
-        # Analyze button
+        # Analyze button and progress
+        run_layout = QHBoxLayout()
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet(f"color: {COLORS['text_secondary']};")
+        run_layout.addWidget(self.status_label, 1)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setTextVisible(False)
+        run_layout.addWidget(self.progress_bar)
         analyze_btn = QPushButton("🔍 Run Full Analysis")
         analyze_btn.setObjectName("primaryButton")
         analyze_btn.clicked.connect(self._run_analysis)
-        layout.addWidget(analyze_btn)
-        
-        # Auto-run
-        QTimer.singleShot(100, self._run_analysis)
+        run_layout.addWidget(analyze_btn)
+        layout.addLayout(run_layout)
+        
+        # Auto-run: the dialog shows at once and each tab fills when its analysis finishes
+        self._run_analysis()
+    
+    def _analyses(self) -> List[Tuple[str, Callable, Callable, bool]]:
+        """(label, compute, show, cached); compute runs on a pool thread and only reads the tree.
+        Analyses that look at units are not cached: the tree fingerprint does not cover them."""
+        return [
+            ("cost analysis", self._analyze_cost_ratio, self._show_cost_ratio, True),
+            ("dead ends", self._find_dead_ends, self._show_dead_ends, False),
+            ("bottlenecks", self._find_bottlenecks, self._show_bottlenecks, True),
+            ("unit value", self._analyze_unit_value, self._show_unit_value, False),
+        ]
     
     def _run_analysis(self):
-        self._analyze_cost_ratio()
-        self._find_dead_ends()
-        self._find_bottlenecks()
-        self._analyze_unit_value()
-    
-    def _analyze_cost_ratio(self):
-        self.ratio_tree.clear()
-        
-        # Calculate effect scores
-        scores = []
-        for tid, tech in self.techs.items():
-            effect_score = sum(abs(val) for _, val in tech.effects)
-            if tech.cost > 0:
-                ratio = effect_score / (tech.cost / 1e9) if tech.cost > 0 else 0
-                scores.append((tid, tech, effect_score, ratio))
-        
-        # Sort by ratio (high = cheap for effects, low = expensive)
-        scores.sort(key=lambda x: x[3], reverse=True)
-        
-        # Show extremes
-        for tid, tech, effect_score, ratio in scores[:15]:  # Best value
+        self._cancel_tasks()
+        self._started = time.perf_counter()
+        self._pending = len(self._analyses())
+        self.progress_bar.setRange(0, self._pending)
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.status_label.setText(f"Running {self._pending} analyses...")
+        # Hashing a large tree takes tens of ms, so it runs off the GUI thread as well
+        self._tasks = [TaskRunner.instance().submit(
+            tree_fingerprint, self.techs, on_result=self._submit_analyses, on_error=self._on_fingerprint_failed
+        )]
+    
+    def _on_fingerprint_failed(self, msg: str):
+        # None of the analyses were submitted, so no on_done will count _pending down
+        self._pending = 0
+        self.progress_bar.hide()
+        self.status_label.setText(f"❌ Fingerprint failed: {msg}")
+    
+    def _submit_analyses(self, fingerprint: str):
+        runner = TaskRunner.instance()
+        for label, compute, show, cached in self._analyses():
+            self._tasks.append(runner.submit(
+                compute, cache_key=(label, fingerprint) if cached else None, on_result=show,
+                on_error=lambda msg, label=label: self.status_label.setText(f"❌ {label} failed: {msg}"),
+                on_done=self._on_analysis_done
+            ))
+    
+    def _on_analysis_done(self):
+        self._pending -= 1
+        self.progress_bar.setValue(self.progress_bar.maximum() - self._pending)
+        if self._pending == 0:
+            self.progress_bar.hide()
+            if not self.status_label.text().startswith("❌"):
+                self.status_label.setText(f"✅ Done in {(time.perf_counter() - self._started) * 1000:.0f} ms")
+    
+    def _cancel_tasks(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+    
+    def done(self, result: int):
+        self._cancel_tasks()
+        if self._export_task is not None:  # Closed mid-write: the file is still written, the message dropped
+            self._export_task.cancel()
+            self._export_task = None
+        super().done(result)
+    
+    def _analyze_cost_ratio(self) -> BalanceReport:
+        return analyze_balance(self.techs)
+    
+    def _show_cost_ratio(self, report: BalanceReport):
+        self._report = report
+        rows = []
+        for outlier in report.outliers:
+            tech = self.techs[outlier.tech_id]
             cat = CATEGORIES.get(tech.category, {'icon': '?'})
-            item = QTreeWidgetItem([
-                f"{cat['icon']} {tech.short_title} (ID: {tid})",
-                f"${tech.cost/1e6:.0f}M",
-                f"{len(tech.effects)} ({effect_score:.2f})",
-                f"{ratio:.4f}",
-                "🟢 Great Value"
-            ])
-            item.setForeground(4, QBrush(QColor(COLORS['accent_green'])))
-            self.ratio_tree.addTopLevelItem(item)
+            rows.append((f"{cat['icon']} {tech.short_title} (ID: {outlier.tech_id})", tech.cost, tech.tech_level,
+                         report.effect_scores[outlier.tech_id], outlier.score,
+                         f"{'💰' if outlier.kind == 'cost' else '⚡'} {outlier.assessment}"))
+        
+        def assessment_color(r: int) -> str:
+            outlier = report.outliers[r]
+            good = (outlier.kind == 'value') == (outlier.score > 0)
+            return COLORS['accent_green'] if good else COLORS['accent_red']
+        
+        self.ratio_tree.set_rows(rows, colors={5: assessment_color})
+        
+        curves = []
+        for cat_id, (intercept, slope) in sorted(report.cost_curves.items()):
+            name = CATEGORIES.get(cat_id, {'name': f'Category {cat_id}'})['name']
+            curves.append(f"{name}: ×{10 ** slope:.3f}/level")
+        self.curves_label.setText(
+            f"{len(report.outliers)} outliers. Fitted cost growth: " + ", ".join(curves)
+        )
+    
+    def _export_balance(self):
+        if self._report is None:
+            QMessageBox.information(self, "Export Balance Analysis", "The cost analysis is still running.")
+            return
+        if self._export_task is not None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Balance Analysis", "balance.csv", "CSV (*.csv)")
+        if not path:
+            return
         
-        # Separator
-        sep = QTreeWidgetItem(["─" * 20, "─" * 10, "─" * 10, "─" * 10, "─" * 15])
-        self.ratio_tree.addTopLevelItem(sep)
+        def finished():
+            self._export_task = None
         
-        for tid, tech, effect_score, ratio in scores[-15:]:  # Worst value
-            if effect_score == 0:
-                continue
-            cat = CATEGORIES.get(tech.category, {'icon': '?'})
-            item = QTreeWidgetItem([
-                f"{cat['icon']} {tech.short_title} (ID: {tid})",
-                f"${tech.cost/1e6:.0f}M",
-                f"{len(tech.effects)} ({effect_score:.2f})",
-                f"{ratio:.4f}",
-                "🔴 Expensive"
-            ])
-            item.setForeground(4, QBrush(QColor(COLORS['accent_red'])))
-            self.ratio_tree.addTopLevelItem(item)
+        self._export_task = TaskRunner.instance().submit(
+            export_balance_csv, self._report, self.techs, path,
+            on_result=lambda _: QMessageBox.information(self, "Export Complete", f"Exported to:\n{path}"),
+            on_error=lambda msg: QMessageBox.warning(self, "Export Failed", f"{path}\n\n{msg}"),
+            on_done=finished
+        )
     
-    def _find_dead_ends(self):
-        self.deadend_tree.clear()
-        
+    def _find_dead_ends(self) -> List[tuple]:
+        rows = []
         for tid, tech in self.techs.items():
             # Check if it leads nowhere
             if not tech.prerequisite_of and not tech.unlocks_units:
                 cat = CATEGORIES.get(tech.category, {'name': '?', 'icon': '?'})
-                item = QTreeWidgetItem([
-                    f"{cat['icon']} {tech.short_title} (ID: {tid})",
-                    cat['name'],
-                    str(tech.tech_level),
-                    "Yes" if tech.effects else "No"
-                ])
-                if not tech.effects:
-                    item.setForeground(3, QBrush(QColor(COLORS['accent_red'])))
-                self.deadend_tree.addTopLevelItem(item)
-    
-    def _find_bottlenecks(self):
-        self.bottleneck_tree.clear()
-        
-        # Count total descendants for each tech
-        bottlenecks = []
-        for tid, tech in self.techs.items():
-            descendants = get_all_descendants(tid, self.techs)
-            if len(descendants) > 5:  # Significant bottleneck
-                bottlenecks.append((tid, tech, len(tech.prerequisite_of), len(descendants)))
-        
-        # Sort by total chain size
-        bottlenecks.sort(key=lambda x: x[3], reverse=True)
-        
-        for tid, tech, direct, total in bottlenecks[:30]:
-            cat = CATEGORIES.get(tech.category, {'name': '?', 'icon': '?'})
-            item = QTreeWidgetItem([
-                f"{cat['icon']} {tech.short_title} (ID: {tid})",
-                str(direct),
-                str(total),
-                cat['name']
-            ])
-            # Color by importance
-            if total > 50:
-                item.setForeground(2, QBrush(QColor(COLORS['accent_red'])))
-            elif total > 20:
-                item.setForeground(2, QBrush(QColor(COLORS['accent_orange'])))
-            else:
-                item.setForeground(2, QBrush(QColor(COLORS['accent_green'])))
-            
-            self.bottleneck_tree.addTopLevelItem(item)
+                rows.append((f"{cat['icon']} {tech.short_title} (ID: {tid})", cat['name'], tech.tech_level,
+                             bool(tech.effects)))
+        return rows
+    
+    def _show_dead_ends(self, rows: List[tuple]):
+        self.deadend_tree.set_rows(rows, colors={3: lambda r: None if rows[r][3] else COLORS['accent_red']})
+    
+    def _find_bottlenecks(self) -> Tuple[GraphMetrics, List[int], Dict[int, List[int]]]:
+        """Ids only, so the result can be cached per tree fingerprint (titles are read when shown)"""
+        metrics = compute_graph_metrics(self.techs)
+        dominator_children: Dict[int, List[int]] = defaultdict(list)
+        for tid, dom in metrics.idom.items():
+            dominator_children[dom].append(tid)
+        
+        bottlenecks = [
+            tid for tid in metrics.idom
+            if metrics.dominated[tid] > 5 or metrics.descendants[tid] > 5  # Significant bottleneck
+        ]
+        bottlenecks.sort(key=lambda tid: (metrics.dominated[tid], metrics.descendants[tid]), reverse=True)
+        return metrics, bottlenecks, dominator_children
     
-    def _analyze_unit_value(self):
-        self.unit_tree.clear()
+    def _show_bottlenecks(self, result: Tuple[GraphMetrics, List[int], Dict[int, List[int]]]):
+        metrics, bottlenecks, dominator_children = result
+        rows = []
+        for tid in bottlenecks:
+            tech = self.techs[tid]
+            cat = CATEGORIES.get(tech.category, {'name': '?', 'icon': '?'})
+            rows.append((f"{cat['icon']} {tech.short_title} (ID: {tid})", metrics.dominated[tid],
+                         len(tech.prerequisite_of), metrics.descendants[tid], metrics.criticality.get(tid, 0.0),
+                         cat['name']))
         
+        def chain_color(r: int) -> str:
+            # Color by importance
+            total = rows[r][3]
+            return COLORS['accent_red'] if total > 50 else COLORS['accent_orange'] if total > 20 else COLORS['accent_green']
+        
+        def dominated_list(r: int) -> str:
+            # Dominator subtree: every path to these goes through the row's tech
+            dominated = []
+            stack = list(dominator_children.get(bottlenecks[r], ()))
+            while stack:
+                d = stack.pop()
+                dominated.append(d)
+                stack.extend(dominator_children.get(d, ()))
+            if not dominated:
+                return ""
+            dominated.sort(key=lambda d: (self.techs[d].tech_level, d))
+            lines = [f"↳ every path to {self.techs[d].short_title} (ID: {d}) goes through it" for d in dominated[:10]]
+            if len(dominated) > 10:
+                lines.append(f"... and {len(dominated) - 10} more")
+            return "\n".join(lines)
+        
+        self.bottleneck_tree.set_rows(rows, colors={3: chain_color}, tooltip=dominated_list)
+    
+    def _analyze_unit_value(self) -> List[tuple]:
         # Calculate value for techs that unlock units
+        if self.unit_index:
+            unlocks = {tid: self.unit_index.for_tech(tid) for tid in self.unit_index.by_tech if tid in self.techs}
+        else:
+            unlocks = {tid: tech.unlocks_units for tid, tech in self.techs.items() if tech.unlocks_units}
+        
         values = []
-        for tid, tech in self.techs.items():
-            if tech.unlocks_units:
-                total_unit_cost = sum(u.cost for u in tech.unlocks_units)
-                avg_unit_cost = total_unit_cost / len(tech.unlocks_units) if tech.unlocks_units else 0
-                # Value = units unlocked * avg unit cost / tech cost
-                if tech.cost > 0:
-                    value = (len(tech.unlocks_units) * avg_unit_cost) / tech.cost
-                else:
-                    value = float('inf')
-                values.append((tid, tech, avg_unit_cost, value))
+        for tid, units in unlocks.items():
+            tech = self.techs[tid]
+            total_unit_cost = sum(u.cost for u in units)
+            avg_unit_cost = total_unit_cost / len(units)
+            # Value = units unlocked * avg unit cost / tech cost
+            if tech.cost > 0:
+                value = (len(units) * avg_unit_cost) / tech.cost
+            else:
+                value = float('inf')
+            values.append((tid, tech, avg_unit_cost, value))
         
         values.sort(key=lambda x: x[3], reverse=True)
         
-        for tid, tech, avg_cost, value in values[:40]:
+        rows = []
+        for tid, tech, avg_cost, value in values:
             cat = CATEGORIES.get(tech.category, {'icon': '?'})
-            item = QTreeWidgetItem([
-                f"{cat['icon']} {tech.short_title}",
-                f"${tech.cost/1e6:.0f}M",
-                str(len(tech.unlocks_units)),
-                f"${avg_cost/1e6:.1f}M" if avg_cost else "-",
-                f"{value:.2f}"
-            ])
-            self.unit_tree.addTopLevelItem(item)
+            rows.append((f"{cat['icon']} {tech.short_title}", tech.cost, len(unlocks[tid]), avg_cost, value))
+        return rows
+    
+    def _show_unit_value(self, rows: List[tuple]):
+        self.unit_tree.set_rows(rows)
 
 
 class TechDiffDialog(QDialog):
     """Compare two tech tree files"""
     
-    def __init__(self, base_techs: Dict[int, TechData], parent=None):
+    def __init__(self, base_techs: Dict[int, TechData], parent=None,
+                 base_units: Optional[Dict[int, UnitData]] = None):
         super().__init__(parent)
         self.base_techs = base_techs
+        self.base_units = base_units or {}
         self.mod_techs: Dict[int, TechData] = {}
+        self.results: List[ModDiff] = []
+        self._task: Optional[Task] = None
         self.setWindowTitle("📊 Tech Tree Diff Tool")
         self.setMinimumSize(900, 700)
         self._setup_ui()
@@ -2988,10 +3128,11 @@ class TechDiffDialog(QDialog):
         
         # File selection
         file_layout = QHBoxLayout()
-        file_layout.addWidget(QLabel("Compare with MOD file:"))
+        file_layout.addWidget(QLabel("Compare with MOD file(s):"))
         
         self.mod_path_edit = QLineEdit()
-        self.mod_path_edit.setPlaceholderText("Select modded TTRX file...")
+        self.mod_path_edit.setPlaceholderText("Select modded TTRX file(s), separated by ';'...")
+        self.mod_path_edit.setToolTip("A .UNIT file next to each TTRX is compared too")
         file_layout.addWidget(self.mod_path_edit, 1)
         
         browse_btn = QPushButton("...")
@@ -2999,144 +3140,425 @@ class TechDiffDialog(QDialog):
         browse_btn.clicked.connect(self._browse_mod)
         file_layout.addWidget(browse_btn)
         
-        compare_btn = QPushButton("🔍 Compare")
-        compare_btn.setObjectName("primaryButton")
-        compare_btn.clicked.connect(self._run_diff)
-        file_layout.addWidget(compare_btn)
+        self.compare_btn = QPushButton("🔍 Compare")
+        self.compare_btn.setObjectName("primaryButton")
+        self.compare_btn.clicked.connect(self._run_diff)
+        file_layout.addWidget(self.compare_btn)
         
         layout.addLayout(file_layout)
         
+        mod_layout = QHBoxLayout()
+        mod_layout.addWidget(QLabel("Show:"))
+        self.mod_combo = QComboBox()
+        self.mod_combo.currentIndexChanged.connect(self._show_result)
+        mod_layout.addWidget(self.mod_combo, 1)
+        layout.addLayout(mod_layout)
+        
         # Results tabs
         self.tabs = QTabWidget()
         
         # Added techs
-        self.added_tree = QTreeWidget()
-        self.added_tree.setHeaderLabels(["ID", "Name", "Category", "Level", "Cost"])
+        millions = lambda c: f"${c/1e6:.0f}M"
+        self.added_tree = ArrayTableView(["ID", "Name", "Category", "Level", "Cost"], formats={4: millions},
+                                         stretch_column=None)
         self.tabs.addTab(self.added_tree, "➕ Added")
         
         # Removed techs
-        self.removed_tree = QTreeWidget()
-        self.removed_tree.setHeaderLabels(["ID", "Name", "Category", "Level", "Cost"])
+        self.removed_tree = ArrayTableView(["ID", "Name", "Category", "Level", "Cost"], formats={4: millions},
+                                           stretch_column=None)
         self.tabs.addTab(self.removed_tree, "➖ Removed")
         
         # Modified techs
-        self.modified_tree = QTreeWidget()
-        self.modified_tree.setHeaderLabels(["ID", "Name", "Field", "Old Value", "New Value"])
-        self.modified_tree.header().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.modified_tree = ArrayTableView(["ID", "Name", "Field", "Old Value", "New Value"], stretch_column=1)
         self.tabs.addTab(self.modified_tree, "📝 Modified")
         
+        # Units
+        self.units_tree = ArrayTableView(["ID", "Unit", "Field", "Old Value", "New Value"], stretch_column=1)
+        self.tabs.addTab(self.units_tree, "🔧 Units")
+        
+        layout.addWidget(make_filter_box([self.added_tree, self.removed_tree, self.modified_tree, self.units_tree],
+                                         "🔍 Filter by ID, name, field or value..."))
         layout.addWidget(self.tabs)
         
         # Summary
         self.summary_label = QLabel("Load a mod file to compare")
+        self.summary_label.setWordWrap(True)
         self.summary_label.setStyleSheet(f"padding: 10px; background: {COLORS['bg_medium']}; border-radius: 8px;")
         layout.addWidget(self.summary_label)
     
     def _browse_mod(self):
-        path, _ = QFileDialog.getOpenFileName(
-            self, "Select Mod TTRX File", "",
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "Select Mod TTRX File(s)", "",
             "TTRX Files (*.ttrx *.csv);;All Files (*)"
         )
-        if path:
-            self.mod_path_edit.setText(path)
+        if paths:
+            self.mod_path_edit.setText(";".join(paths))
     
     def _run_diff(self):
-        mod_path = self.mod_path_edit.text().strip()
-        if not mod_path:
+        paths = [p.strip() for p in self.mod_path_edit.text().split(";") if p.strip()]
+        if not paths or self._task is not None:
             return
         
-        self.mod_techs = load_tech_tree(mod_path)
-        if not self.mod_techs:
-            QMessageBox.warning(self, "Error", "Failed to load mod file")
+        mods = [(path, find_unit_file(path) if self.base_units else "") for path in paths]
+        self.compare_btn.setEnabled(False)
+        self.summary_label.setText(f"Comparing {len(mods)} mod(s)...")
+        
+        self._task = TaskRunner.instance().submit(
+            diff_mods, self.base_techs, self.base_units, mods, report_progress=True, cancellable=True,
+            on_result=self._on_diff_ready,
+            on_error=lambda msg: QMessageBox.warning(self, "Error", msg),
+            on_progress=lambda done, total: self.summary_label.setText(f"Comparing mod {done + 1} of {total}..."),
+            on_done=self._on_task_finished
+        )
+    
+    def _on_task_finished(self):
+        self._task = None
+        self.compare_btn.setEnabled(True)
+    
+    def done(self, result: int):
+        if self._task is not None:  # Closed mid-run: drop the result instead of filling a hidden dialog
+            self._task.cancel()
+            self._on_task_finished()
+        super().done(result)
+    
+    def _on_diff_ready(self, results: List[ModDiff]):
+        self.results = results
+        failed = [r.error for r in results if r.error]
+        if failed:
+            QMessageBox.warning(self, "Error", "\n".join(failed))
+        
+        self.mod_combo.blockSignals(True)
+        self.mod_combo.clear()
+        for r in results:
+            self.mod_combo.addItem(Path(r.path).name + (" (failed)" if r.error else ""))
+        self.mod_combo.blockSignals(False)
+        self._show_result(0)
+        
+        lines = []
+        for r in results:
+            if r.error:
+                continue
+            line = (f"📊 {Path(r.path).name}: {len(r.mod_techs)} techs | ➕ {len(r.techs.added)} added | "
+                    f"➖ {len(r.techs.removed)} removed | 📝 {len(r.techs.modified)} modified")
+            if r.unit_path:
+                units = r.units
+                line += f" | 🔧 units ±{len(units.added) + len(units.removed)}, 📝 {len(units.modified)}"
+            lines.append(line)
+        self.summary_label.setText("\n".join(lines) or "No mods compared")
+    
+    def _fill_tech_list(self, tree: ArrayTableView, ids: List[int], techs: Dict[int, TechData], color: str):
+        rows = []
+        for tid in ids:
+            tech = techs[tid]
+            cat = CATEGORIES.get(tech.category, {'name': '?', 'icon': '?'})
+            rows.append((tid, f"{cat['icon']} {tech.short_title}", cat['name'], tech.tech_level, tech.cost))
+        tree.set_rows(rows, colors={0: lambda r: color})
+    
+    def _show_result(self, index: int):
+        for tree in (self.added_tree, self.removed_tree, self.modified_tree, self.units_tree):
+            tree.clear()
+        if not (0 <= index < len(self.results)) or self.results[index].error:
             return
         
-        self._compare()
+        result = self.results[index]
+        self.mod_techs = result.mod_techs
+        delta = result.techs
+        
+        self._fill_tech_list(self.added_tree, delta.added, result.mod_techs, COLORS['accent_green'])
+        self._fill_tech_list(self.removed_tree, delta.removed, self.base_techs, COLORS['accent_red'])
+        populate_modified_tree(self.modified_tree, delta.modified, self.base_techs)
+        
+        # Units: added/removed as single rows, modified per field
+        units = result.units
+        rows = [(uid, result.mod_units[uid].name, "(added)", "", "") for uid in units.added]
+        rows += [(uid, self.base_units[uid].name, "(removed)", "", "") for uid in units.removed]
+        rows += [(uid, self.base_units[uid].name, field_name, old, new)
+                 for uid, changes in units.modified.items() for field_name, old, new in changes]
+        self.units_tree.set_rows(rows, colors=CHANGE_COLORS)
+        
+        # Update tabs with counts
+        self.tabs.setTabText(0, f"➕ Added ({len(delta.added)})")
+        self.tabs.setTabText(1, f"➖ Removed ({len(delta.removed)})")
+        self.tabs.setTabText(2, f"📝 Modified ({len(delta.modified)})")
+        unit_changes = len(units.added) + len(units.removed) + len(units.modified)
+        self.tabs.setTabText(3, f"🔧 Units ({unit_changes})" if result.unit_path else "🔧 Units (no .UNIT)")
+
+
+def populate_modified_tree(tree: ArrayTableView, modified: Dict[int, List[Tuple[str, str, str]]],
+                           techs: Dict[int, TechData]):
+    """Fill an ID/Name/Field/Old/New table, one row per changed field; every row names its tech so it sorts"""
+    rows = []
+    for tid, changes in modified.items():
+        tech = techs.get(tid)
+        cat = CATEGORIES.get(tech.category if tech else 0, {'icon': '?'})
+        name = f"{cat['icon']} {tech.short_title if tech else tid}"
+        rows.extend((tid, name, field_name, old, new) for field_name, old, new in changes)
+    tree.set_rows(rows, colors=CHANGE_COLORS)
+
+
+class WhatIfDialog(QDialog):
+    """Try cost/time/prerequisite edits in memory and see the downstream impact"""
+    
+    MAX_ROWS = 500
     
-    def _compare(self):
-        self.added_tree.clear()
-        self.removed_tree.clear()
-        self.modified_tree.clear()
+    def __init__(self, techs: Dict[int, TechData], parent=None):
+        super().__init__(parent)
+        self.techs = techs
+        self.overlay = WhatIfOverlay(techs)
+        self.setWindowTitle("🧪 What-If Simulator")
+        self.setMinimumSize(900, 700)
         
-        base_ids = set(self.base_techs.keys())
-        mod_ids = set(self.mod_techs.keys())
+        # Debounce: recompute once the spin boxes settle
+        self._apply_timer = QTimer(self)
+        self._apply_timer.setSingleShot(True)
+        self._apply_timer.setInterval(150)
+        self._apply_timer.timeout.connect(self._apply_edit)
         
-        added = mod_ids - base_ids
-        removed = base_ids - mod_ids
-        common = base_ids & mod_ids
+        self._setup_ui()
+    
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
         
-        # Added techs
-        for tid in sorted(added):
-            tech = self.mod_techs[tid]
-            cat = CATEGORIES.get(tech.category, {'name': '?', 'icon': '?'})
-            item = QTreeWidgetItem([
-                str(tid),
-                f"{cat['icon']} {tech.short_title}",
-                cat['name'],
-                str(tech.tech_level),
-                f"${tech.cost/1e6:.0f}M"
-            ])
-            item.setForeground(0, QBrush(QColor(COLORS['accent_green'])))
-            self.added_tree.addTopLevelItem(item)
+        # Tech to edit
+        target_layout = QHBoxLayout()
+        target_layout.addWidget(QLabel("Tech:"))
+        self.tech_combo = QComboBox()
+        self.tech_combo.setEditable(True)
+        for tid, tech in sorted(self.techs.items(), key=lambda x: x[1].short_title):
+            self.tech_combo.addItem(f"{tech.short_title} (ID: {tid})", tid)
+        self.tech_combo.currentIndexChanged.connect(self._load_tech_values)
+        target_layout.addWidget(self.tech_combo, 1)
+        layout.addLayout(target_layout)
         
-        # Removed techs
-        for tid in sorted(removed):
-            tech = self.base_techs[tid]
-            cat = CATEGORIES.get(tech.category, {'name': '?', 'icon': '?'})
-            item = QTreeWidgetItem([
-                str(tid),
-                f"{cat['icon']} {tech.short_title}",
-                cat['name'],
-                str(tech.tech_level),
-                f"${tech.cost/1e6:.0f}M"
-            ])
-            item.setForeground(0, QBrush(QColor(COLORS['accent_red'])))
-            self.removed_tree.addTopLevelItem(item)
+        form = QGridLayout()
+        self.cost_spin = QDoubleSpinBox()
+        self.cost_spin.setRange(0, 1e7)
+        self.cost_spin.setDecimals(1)
+        self.cost_spin.setSuffix(" $M")
+        self.time_spin = QSpinBox()
+        self.time_spin.setRange(0, 100000)
+        self.time_spin.setSuffix(" d")
+        self.prereq1_spin = QSpinBox()
+        self.prereq2_spin = QSpinBox()
+        for spin in (self.prereq1_spin, self.prereq2_spin):
+            spin.setRange(0, 999999)
+            spin.setSpecialValueText("None")
+        
+        form.addWidget(QLabel("Cost:"), 0, 0)
+        form.addWidget(self.cost_spin, 0, 1)
+        form.addWidget(QLabel("Research Time:"), 0, 2)
+        form.addWidget(self.time_spin, 0, 3)
+        form.addWidget(QLabel("Prereq 1:"), 1, 0)
+        form.addWidget(self.prereq1_spin, 1, 1)
+        form.addWidget(QLabel("Prereq 2:"), 1, 2)
+        form.addWidget(self.prereq2_spin, 1, 3)
+        layout.addLayout(form)
+        
+        for spin in (self.cost_spin, self.time_spin, self.prereq1_spin, self.prereq2_spin):
+            spin.valueChanged.connect(self._apply_timer.start)
+        
+        btn_layout = QHBoxLayout()
+        revert_btn = QPushButton("↩️ Revert Tech")
+        revert_btn.clicked.connect(self._revert_tech)
+        reset_btn = QPushButton("🗑️ Reset All")
+        reset_btn.clicked.connect(self._reset_all)
+        btn_layout.addWidget(revert_btn)
+        btn_layout.addWidget(reset_btn)
+        btn_layout.addStretch()
+        layout.addLayout(btn_layout)
+        
+        # Impact, shaped like the diff tool's Modified tab
+        self.impact_tree = ArrayTableView(["ID", "Name", "Field", "Old Value", "New Value"], stretch_column=1)
+        layout.addWidget(self.impact_tree)
+        
+        self.summary_label = QLabel("Edit a value to see its impact")
+        self.summary_label.setStyleSheet(f"padding: 10px; background: {COLORS['bg_medium']}; border-radius: 8px;")
+        layout.addWidget(self.summary_label)
         
-        # Modified techs
-        modified_count = 0
-        for tid in sorted(common):
-            base = self.base_techs[tid]
-            mod = self.mod_techs[tid]
-            
-            changes = []
-            if base.cost != mod.cost:
-                changes.append(("Cost", f"${base.cost/1e6:.0f}M", f"${mod.cost/1e6:.0f}M"))
-            if base.time_to_research != mod.time_to_research:
-                changes.append(("Time", f"{base.time_to_research}d", f"{mod.time_to_research}d"))
-            if base.prereq_1 != mod.prereq_1:
-                changes.append(("Prereq 1", str(base.prereq_1), str(mod.prereq_1)))
-            if base.prereq_2 != mod.prereq_2:
-                changes.append(("Prereq 2", str(base.prereq_2), str(mod.prereq_2)))
-            if base.tech_level != mod.tech_level:
-                changes.append(("Level", str(base.tech_level), str(mod.tech_level)))
-            if base.effects != mod.effects:
-                changes.append(("Effects", str(len(base.effects)), str(len(mod.effects))))
-            
-            if changes:
-                modified_count += 1
-                cat = CATEGORIES.get(base.category, {'icon': '?'})
-                
-                for i, (field, old, new) in enumerate(changes):
-                    item = QTreeWidgetItem([
-                        str(tid) if i == 0 else "",
-                        f"{cat['icon']} {base.short_title}" if i == 0 else "",
-                        field,
-                        old,
-                        new
-                    ])
-                    item.setForeground(3, QBrush(QColor(COLORS['accent_red'])))
-                    item.setForeground(4, QBrush(QColor(COLORS['accent_green'])))
-                    self.modified_tree.addTopLevelItem(item)
+        self._load_tech_values()
+    
+    def _load_tech_values(self):
+        tid = self.tech_combo.currentData()
+        if tid not in self.techs:
+            return
+        spins = (self.cost_spin, self.time_spin, self.prereq1_spin, self.prereq2_spin)
+        for spin in spins:
+            spin.blockSignals(True)
+        self.cost_spin.setValue(self.overlay.value(tid, 'cost') / 1e6)
+        self.time_spin.setValue(self.overlay.value(tid, 'time_to_research'))
+        self.prereq1_spin.setValue(self.overlay.value(tid, 'prereq_1'))
+        self.prereq2_spin.setValue(self.overlay.value(tid, 'prereq_2'))
+        for spin in spins:
+            spin.blockSignals(False)
+    
+    def _apply_edit(self):
+        tid = self.tech_combo.currentData()
+        if tid not in self.techs:
+            return
+        tech = self.techs[tid]
         
-        # Update tabs with counts
-        self.tabs.setTabText(0, f"➕ Added ({len(added)})")
-        self.tabs.setTabText(1, f"➖ Removed ({len(removed)})")
-        self.tabs.setTabText(2, f"📝 Modified ({modified_count})")
+        # Keep the exact base cost unless the user actually changed it
+        cost = self.cost_spin.value() * 1e6
+        if round(tech.cost / 1e6, 1) == self.cost_spin.value():
+            cost = tech.cost
         
+        start = time.perf_counter()
+        try:
+            for field_name, value in (('cost', cost), ('time_to_research', self.time_spin.value()),
+                                      ('prereq_1', self.prereq1_spin.value()), ('prereq_2', self.prereq2_spin.value())):
+                if value != self.overlay.value(tid, field_name):
+                    self.overlay.set_edit(tid, field_name, value)
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Edit", str(e))
+            self._load_tech_values()
+        self._show_impact((time.perf_counter() - start) * 1000)
+    
+    def _revert_tech(self):
+        tid = self.tech_combo.currentData()
+        self.overlay.clear_edits(tid)
+        self._load_tech_values()
+        self._show_impact()
+    
+    def _reset_all(self):
+        self.overlay.clear_edits()
+        self._load_tech_values()
+        self._show_impact()
+    
+    def _show_impact(self, elapsed_ms: float = 0.0):
+        delta = self.overlay.delta(limit=self.MAX_ROWS)
+        populate_modified_tree(self.impact_tree, delta.modified, self.techs)
+        
+        affected = len(self.overlay.affected)
+        total = sum(self.overlay.chain_delta.values())
         self.summary_label.setText(
-            f"📊 Comparison: {len(self.base_techs)} base techs vs {len(self.mod_techs)} mod techs | "
-            f"➕ {len(added)} added | ➖ {len(removed)} removed | 📝 {modified_count} modified"
+            f"🧪 {len(self.overlay.edits)} edited tech(s) | {affected} affected | "
+            f"Σ chain cost change {'+' if total >= 0 else '-'}{_format_cost(abs(total))}"
+            + (f" | showing top {self.MAX_ROWS}" if affected > self.MAX_ROWS else "")
+            + (f" | {elapsed_ms:.0f} ms" if elapsed_ms else "")
+        )
+
+
+class MergeModsDialog(QDialog):
+    """Stack several mods over the base under a load order and inspect conflicts"""
+    
+    load_merged = pyqtSignal(object, str)  # Dict[int, TechData], load order label
+    
+    def __init__(self, base_techs: Dict[int, TechData], parent=None):
+        super().__init__(parent)
+        self.base_techs = base_techs
+        self.result: Optional[MergeResult] = None
+        self._task: Optional[Task] = None
+        self.setWindowTitle("🧩 Merge Mods")
+        self.setMinimumSize(900, 700)
+        self._setup_ui()
+    
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        
+        layout.addWidget(QLabel("Load order (drag to reorder; later mods win conflicts):"))
+        order_layout = QHBoxLayout()
+        self.order_list = QListWidget()
+        self.order_list.setDragDropMode(QAbstractItemView.InternalMove)
+        self.order_list.setMaximumHeight(140)
+        order_layout.addWidget(self.order_list, 1)
+        
+        btns = QVBoxLayout()
+        add_btn = QPushButton("➕ Add TTRX...")
+        add_btn.clicked.connect(self._add_mods)
+        remove_btn = QPushButton("➖ Remove")
+        remove_btn.clicked.connect(lambda: [self.order_list.takeItem(self.order_list.row(i))
+                                            for i in self.order_list.selectedItems()])
+        self.merge_btn = QPushButton("🧩 Merge")
+        self.merge_btn.setObjectName("primaryButton")
+        self.merge_btn.clicked.connect(self._run_merge)
+        btns.addWidget(add_btn)
+        btns.addWidget(remove_btn)
+        btns.addStretch()
+        btns.addWidget(self.merge_btn)
+        order_layout.addLayout(btns)
+        layout.addLayout(order_layout)
+        
+        self.conflict_tree = QTreeWidget()
+        self.conflict_tree.setHeaderLabels(["Tech", "Field", "Mod", "Value"])
+        self.conflict_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.conflict_tree)
+        
+        footer = QHBoxLayout()
+        self.summary_label = QLabel("Add two or more mod files")
+        self.summary_label.setWordWrap(True)
+        footer.addWidget(self.summary_label, 1)
+        self.load_btn = QPushButton("📥 Show Merged Tree")
+        self.load_btn.setEnabled(False)
+        self.load_btn.clicked.connect(self._emit_merged)
+        footer.addWidget(self.load_btn)
+        layout.addLayout(footer)
+    
+    def _add_mods(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Select Mod TTRX Files", "", "TTRX Files (*.ttrx *.csv);;All Files (*)")
+        listed = set(self._load_order())
+        for path in paths:
+            if path in listed:  # A mod has one place in the load order
+                continue
+            item = QListWidgetItem(Path(path).name)
+            item.setData(Qt.UserRole, path)
+            item.setToolTip(path)
+            self.order_list.addItem(item)
+    
+    def _load_order(self) -> List[str]:
+        return [self.order_list.item(i).data(Qt.UserRole) for i in range(self.order_list.count())]
+    
+    def _run_merge(self):
+        paths = self._load_order()
+        if not paths or self._task is not None:
+            return
+        self.merge_btn.setEnabled(False)
+        self.load_btn.setEnabled(False)
+        self.summary_label.setText(f"Merging {len(paths)} mod(s)...")
+        
+        self._task = TaskRunner.instance().submit(
+            merge_mods, self.base_techs, paths, report_progress=True, cancellable=True,
+            on_result=self._on_merged,
+            on_error=lambda msg: self.summary_label.setText(f"❌ Merge failed: {msg}"),
+            on_progress=lambda done, total: self.summary_label.setText(f"Merging: {done} of {total} mod(s) loaded..."),
+            on_done=self._on_task_finished
         )
+    
+    def _on_task_finished(self):
+        self._task = None
+        self.merge_btn.setEnabled(True)
+    
+    def done(self, result: int):
+        if self._task is not None:  # Closed mid-run: mods not yet loading are dropped
+            self._task.cancel()
+            self._on_task_finished()
+        super().done(result)
+    
+    def _on_merged(self, result: MergeResult):
+        self.result = result
+        self.conflict_tree.clear()
+        
+        for conflict in result.conflicts:
+            tech = result.techs.get(conflict.tech_id) or self.base_techs.get(conflict.tech_id)
+            label = f"{tech.short_title} (ID: {conflict.tech_id})" if tech else str(conflict.tech_id)
+            parent = QTreeWidgetItem([label, conflict.attr, f"→ {conflict.winner}", ""])
+            parent.setForeground(2, QBrush(QColor(COLORS['accent_green'])))
+            for mod_name, value in conflict.values:
+                child = QTreeWidgetItem(["", "", mod_name, value])
+                if mod_name == conflict.winner:
+                    child.setForeground(3, QBrush(QColor(COLORS['accent_green'])))
+                parent.addChild(child)
+            self.conflict_tree.addTopLevelItem(parent)
+        
+        touched = ", ".join(f"{name}: {count}" for name, count in result.changed_by.items())
+        text = f"🧩 {len(result.techs)} techs merged | ⚠️ {len(result.conflicts)} conflict(s) | techs touched: {touched}"
+        if result.errors:
+            text += "\n❌ " + "; ".join(result.errors)
+        self.summary_label.setText(text)
+        self.load_btn.setEnabled(bool(result.techs))
+    
+    def _emit_merged(self):
+        if self.result:
+            self.load_merged.emit(self.result.techs, " > ".join(self.result.load_order))
 
 
 class TechGeneratorDialog(QDialog):
@@ -3307,6 +3729,95 @@ class TechGeneratorDialog(QDialog):
         QMessageBox.information(self, "Copied", "Entry copied to clipboard!")
 
 
+class PerfDebugDialog(QDialog):
+    """Stage timings (and optional cProfile) of the last tree rebuild"""
+    
+    def __init__(self, view: 'TechTreeView', parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.setWindowTitle("⏱️ Performance Profile")
+        self.setMinimumSize(700, 600)
+        self._setup_ui()
+        
+        view.rebuild_profiled.connect(self._show_recorder)
+        self._show_recorder(view.profiler)
+    
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        
+        self.summary_label = QLabel("")
+        self.summary_label.setStyleSheet(f"padding: 10px; background: {COLORS['bg_medium']}; border-radius: 8px;")
+        layout.addWidget(self.summary_label)
+        
+        self.stage_tree = QTreeWidget()
+        self.stage_tree.setHeaderLabels(["Stage", "Time (ms)", "% of Rebuild"])
+        self.stage_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.stage_tree, 2)
+        
+        self.profile_text = QTextEdit()
+        self.profile_text.setReadOnly(True)
+        self.profile_text.setFont(QFont("Consolas", 9))
+        self.profile_text.setPlaceholderText("Enable cProfile capture and rebuild to see the hottest functions")
+        layout.addWidget(self.profile_text, 1)
+        
+        buttons = QHBoxLayout()
+        self.capture_check = QCheckBox("Capture cProfile")
+        self.capture_check.setChecked(self.view.profiler.capture_profile)
+        self.capture_check.toggled.connect(self._on_capture_toggled)
+        buttons.addWidget(self.capture_check)
+        buttons.addStretch()
+        
+        rebuild_btn = QPushButton("🔄 Rebuild Now")
+        rebuild_btn.setObjectName("primaryButton")
+        rebuild_btn.clicked.connect(self._force_rebuild)
+        buttons.addWidget(rebuild_btn)
+        
+        dump_btn = QPushButton("💾 Dump JSON...")
+        dump_btn.clicked.connect(self._dump_json)
+        buttons.addWidget(dump_btn)
+        layout.addLayout(buttons)
+    
+    def _on_capture_toggled(self, checked: bool):
+        self.view.profiler.capture_profile = checked
+    
+    def _force_rebuild(self):
+        # Drop the layout cache so engine stages are measured too
+        self.view._layout_cache.clear()
+        self.view.rebuild()
+    
+    def _show_recorder(self, recorder: PerfRecorder):
+        self.stage_tree.clear()
+        total = recorder.total_ms() or 1.0
+        
+        # Stages complete inner-first: build parents before attaching children
+        items: Dict[str, QTreeWidgetItem] = {}
+        for path, ms in sorted(recorder.stages, key=lambda x: x[0].count("/")):
+            parent_path, _, name = path.rpartition("/")
+            item = QTreeWidgetItem([name, f"{ms:.2f}", f"{ms / total * 100:.1f}%"])
+            if ms / total > 0.3:
+                item.setForeground(1, QBrush(QColor(COLORS['accent_red'])))
+            parent = items.get(parent_path)
+            if parent is not None:
+                parent.addChild(item)
+            else:
+                self.stage_tree.addTopLevelItem(item)
+            items[path] = item
+        self.stage_tree.expandAll()
+        
+        meta = recorder.meta
+        cached = " (layout cached)" if meta.get('layout_cached') else ""
+        self.summary_label.setText(
+            f"Layout: {meta.get('layout', '-')} | Nodes: {meta.get('nodes', 0)} / {meta.get('techs', 0)} | "
+            f"Rebuild: {recorder.total_ms():.1f} ms{cached}"
+        )
+        self.profile_text.setPlainText(recorder.profile_text)
+    
+    def _dump_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Dump Profile", "rebuild_profile.json", "JSON Files (*.json)")
+        if path:
+            self.view.profiler.dump_json(path)
+
+
 # =============================================================================
 # MAIN WINDOW
 # =============================================================================
@@ -3319,6 +3830,7 @@ class MainWindow(QMainWindow):
         
         self.techs: Dict[int, TechData] = {}
         self.units: Dict[int, UnitData] = {}
+        self._export_task: Optional[Task] = None
         
         self.setWindowTitle(f"{APP_NAME} v{VERSION}")
         self.setMinimumSize(1400, 900)
@@ -3348,6 +3860,9 @@ class MainWindow(QMainWindow):
         export_menu.addAction("Export Tech List (CSV)").triggered.connect(self._export_csv)
         export_menu.addAction("Export Full Report (JSON)").triggered.connect(self._export_json)
         export_menu.addAction("Export Balance Report (HTML)").triggered.connect(self._export_html_report)
+        export_menu.addAction("Export Interactive Tree (HTML)").triggered.connect(self._export_interactive_report)
+        export_menu.addAction("Export Whole Tree (SVG)").triggered.connect(self._export_svg)
+        export_menu.addAction("Export Tree Tiles (PNG)...").triggered.connect(self._export_tiles)
         
         file_menu.addSeparator()
         file_menu.addAction("🗑️ Clear Cache").triggered.connect(self._clear_cache)
@@ -3369,8 +3884,12 @@ class MainWindow(QMainWindow):
         tools_menu.addAction("🎯 Optimal Path Finder...").triggered.connect(self._show_path_finder)
         tools_menu.addAction("⚖️ Balance Analyzer...").triggered.connect(self._show_balance_analyzer)
         tools_menu.addAction("📊 Diff Tool (Compare Mods)...").triggered.connect(self._show_diff_tool)
+        tools_menu.addAction("🧩 Merge Mods...").triggered.connect(self._show_merge_mods)
+        tools_menu.addAction("🧪 What-If Simulator...").triggered.connect(self._show_what_if)
         tools_menu.addSeparator()
         tools_menu.addAction("🔧 Tech Generator...").triggered.connect(self._show_tech_generator)
+        tools_menu.addSeparator()
+        tools_menu.addAction("⏱️ Performance Profile...").triggered.connect(self._show_perf_debug)
         
         # Help menu
         help_menu = menubar.addMenu("&Help")
@@ -3428,6 +3947,19 @@ class MainWindow(QMainWindow):
         self.layout_selector = LayoutSelector()
         toolbar.addWidget(self.layout_selector)
         
+        self.clusters_check = QCheckBox("Clusters")
+        self.clusters_check.setToolTip("Show tech family backgrounds (Hierarchical layout)")
+        self.clusters_check.setChecked(True)
+        toolbar.addWidget(self.clusters_check)
+        
+        self.band_combo = QComboBox()
+        self.band_combo.setToolTip("Cumulative curve drawn over the timeline")
+        self.band_combo.addItem("No Band", '')
+        self.band_combo.addItem("📈 Cost Band", 'cost')
+        self.band_combo.addItem("📈 Time Band", 'time')
+        self.band_combo.addItem("📈 Effect Band", 'effect')
+        toolbar.addWidget(self.band_combo)
+        
         # Search
         toolbar.addWidget(QLabel("  Search: "))
         self.search_edit = QLineEdit()
@@ -3473,6 +4005,10 @@ class MainWindow(QMainWindow):
         splitter.addWidget(self.tree_view)
         
         self.layout_selector.layout_changed.connect(self.tree_view.set_layout_engine)
+        self.clusters_check.toggled.connect(self.tree_view.set_show_clusters)
+        self.band_combo.currentIndexChanged.connect(
+            lambda i: self.tree_view.set_timeline_band(self.band_combo.itemData(i))
+        )
       
         
                 # Minimap (overlay)
@@ -3493,6 +4029,10 @@ class MainWindow(QMainWindow):
         self.analysis_panel = AnalysisPanel()
         right_tabs.addTab(self.analysis_panel, "📊 Analysis")
         
+        self.unit_browser = UnitBrowserPanel()
+        self.unit_browser.navigate_to_tech.connect(self._navigate_to_tech)
+        right_tabs.addTab(self.unit_browser, "🔧 Units")
+        
         right_tabs.setMinimumWidth(400)
         #right_tabs.setMaximumWidth(520)
         splitter.addWidget(right_tabs)
@@ -3561,18 +4101,48 @@ class MainWindow(QMainWindow):
             QApplication.processEvents()
             save_to_cache(ttrx, unit, self.techs, self.units)
         
-        self.statusBar().showMessage(f"Building visualization ({len(self.techs)} nodes)...")
-        QApplication.processEvents()
-        
-        self.tree_view.load_data(self.techs)
-        self.detail_panel.set_techs(self.techs)
-        self.analysis_panel.update_data(self.techs, self.units)
+        self._show_loaded_data(ttrx)
         
         linked = sum(len(t.unlocks_units) for t in self.techs.values())
         cache_status = "⚡ cached" if cached else "💾 cached"
         self.statusBar().showMessage(
             f"✅ {len(self.techs)} techs, {len(self.units)} units ({linked} linked) [{cache_status}]"
         )
+    
+    def _show_loaded_data(self, ttrx_path: str = ""):
+        """Push self.techs/self.units into the view and panels"""
+        self.statusBar().showMessage(f"Building visualization ({len(self.techs)} nodes)...")
+        QApplication.processEvents()
+        
+        self.effect_index = EffectIndex(self.techs)
+        self.tree_view.load_data(self.techs, self.effect_index)
+        self.unit_index = UnitIndex(self.units)
+        self.detail_panel.set_techs(self.techs, self.unit_index)
+        self.unit_browser.set_data(self.techs, self.unit_index)
+        self.analysis_panel.update_data(self.techs, self.units, ttrx_path, self.effect_index)
+    
+    def _load_merged_tree(self, techs: Dict[int, TechData], label: str):
+        """Show a merged tree in place of the loaded one (units are relinked to it)"""
+        for tech in techs.values():
+            tech.unlocks_units = []
+        link_units_to_techs(techs, self.units)
+        self.techs = techs
+        self._show_loaded_data()
+        self.statusBar().showMessage(f"Validating merged tree: {len(techs)} techs ({label})...")
+        # Mods that were valid alone can still break each other, e.g. one removes a tech another requires
+        TaskRunner.instance().submit(
+            validate_tech_tree, techs, self.units,
+            on_result=lambda report: self._on_merged_tree_validated(techs, label, report),
+            on_error=lambda msg: self.statusBar().showMessage(f"❌ Validating merged tree failed: {msg}")
+        )
+    
+    def _on_merged_tree_validated(self, techs: Dict[int, TechData], label: str, report: ValidationReport):
+        if techs is not self.techs:  # Another tree was loaded meanwhile
+            return
+        self.analysis_panel._show_validation(report)
+        issues = report.issue_count()
+        self.statusBar().showMessage(f"{'✅' if issues == 0 else '⚠️'} Merged tree: {len(techs)} techs ({label}), "
+                                     f"{issues} validation issue(s) - see Analysis")
 
     def _on_category_changed(self, index):
         cat = self.cat_combo.itemData(index)
@@ -3630,62 +4200,48 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "No Data", "Load files first.")
             return
         
-        path, _ = QFileDialog.getSaveFileName(self, "Export CSV", "tech_list.csv", "CSV Files (*.csv)")
-        if not path:
-            return
-        
-        with open(path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['ID', 'Name', 'Category', 'Level', 'Cost', 'Time', 'Prereq1', 'Prereq2', 'Effects', 'Units'])
-            
-            for tech in sorted(self.techs.values(), key=lambda t: t.id):
-                cat = CATEGORIES.get(tech.category, {'name': '?'})
-                effects_str = "; ".join(f"{eid}:{val}" for eid, val in tech.effects)
-                units_str = "; ".join(u.name for u in tech.unlocks_units)
-                
-                writer.writerow([
-                    tech.id, tech.short_title, cat['name'], tech.tech_level,
-                    tech.cost, tech.time_to_research, tech.prereq_1, tech.prereq_2,
-                    effects_str, units_str
-                ])
-        
-        QMessageBox.information(self, "Export Complete", f"Exported to:\n{path}")
+        path = self._export_path("Export CSV", "tech_list.csv", "CSV")
+        if path:
+            self._run_export(path, export_techs_csv, self.techs, path)
     
     def _export_json(self):
         if not self.techs:
             QMessageBox.warning(self, "No Data", "Load files first.")
             return
         
-        path, _ = QFileDialog.getSaveFileName(self, "Export JSON", "tech_report.json", "JSON Files (*.json)")
-        if not path:
+        path = self._export_path("Export JSON", "tech_report.json", "JSON")
+        if path:
+            self._run_export(path, export_techs_json, self.techs, self.units, path)
+    
+    def _export_path(self, title: str, default_name: str, kind: str) -> str:
+        """Save dialog offering plain and gzip output; '' if cancelled"""
+        ext = Path(default_name).suffix
+        plain, packed = f"{kind} Files (*{ext})", f"Gzip {kind} (*{ext}.gz)"
+        path, selected = QFileDialog.getSaveFileName(self, title, default_name, f"{plain};;{packed}")
+        if path and selected == packed and not path.lower().endswith('.gz'):
+            path += '.gz'
+        return path
+    
+    def _run_export(self, path: str, fn: Callable, *args):
+        """Write an export on a worker thread behind a progress dialog"""
+        if self._export_task is not None:
             return
-        
-        report = {
-            'generated': datetime.now().isoformat(),
-            'stats': {
-                'total_techs': len(self.techs),
-                'total_units': len(self.units),
-                'linked_units': sum(len(t.unlocks_units) for t in self.techs.values()),
-            },
-            'techs': {}
-        }
-        
-        for tid, tech in self.techs.items():
-            report['techs'][tid] = {
-                'name': tech.short_title,
-                'category': CATEGORIES.get(tech.category, {'name': '?'})['name'],
-                'level': tech.tech_level,
-                'cost': tech.cost,
-                'time': tech.time_to_research,
-                'prereqs': [p for p in [tech.prereq_1, tech.prereq_2] if p],
-                'effects': [{'id': eid, 'value': val} for eid, val in tech.effects],
-                'units': [{'id': u.id, 'name': u.name} for u in tech.unlocks_units],
-            }
-        
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2)
-        
-        QMessageBox.information(self, "Export Complete", f"Exported to:\n{path}")
+        progress = QProgressDialog(f"Writing {Path(path).name}...", None, 0, max(1, len(self.techs)), self)
+        progress.setWindowTitle("Exporting")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        
+        def finished():
+            progress.close()
+            self._export_task = None
+        
+        self._export_task = TaskRunner.instance().submit(
+            fn, *args, report_progress=True, cancellable=True,
+            on_result=lambda _: QMessageBox.information(self, "Export Complete", f"Exported to:\n{path}"),
+            on_error=lambda msg: QMessageBox.warning(self, "Export Failed", f"{path}\n\n{msg}"),
+            on_progress=lambda done, total: (progress.setMaximum(total), progress.setValue(done)),
+            on_done=finished
+        )
     
     def _show_about(self):
         QMessageBox.about(self, "About", f"""
@@ -3745,14 +4301,29 @@ class MainWindow(QMainWindow):
         if not self.techs:
             QMessageBox.warning(self, "No Data", "Load files first.")
             return
-        dialog = BalanceAnalyzerDialog(self.techs, self)
+        dialog = BalanceAnalyzerDialog(self.techs, self, self.unit_index)
         dialog.exec_()
     
     def _show_diff_tool(self):
         if not self.techs:
             QMessageBox.warning(self, "No Data", "Load base files first.")
             return
-        dialog = TechDiffDialog(self.techs, self)
+        dialog = TechDiffDialog(self.techs, self, self.units)
+        dialog.exec_()
+    
+    def _show_merge_mods(self):
+        if not self.techs:
+            QMessageBox.warning(self, "No Data", "Load base files first.")
+            return
+        dialog = MergeModsDialog(self.techs, self)
+        dialog.load_merged.connect(self._load_merged_tree)
+        dialog.exec_()
+    
+    def _show_what_if(self):
+        if not self.techs:
+            QMessageBox.warning(self, "No Data", "Load base files first.")
+            return
+        dialog = WhatIfDialog(self.techs, self)
         dialog.exec_()
     
     def _show_tech_generator(self):
@@ -3762,99 +4333,57 @@ class MainWindow(QMainWindow):
         dialog = TechGeneratorDialog(self.techs, self)
         dialog.exec_()
     
+    def _show_perf_debug(self):
+        dialog = PerfDebugDialog(self.tree_view, self)
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.show()
+    
     def _export_html_report(self):
         if not self.techs:
             QMessageBox.warning(self, "No Data", "Load files first.")
             return
         
-        path, _ = QFileDialog.getSaveFileName(self, "Export HTML Report", "tech_report.html", "HTML Files (*.html)")
-        if not path:
+        path = self._export_path("Export HTML Report", "tech_report.html", "HTML")
+        if path:
+            self._run_export(path, write_html_report, self.techs, self.units, path)
+    
+    def _export_interactive_report(self):
+        if not self.techs:
+            QMessageBox.warning(self, "No Data", "Load files first.")
             return
         
-        # Generate comprehensive HTML report
-        html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Tech Tree Report</title>
-    <style>
-        body {{ font-family: 'Segoe UI', sans-serif; background: #0d1117; color: #f0f6fc; padding: 40px; }}
-        h1 {{ color: #58a6ff; border-bottom: 2px solid #30363d; padding-bottom: 10px; }}
-        h2 {{ color: #8b949e; margin-top: 30px; }}
-        table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
-        th, td {{ border: 1px solid #30363d; padding: 12px; text-align: left; }}
-        th {{ background: #161b22; color: #58a6ff; }}
-        tr:hover {{ background: #21262d; }}
-        .stat {{ display: inline-block; background: #161b22; padding: 20px; margin: 10px; border-radius: 12px; min-width: 150px; text-align: center; }}
-        .stat-value {{ font-size: 32px; font-weight: bold; color: #58a6ff; }}
-        .stat-label {{ color: #8b949e; font-size: 14px; }}
-        .cat-1 {{ color: #f85149; }} .cat-2 {{ color: #58a6ff; }} .cat-3 {{ color: #3fb950; }}
-        .cat-4 {{ color: #d29922; }} .cat-5 {{ color: #a371f7; }} .cat-6 {{ color: #db61a2; }}
-    </style>
-</head>
-<body>
-    <h1>🔬 Supreme Ruler Tech Tree Report</h1>
-    <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
-    
-    <div class="stats">
-        <div class="stat"><div class="stat-value">{len(self.techs)}</div><div class="stat-label">Total Techs</div></div>
-        <div class="stat"><div class="stat-value">{len(self.units)}</div><div class="stat-label">Total Units</div></div>
-        <div class="stat"><div class="stat-value">{sum(len(t.unlocks_units) for t in self.techs.values())}</div><div class="stat-label">Tech-Unit Links</div></div>
-    </div>
-    
-    <h2>📊 Category Breakdown</h2>
-    <table>
-        <tr><th>Category</th><th>Count</th><th>With Units</th><th>Total Effects</th></tr>
-"""
-        
-        cat_stats = defaultdict(lambda: {'count': 0, 'with_units': 0, 'effects': 0})
-        for tech in self.techs.values():
-            cat_stats[tech.category]['count'] += 1
-            if tech.unlocks_units:
-                cat_stats[tech.category]['with_units'] += 1
-            cat_stats[tech.category]['effects'] += len(tech.effects)
-        
-        for cat_id, stats in sorted(cat_stats.items()):
-            cat = CATEGORIES.get(cat_id, {'name': f'Cat {cat_id}', 'icon': '?'})
-            html += f"""<tr class="cat-{cat_id}">
-                <td>{cat['icon']} {cat['name']}</td>
-                <td>{stats['count']}</td>
-                <td>{stats['with_units']}</td>
-                <td>{stats['effects']}</td>
-            </tr>"""
-        
-        html += """</table>
-    
-    <h2>📋 All Technologies</h2>
-    <table>
-        <tr><th>ID</th><th>Name</th><th>Category</th><th>Level</th><th>Cost</th><th>Time</th><th>Effects</th><th>Units</th></tr>
-"""
-        
-        for tid, tech in sorted(self.techs.items()):
-            cat = CATEGORIES.get(tech.category, {'name': '?', 'icon': '?'})
-            cost = f"${tech.cost/1e6:.0f}M"
-            effects = len(tech.effects)
-            units = len(tech.unlocks_units)
-            
-            html += f"""<tr>
-                <td>{tid}</td>
-                <td class="cat-{tech.category}">{tech.short_title}</td>
-                <td>{cat['icon']} {cat['name']}</td>
-                <td>{tech.tech_level}</td>
-                <td>{cost}</td>
-                <td>{tech.time_to_research}d</td>
-                <td>{effects}</td>
-                <td>{units}</td>
-            </tr>"""
-        
-        html += """</table>
-</body>
-</html>"""
+        path = self._export_path("Export Interactive Tree", "tech_tree.html", "HTML")
+        if path:
+            self._run_export(path, write_interactive_report, self.techs, path, self._view_positions())
+    
+    def _view_positions(self) -> Optional[Dict[int, Tuple[float, float]]]:
+        """Reuse what is on screen when it covers the whole tree; otherwise the core lays it out"""
+        nodes = self.tree_view.nodes
+        if len(nodes) != len(self.techs):
+            return None
+        return {tid: (node.pos().x(), node.pos().y()) for tid, node in nodes.items()}
+    
+    def _export_svg(self):
+        if not self.techs:
+            QMessageBox.warning(self, "No Data", "Load files first.")
+            return
         
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(html)
+        path = self._export_path("Export Whole Tree", "tech_tree.svg", "SVG")
+        if path:
+            self._run_export(path, write_svg, self.techs, path, self._view_positions())
+    
+    def _export_tiles(self):
+        if not self.techs:
+            QMessageBox.warning(self, "No Data", "Load files first.")
+            return
         
-        QMessageBox.information(self, "Export Complete", f"Report exported to:\n{path}")
+        out_dir = QFileDialog.getExistingDirectory(self, "Export Tree Tiles To")
+        if out_dir:
+            self._run_export(out_dir, tech_tree_tiles.export_tiles, self.techs, out_dir, self._view_positions())
+    
+    def closeEvent(self, event):
+        self.tree_view.shutdown()
+        super().closeEvent(event)
 
 
 # =============================================================================
@@ -3862,18 +4391,28 @@ class MainWindow(QMainWindow):
 # =============================================================================
 
 def main():
+    # Batch subcommands (validate, export-csv, diff, ...) never open the window
+    if len(sys.argv) > 1 and sys.argv[1] in tech_tree_cli.COMMANDS:
+        sys.exit(tech_tree_cli.main(sys.argv[1:]))
+    
     # 1. Parse Arguments
     parser = argparse.ArgumentParser()
     parser.add_argument("ttrx_path", nargs="?", default=None)
     parser.add_argument("unit_path", nargs="?", default=None)
     parser.add_argument("--select-tech", type=int, default=None, help="Tech ID to select on startup")
-    args = parser.parse_args()
     
-    # 2. Setup Application (Initialize only once)
-    app = QApplication(sys.argv)
-    app.setStyle("Fusion")
+    plan_group = parser.add_argument_group("planning", "Print a multi-target research plan and exit")
+    plan_group.add_argument("--plan-tech", type=int, action="append", metavar="ID", help="Target tech (repeatable)")
+    plan_group.add_argument("--plan-class", type=int, action="append", metavar="N",
+                            help="Every tech unlocking a unit of this class (repeatable)")
+    plan_group.add_argument("--plan-effect", type=int, action="append", metavar="ID",
+                            help="Every tech carrying this effect (repeatable)")
+    plan_group.add_argument("--plan-all-classes", action="store_true", help="One plan per unit class")
+    plan_group.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args()
+    planning = args.plan_tech or args.plan_class or args.plan_effect or args.plan_all_classes
     
-    # 3. Determine Paths
+    # 2. Determine Paths
     # We prefer command line args, but fall back to auto-discovery if not provided
     final_ttrx = args.ttrx_path
     final_unit = args.unit_path
@@ -3897,6 +4436,22 @@ def main():
                         final_unit = str(unit)
                     break
     
+    if planning:
+        if not final_ttrx:
+            print("A TTRX path is required for planning", file=sys.stderr)
+            sys.exit(tech_tree_cli.EXIT_ERROR)
+        cli_args = ['path', final_ttrx, '--jobs', '1']
+        cli_args += ['--unit', final_unit] if final_unit else []
+        cli_args += [f"--tech={tid}" for tid in args.plan_tech or []]
+        cli_args += [f"--class={num}" for num in args.plan_class or []]
+        cli_args += [f"--effect={eid}" for eid in args.plan_effect or []]
+        cli_args += ['--all-classes'] * bool(args.plan_all_classes) + ['--json'] * bool(args.json)
+        sys.exit(tech_tree_cli.main(cli_args))
+    
+    # 3. Setup Application (Initialize only once)
+    app = QApplication(sys.argv)
+    app.setStyle("Fusion")
+    
     # 4. Initialize Window
     window = MainWindow()
     
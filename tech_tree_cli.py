@@ -0,0 +1,395 @@
+"""Headless batch commands for CI: validation, exports, reports, paths, diffs and bottlenecks
+
+    python tech_tree_cli.py validate mods/*.TTRX --json
+    python tech_tree_cli.py export-csv A.TTRX B.TTRX --out-dir build
+    python tech_tree_cli.py diff DEFAULT.TTRX mods/*.TTRX --jobs 4
+    python tech_tree_cli.py path DEFAULT.TTRX --all-classes
+    python tech_tree_cli.py export-tiles DEFAULT.TTRX --out-dir build
+
+Each input is handled in its own worker process. Exit codes: 0 clean,
+1 findings (validation issues, differences, unreachable targets), 2 bad input.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import dataclasses
+from pathlib import Path
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tech_tree_core import (
+    CLASS_INFO, EFFECT_DEFINITIONS, TechData, UnitData, load_tech_tree, load_units,
+    link_units_to_techs, load_with_cache, ReachabilityIndex, compute_graph_metrics,
+    targets_for_unit_class, targets_for_effect, plan_multi_target, validate_tech_tree,
+    diff_mods, find_unit_file, export_techs_csv, export_techs_json, write_html_report,
+    write_interactive_report, write_svg
+)
+
+
+EXIT_OK = 0
+EXIT_FINDINGS = 1
+EXIT_ERROR = 2
+
+
+# =============================================================================
+# LOADING
+# =============================================================================
+
+def load_inputs(ttrx_path: str, unit_path: str = "",
+                use_cache: bool = True) -> Tuple[Dict[int, TechData], Dict[int, UnitData]]:
+    """Load one TTRX (and its UNIT file, if any) quietly; parser chatter is dropped"""
+    with redirect_stdout(io.StringIO()):
+        if unit_path and use_cache:
+            return load_with_cache(ttrx_path, unit_path)
+        techs = load_tech_tree(ttrx_path)
+        units = load_units(unit_path) if techs and unit_path else {}
+        link_units_to_techs(techs, units)
+    return techs, units
+
+
+def resolve_unit(ttrx_path: str, unit_path: Optional[str]) -> str:
+    return unit_path if unit_path is not None else find_unit_file(ttrx_path)
+
+
+# =============================================================================
+# COMMANDS
+# =============================================================================
+# Each handler takes (techs, units, ttrx_path, opts) and returns (result, exit code)
+
+def _cmd_validate(techs, units, ttrx_path: str, opts: dict) -> Tuple[dict, int]:
+    report = validate_tech_tree(techs, units, ttrx_path)
+    result = dataclasses.asdict(report)
+    result['issue_count'] = report.issue_count()
+    return result, EXIT_FINDINGS if report.issue_count() else EXIT_OK
+
+
+def _output_path(ttrx_path: str, opts: dict, suffix: str) -> Path:
+    out_dir = Path(opts.get('out_dir') or ".")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    return out_dir / (Path(ttrx_path).stem + suffix + (".gz" if opts.get('gzip') else ""))
+
+
+def _cmd_export_csv(techs, units, ttrx_path: str, opts: dict) -> Tuple[dict, int]:
+    path = _output_path(ttrx_path, opts, ".csv")
+    export_techs_csv(techs, str(path))
+    return {'output': str(path)}, EXIT_OK
+
+
+def _cmd_export_json(techs, units, ttrx_path: str, opts: dict) -> Tuple[dict, int]:
+    path = _output_path(ttrx_path, opts, ".json")
+    export_techs_json(techs, units, str(path))
+    return {'output': str(path)}, EXIT_OK
+
+
+def _cmd_report_html(techs, units, ttrx_path: str, opts: dict) -> Tuple[dict, int]:
+    path = _output_path(ttrx_path, opts, ".html")
+    if opts.get('interactive'):
+        write_interactive_report(techs, str(path))
+    else:
+        write_html_report(techs, units, str(path))
+    return {'output': str(path)}, EXIT_OK
+
+
+def _cmd_export_svg(techs, units, ttrx_path: str, opts: dict) -> Tuple[dict, int]:
+    path = _output_path(ttrx_path, opts, ".svg")
+    write_svg(techs, str(path))
+    return {'output': str(path)}, EXIT_OK
+
+
+def _cmd_export_tiles(techs, units, ttrx_path: str, opts: dict) -> Tuple[dict, int]:
+    from tech_tree_tiles import export_tiles  # deferred: pulls in QtGui
+    out_dir = Path(opts.get('out_dir') or ".") / (Path(ttrx_path).stem + "_tiles")
+    manifest = export_tiles(techs, str(out_dir), tile_size=opts.get('tile_size', 512),
+                            max_workers=opts.get('workers'))
+    return {'output': str(out_dir), 'tiles': manifest['tiles'], 'max_zoom': manifest['max_zoom']}, EXIT_OK
+
+
+def plan_goals(techs: Dict[int, TechData], tech_ids: List[int], class_nums: List[int],
+               effect_ids: List[int]) -> List[dict]:
+    """One multi-target plan per goal: the tech list, each unit class, each effect"""
+    goals: List[Tuple[str, List[int]]] = []
+    if tech_ids:
+        goals.append(("Techs " + ", ".join(map(str, tech_ids)), tech_ids))
+    for class_num in class_nums:
+        name = CLASS_INFO.get(class_num, {'name': f'Class {class_num}'})['name']
+        goals.append((f"Unit class {class_num} ({name})", targets_for_unit_class(class_num, techs)))
+    for effect_id in effect_ids:
+        name = EFFECT_DEFINITIONS.get(effect_id, {'name': f'Effect {effect_id}'})['name']
+        goals.append((f"Effect {effect_id} ({name})", targets_for_effect(effect_id, techs)))
+    
+    reach = ReachabilityIndex(techs)
+    reports = []
+    for label, targets in goals:
+        plan = plan_multi_target(targets, techs, reach)
+        reports.append({
+            'goal': label,
+            'targets': [
+                {'id': tid, 'title': techs[tid].short_title,
+                 'standalone_cost': plan.standalone_cost[tid], 'marginal_cost': plan.marginal_cost[tid]}
+                for tid in plan.targets
+            ],
+            'unreachable': plan.unreachable,
+            'techs_required': len(plan.order),
+            'total_cost': plan.total_cost,
+            'total_time': plan.total_time,
+            'order': plan.order,
+        })
+    return reports
+
+
+def _cmd_path(techs, units, ttrx_path: str, opts: dict) -> Tuple[dict, int]:
+    class_nums = sorted(CLASS_INFO) if opts.get('all_classes') else opts.get('classes', [])
+    reports = plan_goals(techs, opts.get('techs', []), class_nums, opts.get('effects', []))
+    unreachable = any(report['unreachable'] for report in reports)
+    return {'plans': reports}, EXIT_FINDINGS if unreachable else EXIT_OK
+
+
+def _cmd_bottlenecks(techs, units, ttrx_path: str, opts: dict) -> Tuple[dict, int]:
+    metrics = compute_graph_metrics(techs)
+    ranked = sorted(metrics.dominated, key=lambda tid: (metrics.dominated[tid], metrics.descendants[tid]),
+                    reverse=True)
+    top = [
+        {'id': tid, 'title': techs[tid].short_title, 'dominated': metrics.dominated[tid],
+         'descendants': metrics.descendants[tid], 'criticality': round(metrics.criticality.get(tid, 0.0), 4)}
+        for tid in ranked[:opts.get('top', 20)]
+    ]
+    return {'bottlenecks': top}, EXIT_OK
+
+
+TREE_COMMANDS: Dict[str, Callable] = {
+    'validate': _cmd_validate,
+    'export-csv': _cmd_export_csv,
+    'export-json': _cmd_export_json,
+    'report-html': _cmd_report_html,
+    'export-svg': _cmd_export_svg,
+    'export-tiles': _cmd_export_tiles,
+    'path': _cmd_path,
+    'bottlenecks': _cmd_bottlenecks,
+}
+COMMANDS = list(TREE_COMMANDS) + ['diff']
+
+
+# =============================================================================
+# JOBS
+# =============================================================================
+
+def _run_tree_job(command: str, ttrx_path: str, unit_path: str, opts: dict) -> dict:
+    """Worker: load one input and run one command on it"""
+    job = {'input': ttrx_path, 'unit': unit_path, 'exit': EXIT_OK, 'timings': {}}
+    start = time.perf_counter()
+    try:
+        techs, units = load_inputs(ttrx_path, unit_path, opts.get('use_cache', True))
+        job['timings']['load_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        if not techs:
+            job.update(exit=EXIT_ERROR, error=f"Failed to load {ttrx_path}")
+            return job
+        
+        start = time.perf_counter()
+        job['result'], job['exit'] = TREE_COMMANDS[command](techs, units, ttrx_path, opts)
+        job['timings']['run_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    except Exception as e:
+        job.update(exit=EXIT_ERROR, error=f"{type(e).__name__}: {e}")
+    return job
+
+
+_diff_base: Tuple[Dict[int, TechData], Dict[int, UnitData]] = ({}, {})
+
+
+def _init_diff_worker(base_techs: Dict[int, TechData], base_units: Dict[int, UnitData]):
+    global _diff_base
+    _diff_base = (base_techs, base_units)
+
+
+def _run_diff_job(ttrx_path: str, unit_path: str, opts: dict) -> dict:
+    """Worker: diff one mod against the base handed over by _init_diff_worker"""
+    job = {'input': ttrx_path, 'unit': unit_path, 'exit': EXIT_OK, 'timings': {}}
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(io.StringIO()):
+            diff = diff_mods(*_diff_base, [(ttrx_path, unit_path)])[0]
+    except Exception as e:
+        diff = None
+        job.update(exit=EXIT_ERROR, error=f"{type(e).__name__}: {e}")
+    job['timings']['run_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    if diff is None:
+        return job
+    if diff.error:
+        job.update(exit=EXIT_ERROR, error=diff.error)
+        return job
+    
+    job['result'] = {
+        kind: {'added': delta.added, 'removed': delta.removed,
+               'modified': {tid: [list(change) for change in changes] for tid, changes in delta.modified.items()}}
+        for kind, delta in (('techs', diff.techs), ('units', diff.units))
+    }
+    changed = any(delta.added or delta.removed or delta.modified for delta in (diff.techs, diff.units))
+    job['exit'] = EXIT_FINDINGS if changed else EXIT_OK
+    return job
+
+
+def run_jobs(fn: Callable, jobs_args: List[tuple], workers: int,
+             initializer: Optional[Callable] = None, initargs: tuple = ()) -> List[dict]:
+    """Run fn over jobs_args in input order; in-process when there is nothing to parallelise"""
+    if workers <= 1 or len(jobs_args) <= 1:
+        if initializer:
+            initializer(*initargs)
+        return [fn(*args) for args in jobs_args]
+    
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs_args)),
+                             initializer=initializer, initargs=initargs) as pool:
+        return list(pool.map(fn, *zip(*jobs_args)))
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def _summary(command: str, job: dict) -> str:
+    if 'error' in job:
+        return job['error']
+    result = job['result']
+    if command == 'validate':
+        return f"{result['issue_count']} issue(s): {len(result['orphans'])} orphans, {len(result['cycles'])} cycles, " \
+               f"{len(result['broken_units'])} broken units, {len(result['leads_to_mismatches'])} link mismatches, " \
+               f"{len(result['duplicate_ids'])} duplicate IDs"
+    if command == 'diff':
+        techs, units = result['techs'], result['units']
+        return f"techs +{len(techs['added'])} -{len(techs['removed'])} ~{len(techs['modified'])}, " \
+               f"units +{len(units['added'])} -{len(units['removed'])} ~{len(units['modified'])}"
+    if command == 'path':
+        return f"{len(result['plans'])} plan(s)"
+    if command == 'bottlenecks':
+        return f"top {len(result['bottlenecks'])} by dominated techs"
+    if command == 'export-tiles':
+        return f"{result['tiles']} tiles, zoom 0-{result['max_zoom']} -> {result['output']}"
+    return f"-> {result['output']}"
+
+
+def print_plans(plans: List[dict]):
+    for report in plans:
+        print(f"== {report['goal']}: {len(report['targets'])} targets, {report['techs_required']} techs, "
+              f"${report['total_cost']/1e9:.2f}B, {report['total_time']} days sequential")
+        for t in sorted(report['targets'], key=lambda t: t['marginal_cost'], reverse=True):
+            print(f"   {t['id']:>6}  {t['title'][:40]:<40}  standalone ${t['standalone_cost']/1e9:8.2f}B"
+                  f"  marginal ${t['marginal_cost']/1e9:8.2f}B")
+        if report['unreachable']:
+            print(f"   unreachable: {', '.join(map(str, report['unreachable']))}")
+
+
+def print_text(command: str, results: List[dict], elapsed_ms: float, exit_code: int):
+    status = {EXIT_OK: "OK", EXIT_FINDINGS: "FOUND", EXIT_ERROR: "ERROR"}
+    for job in results:
+        timings = "  ".join(f"{name[:-3]} {ms:.0f}ms" for name, ms in job['timings'].items())
+        print(f"[{status[job['exit']]:>5}] {job['input']}  ({timings})  {_summary(command, job)}")
+        if job.get('result') and command == 'path':
+            print_plans(job['result']['plans'])
+        elif job.get('result') and command == 'bottlenecks':
+            for row in job['result']['bottlenecks']:
+                print(f"   {row['id']:>6}  {row['title'][:40]:<40}  dominates {row['dominated']:>5}"
+                      f"  descendants {row['descendants']:>5}  criticality {row['criticality']:.1%}")
+    
+    findings = sum(job['exit'] == EXIT_FINDINGS for job in results)
+    errors = sum(job['exit'] == EXIT_ERROR for job in results)
+    print(f"{command}: {len(results)} input(s), {findings} with findings, {errors} error(s) "
+          f"in {elapsed_ms:.0f}ms -> exit {exit_code}")
+
+
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="tech_tree_cli", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--unit", default=None, metavar="PATH",
+                        help="UNIT file for every input (default: the .UNIT next to each TTRX)")
+    common.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    common.add_argument("--no-cache", action="store_true", help="Always parse, never read or write the cache")
+    common.add_argument("--json", action="store_true", help="Machine-readable output")
+    
+    outputs = argparse.ArgumentParser(add_help=False)
+    outputs.add_argument("--out-dir", default=".", help="Where <input stem>.<ext> files are written")
+    outputs.add_argument("--gzip", action="store_true", help="Compress outputs (<input stem>.<ext>.gz)")
+    
+    sub.add_parser("validate", parents=[common], help="Structural checks; exit 1 on any issue") \
+        .add_argument("inputs", nargs="+", metavar="TTRX")
+    for name, what in (("export-csv", "tech list CSV"), ("export-json", "JSON report"), ("report-html", "HTML report"),
+                       ("export-svg", "whole-tree SVG")):
+        sub.add_parser(name, parents=[common, outputs], help=f"Write a {what} per input") \
+            .add_argument("inputs", nargs="+", metavar="TTRX")
+    
+    path = sub.add_parser("path", parents=[common], help="Multi-target research plans; exit 1 if a target is unreachable")
+    path.add_argument("inputs", nargs="+", metavar="TTRX")
+    path.add_argument("--tech", type=int, action="append", default=[], metavar="ID", help="Target tech (repeatable)")
+    path.add_argument("--class", dest="classes", type=int, action="append", default=[], metavar="N",
+                      help="Every tech unlocking a unit of this class (repeatable)")
+    path.add_argument("--effect", type=int, action="append", default=[], metavar="ID",
+                      help="Every tech carrying this effect (repeatable)")
+    path.add_argument("--all-classes", action="store_true", help="One plan per unit class")
+    
+    sub.choices['report-html'].add_argument("--interactive", action="store_true",
+                                            help="Self-contained canvas viewer of the whole tree instead of tables")
+    
+    # PNG tiles are already compressed: no outputs parent, so --gzip is rejected rather than ignored
+    tiles = sub.add_parser("export-tiles", parents=[common],
+                           help="PNG tile pyramid per input (<out-dir>/<input stem>_tiles/{z}/{x}/{y}.png)")
+    tiles.add_argument("inputs", nargs="+", metavar="TTRX")
+    tiles.add_argument("--out-dir", default=".", help="Where the <input stem>_tiles directories are written")
+    tiles.add_argument("--tile-size", type=int, default=512, metavar="PX")
+    
+    bottlenecks = sub.add_parser("bottlenecks", parents=[common], help="Techs that gate the most of the tree")
+    bottlenecks.add_argument("inputs", nargs="+", metavar="TTRX")
+    bottlenecks.add_argument("--top", type=int, default=20)
+    
+    diff = sub.add_parser("diff", parents=[common], help="Diff mods against a base; exit 1 if anything changed")
+    diff.add_argument("base", metavar="BASE_TTRX")
+    diff.add_argument("inputs", nargs="+", metavar="MOD_TTRX")
+    diff.add_argument("--base-unit", default=None, metavar="PATH", help="UNIT file of the base")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    workers = args.jobs or os.cpu_count() or 1
+    use_cache = not args.no_cache
+    start = time.perf_counter()
+    
+    if args.command == 'diff':
+        base_techs, base_units = load_inputs(args.base, resolve_unit(args.base, args.base_unit), use_cache)
+        if not base_techs:
+            print(f"Failed to load base: {args.base}", file=sys.stderr)
+            return EXIT_ERROR
+        jobs = [(path, resolve_unit(path, args.unit), {}) for path in args.inputs]
+        results = run_jobs(_run_diff_job, jobs, workers, _init_diff_worker, (base_techs, base_units))
+    else:
+        opts = {'use_cache': use_cache, 'out_dir': getattr(args, 'out_dir', None),
+                'gzip': getattr(args, 'gzip', False), 'interactive': getattr(args, 'interactive', False),
+                'top': getattr(args, 'top', 20), 'techs': getattr(args, 'tech', []),
+                'classes': getattr(args, 'classes', []), 'effects': getattr(args, 'effect', []),
+                'all_classes': getattr(args, 'all_classes', False),
+                'tile_size': getattr(args, 'tile_size', 512), 'workers': workers}
+        jobs = [(args.command, path, resolve_unit(path, args.unit), opts) for path in args.inputs]
+        # Tiles fan out over their own worker pool, so the inputs take turns
+        results = run_jobs(_run_tree_job, jobs, 1 if args.command == 'export-tiles' else workers)
+    
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    exit_code = max((job['exit'] for job in results), default=EXIT_OK)
+    
+    if args.json:
+        json.dump({'command': args.command, 'workers': min(workers, len(jobs)), 'elapsed_ms': round(elapsed_ms, 1),
+                   'exit_code': exit_code, 'results': results}, sys.stdout, indent=2)
+        print()
+    else:
+        print_text(args.command, results, elapsed_ms, exit_code)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
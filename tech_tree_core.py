@@ -0,0 +1,3177 @@
+"""Qt-free data model, parsers, cache and analysis for the SR2030 tech tree viewer"""
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import heapq
+import bisect
+import dataclasses
+from pathlib import Path
+from contextlib import contextmanager, nullcontext, redirect_stdout
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Set, Optional, Tuple
+from collections import defaultdict, Counter
+from itertools import accumulate
+# csv, pickle, hashlib and datetime are imported ("# deferred") in the functions
+# that use them: the CLI and headless tools pay for what they run, not for all of it
+# (benchmarks/bench_import.py gates the import time)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+VERSION = "2.1.0"
+APP_NAME = "Supreme Ruler 2030 Tech Tree Analyzer beta"
+
+# Category definitions with icons and colors
+#from wiki
+CATEGORIES = {
+    1: {'name': 'Warfare',        'icon': '⚔', 'color': '#f85149', 'bg': '#3d1a1a'},  # Military/Weaponry
+    2: {'name': 'Transportation', 'icon': '⛟', 'color': '#d29922', 'bg': '#3d2a1a'},  # Infrastructure/Logistics
+    3: {'name': 'Science',        'icon': '⚗', 'color': '#3fb950', 'bg': '#1a3d1a'},  # Physics/Chemistry
+    4: {'name': 'Technology',     'icon': '⚙', 'color': '#58a6ff', 'bg': '#1a2a3d'},  # Industrial/Engineering
+    5: {'name': 'Medical',        'icon': '✚', 'color': '#db61a2', 'bg': '#3d1a2a'},  # Health/Bio
+    6: {'name': 'Society',        'icon': '🏛', 'color': '#a371f7', 'bg': '#2a1a3d'},  # Culture/Politics
+}
+
+# -----------------------------------------------------------------------------
+# UNIT CLASS DEFINITIONS (NATO)
+# -----------------------------------------------------------------------------
+CLASS_INFO = {
+    1:  {'name': 'Reconnaissance',      'icon': '◉'}, # Scope / Target
+    2:  {'name': 'Armor / Tank',        'icon': '▭'}, # Flattened rectangle (Tracks)
+    3:  {'name': 'Anti-Tank',           'icon': '⟁'}, # Triangle (Directional)
+    4:  {'name': 'Infantry',            'icon': '⊠'}, # Box with X (Standard NATO)
+    5:  {'name': 'Artillery',           'icon': '⊙'}, # Dot in Circle (Standard NATO)
+    6:  {'name': 'Air Defense',         'icon': '⌒'}, # Dome / Radar Coverage
+    7:  {'name': 'Helicopter',          'icon': '✕'}, # Rotor blade
+    8:  {'name': 'Missile',             'icon': '⇡'}, # Upward trajectory
+    9:  {'name': 'Fighter',             'icon': '↛'}, # Interception
+    10: {'name': 'Attack Aircraft',     'icon': '↣'}, # Direct Attack
+    11: {'name': 'Interceptor',         'icon': '↟'}, # Fast climb/High alt
+    12: {'name': 'Bomber',              'icon': '▼'}, # Drop payload
+    13: {'name': 'ASW Aircraft',        'icon': '∿'}, # Wave/Sonar
+    14: {'name': 'Transport Aircraft',  'icon': '□'}, # Cargo Capacity
+    15: {'name': 'Submarine',           'icon': '∩'}, # Hull profile
+    16: {'name': 'Aircraft Carrier',    'icon': '⌧'}, # Flat deck
+    17: {'name': 'Capital Ship',        'icon': '▇'}, # Heavy mass
+    18: {'name': 'Destroyer/Escort',    'icon': 'shield'}, # Using shape or 🛡 if supported
+    19: {'name': 'Patrol Craft',        'icon': '⌖'}, # Radar/Light
+    20: {'name': 'Transport Ship',      'icon': '⫷'}, # Cargo
+    21: {'name': 'Installation',        'icon': '⌂'}, # Base/Facility
+}
+
+# -----------------------------------------------------------------------------
+# EFFECT DEFINITIONS (Comprehensive Wiki Mapping)
+# -----------------------------------------------------------------------------
+EFFECT_DEFINITIONS = {
+    # --- Global / Economic Effects ---
+    2:  {'name': 'Finished Goods Fac. Cost',   'category': 'Industry',    'icon': '🏗'},
+    3:  {'name': 'Facility Material Usage',    'category': 'Industry',    'icon': '🧱'},
+    5:  {'name': 'Research Efficiency',        'category': 'Science',     'icon': '⚗'},
+    6:  {'name': 'Counter-Intel Efficiency',   'category': 'Intel',       'icon': '⊘'},
+    7:  {'name': 'Intelligence Efficiency',    'category': 'Intel',       'icon': '👁'},
+    8:  {'name': 'Military Efficiency',        'category': 'Military',    'icon': '⚔'},
+    9:  {'name': 'Power Generation Output',    'category': 'Energy',      'icon': '⚡'},
+    13: {'name': 'Fuel Consumption Rate',      'category': 'Logistics',   'icon': '⛽'},
+    14: {'name': 'Motorized Unit Cost',        'category': 'Production',  'icon': '⛟'},
+    15: {'name': 'Unit Build Speed',           'category': 'Production',  'icon': '⏱'},
+    16: {'name': 'Facility Build Speed',       'category': 'Production',  'icon': '🏗'},
+    18: {'name': 'Finished Goods Efficiency',  'category': 'Industry',    'icon': '⚙'},
+    19: {'name': 'Finished Goods Cost',        'category': 'Industry',    'icon': '💲'},
+    20: {'name': 'Transportation Improvement', 'category': 'Logistics',    'icon': '⛽'},
+    21: {'name': 'Space Knowledge',            'category': 'Space',       'icon': '☄'},
+    22: {'name': 'Nuclear Plant Maint.',       'category': 'Energy',      'icon': '☢'},
+
+    # --- Resource Usage (Raw Material to Finished Goods) ---
+    24: {'name': 'Agri Usage (Mfg)',           'category': 'Resource',    'icon': '🌾'},
+    25: {'name': 'Rubber Usage (Mfg)',         'category': 'Resource',    'icon': '⚫'},
+    27: {'name': 'Petrol Usage (Mfg)',         'category': 'Resource',    'icon': '🛢'},
+    29: {'name': 'Ore Usage (Mfg)',            'category': 'Resource',    'icon': '⛏'},
+    33: {'name': 'Industrial Raw Usage',       'category': 'Resource',    'icon': '🔩'},
+    34: {'name': 'Military Raw Usage',         'category': 'Resource',    'icon': '🛡'},
+
+    # --- Production Output (Facilities) ---
+    35: {'name': 'Synth. Rubber Production',   'category': 'Output',      'icon': '⚗'},
+    38: {'name': 'Synth. Fuel Production',     'category': 'Output',      'icon': '🛢'},
+    40: {'name': 'Nuclear Power Output',       'category': 'Energy',      'icon': '☢'},
+    44: {'name': 'Consumer Goods Output',      'category': 'Output',      'icon': '🛍'},
+    45: {'name': 'Industrial Goods Output',    'category': 'Output',      'icon': '🏭'},
+    46: {'name': 'Military Goods Output',      'category': 'Output',      'icon': '🔫'},
+
+    # --- Races / Milestones ---
+    56: {'name': 'Atomic Race Capability',     'category': 'Strategic',   'icon': '☢'},
+    57: {'name': 'Bio/Pandemic Research',      'category': 'Strategic',   'icon': '☣'},
+    58: {'name': 'Internet Infrastructure',    'category': 'Strategic',   'icon': '🌐'},
+    59: {'name': 'Mars/Space Mission',         'category': 'Strategic',   'icon': '🚀'},
+
+    # --- Population Usage Modifiers (60-71) ---
+    63: {'name': 'Pop. Petrol Usage',          'category': 'Society',     'icon': '⛽'},
+    67: {'name': 'Pop. Power Usage',           'category': 'Society',     'icon': '⚡'},
+    68: {'name': 'Pop. Consumer Goods Usage',  'category': 'Society',     'icon': '🛒'},
+
+    # --- Resource Output Modifiers (72-83) ---
+    72: {'name': 'Agriculture Output',         'category': 'Economy',     'icon': '🌾'},
+    75: {'name': 'Petroleum Output',           'category': 'Economy',     'icon': '🛢'},
+    77: {'name': 'Ore Output',                 'category': 'Economy',     'icon': '⛏'},
+    79: {'name': 'Power Output (All)',         'category': 'Economy',     'icon': '⚡'},
+
+    # --- Resource Efficiency Modifiers (84-94) ---
+    84: {'name': 'Agriculture Efficiency',     'category': 'Economy',     'icon': '📈'},
+    87: {'name': 'Petroleum Efficiency',       'category': 'Economy',     'icon': '📈'},
+    93: {'name': 'Industrial Efficiency',      'category': 'Economy',     'icon': '📈'},
+    94: {'name': 'Military Goods Efficiency',  'category': 'Economy',     'icon': '📈'},
+    96: {'name': 'Garrison Infantry Level',  'category': 'Defense',     'icon': '🛡'},
+    97: {'name': 'Locomotive Unit Level',  'category': 'Logistics',     'icon': '⛽'},
+
+    # --- Social Ratings & Costs (100-115) ---
+    100: {'name': 'Healthcare Rating',         'category': 'Social',      'icon': '✚'},
+    101: {'name': 'Education Rating',          'category': 'Social',      'icon': '🎓'},
+    102: {'name': 'Infrastructure Rating',     'category': 'Social',      'icon': '🛣'},
+    103: {'name': 'Environment Rating',        'category': 'Social',      'icon': '🌲'},
+    105: {'name': 'Law Enforcement Rating',    'category': 'Social',      'icon': '⚖'},
+    108: {'name': 'Healthcare Cost',           'category': 'Finance',     'icon': '💲'},
+    109: {'name': 'Education Cost',            'category': 'Finance',     'icon': '💲'},
+    113: {'name': 'Law Enforcement Cost',      'category': 'Finance',     'icon': '💲'},
+
+    # --- Global Military Stats (116-127) ---
+    116: {'name': 'Hard Target Defense (All)', 'category': 'Defense',     'icon': '🛡'},
+    117: {'name': 'Soft Target Defense (All)', 'category': 'Defense',     'icon': '🛡'},
+    118: {'name': 'Ground Attack (All)',       'category': 'Offense',     'icon': '⚔'},
+    119: {'name': 'Anti-Air Attack (All)',     'category': 'Offense',     'icon': '⇡'},
+    120: {'name': 'Anti-Ship Attack (All)',    'category': 'Offense',     'icon': '⚓'},
+    122: {'name': 'Ballistic/Arty Range',      'category': 'Range',       'icon': '⤳'},
+    123: {'name': 'Missile Accuracy',          'category': 'Combat',      'icon': '🎯'},
+    124: {'name': 'Stealth Level (All)',       'category': 'Stealth',     'icon': '👻'},
+    125: {'name': 'Spotting Range (All)',      'category': 'Intel',       'icon': '🔭'},
+    127: {'name': 'Fortification Defense',     'category': 'Defense',     'icon': '🏰'},
+
+    # --- Space / Futuristic (128-139) ---
+    128: {'name': 'FTL Range',                 'category': 'Space',       'icon': '🌌'},
+    130: {'name': 'Space Beam Defense',        'category': 'Space',       'icon': '🛡'},
+    132: {'name': 'Space Beam Attack',         'category': 'Space',       'icon': '⚡'},
+    135: {'name': 'Shield Efficiency',         'category': 'Tech',        'icon': '🛡'},
+
+    # --- Unit Upgrade Techs (140-149: Attack Modifiers) ---
+    140: {'name': 'Soft Attack Upgrade',       'category': 'Offense',     'icon': '⨂'},
+    141: {'name': 'Hard Attack Upgrade',       'category': 'Offense',     'icon': '⨂'},
+    142: {'name': 'Fortification Attack',      'category': 'Offense',     'icon': '⌖'},
+    143: {'name': 'Low-Air Attack',            'category': 'Offense',     'icon': '⇡'},
+    144: {'name': 'Mid-Air Attack',            'category': 'Offense',     'icon': '⇡'},
+    145: {'name': 'High-Air Attack',           'category': 'Offense',     'icon': '⇡'},
+    146: {'name': 'Naval Surface Attack',      'category': 'Offense',     'icon': '⚓'},
+    147: {'name': 'Submarine Attack',          'category': 'Offense',     'icon': '⇝'},
+    148: {'name': 'Close Combat Attack',       'category': 'Offense',     'icon': '⚔'},
+
+    # --- Unit Upgrade Techs (150-153: Range Modifiers) ---
+    150: {'name': 'Ground Range Upgrade',      'category': 'Range',       'icon': '↦'},
+    151: {'name': 'Air Range Upgrade',         'category': 'Range',       'icon': '↝'},
+    152: {'name': 'Naval Range Upgrade',       'category': 'Range',       'icon': '〰'},
+
+    # --- Unit Upgrade Techs (154-157: Defense Modifiers) ---
+    154: {'name': 'Ground Defense Upgrade',    'category': 'Defense',     'icon': '🛡'},
+    155: {'name': 'Air Defense Upgrade',       'category': 'Defense',     'icon': '☂'},
+    156: {'name': 'Indirect Defense',          'category': 'Defense',     'icon': '⛨'},
+    157: {'name': 'Close Defense Upgrade',     'category': 'Defense',     'icon': '🛡'},
+
+    # --- Unit Specs & Logistics (158-170) ---
+    158: {'name': 'Unit Speed',                'category': 'Mobility',    'icon': '⏩'},
+    159: {'name': 'Unit Stealth',              'category': 'Stealth',     'icon': '∅'},
+    160: {'name': 'Unit Initiative',           'category': 'Combat',      'icon': '⚡'},
+    161: {'name': 'Combat Time/Ammo Eff.',     'category': 'Logistics',   'icon': '📦'},
+    162: {'name': 'Air/Sea Fuel Usage',        'category': 'Logistics',   'icon': '⛽'},
+    163: {'name': 'Missile Capacity',          'category': 'Loadout',     'icon': '🚀'},
+    164: {'name': 'Unit Efficiency',           'category': 'Combat',      'icon': '⭐'},
+    165: {'name': 'Ammo Capacity',             'category': 'Loadout',     'icon': '▮'},
+    166: {'name': 'Fuel Capacity',             'category': 'Logistics',   'icon': '🛢'},
+    167: {'name': 'Spotting Range 1',          'category': 'Intel',       'icon': '👁'},
+
+    # --- Boolean Flags / Unlocks (200+) ---
+    201: {'name': 'Enable SOSUS Spotting',     'category': 'Unlock',      'icon': '〰'},
+    202: {'name': 'Enable Nuclear Weapons',    'category': 'Unlock',      'icon': '☢'},
+    203: {'name': 'Enable Chemical Weapons',   'category': 'Unlock',      'icon': '☠'},
+    204: {'name': 'Enable Bio Weapons',        'category': 'Unlock',      'icon': '☣'},
+    205: {'name': 'Enable ComSat',             'category': 'Space',       'icon': '📡'},
+    206: {'name': 'Enable ReconSat',           'category': 'Space',       'icon': '🛰'},
+    209: {'name': 'Enable Cyberattack',        'category': 'Intel',       'icon': '💻'},
+    232: {'name': 'Enable Shields',            'category': 'Tech',        'icon': '🛡'},
+    233: {'name': 'Enable Beam Weapons',       'category': 'Tech',        'icon': '⚡'},
+    234: {'name': 'Unit ECM Equipped',         'category': 'Electronic',  'icon': '📶'},
+}
+
+
+# =============================================================================
+# DATA STRUCTURES
+# =============================================================================
+
+@dataclass
+class TechData:
+    id: int = 0
+    category: int = 0
+    tech_level: int = 0
+    short_title: str = ""
+    prereq_1: int = 0
+    prereq_2: int = 0
+    leads_to_1: int = 0
+    leads_to_2: int = 0
+    effects: List[Tuple[int, float]] = field(default_factory=list)
+    time_to_research: int = 0
+    cost: float = 0.0
+    pop_support: float = 0.0
+    set_by_default: int = 0
+    unlocks_units: List['UnitData'] = field(default_factory=list)
+    prerequisite_of: List[int] = field(default_factory=list)
+    # Computed fields
+    depth: int = 0  # Distance from root techs
+    chain_cost: float = 0.0  # Total cost including prerequisites
+
+
+@dataclass
+class NodePosition:
+    """Position data for a single node"""
+    x: float = 0.0
+    y: float = 0.0
+    layer: int = 0
+    position_in_layer: int = 0
+    cluster_id: int = 0
+
+@dataclass  
+class UnitData:
+    id: int = 0
+    name: str = ""
+    class_num: int = 0
+    year: str = ""
+    req_tech_id: int = 0
+    cost: float = 0.0
+    region: str = ""
+
+@dataclass  
+class LayoutResult:
+    """Complete layout computation result"""
+    positions: Dict[int, NodePosition] = field(default_factory=dict)
+    width: float = 0.0
+    height: float = 0.0
+    layer_positions: Dict[int, float] = field(default_factory=dict)
+    clusters: Dict[int, Set[int]] = field(default_factory=dict)
+    cluster_colors: Dict[int, str] = field(default_factory=dict)
+    cluster_bounds: Dict[int, Tuple[float, float, float, float]] = field(default_factory=dict)  # x, y, w, h
+
+
+@dataclass
+class ValidationReport:
+    """Structured result of validate_tech_tree"""
+    orphans: List[Tuple[int, int, str]] = field(default_factory=list)  # (tid, missing_id, field)
+    cycles: List[List[int]] = field(default_factory=list)  # Members of each cycle
+    broken_units: List[Tuple[int, int]] = field(default_factory=list)  # (unit_id, missing_tech_id)
+    leads_to_mismatches: List[Tuple[int, int, str, str]] = field(default_factory=list)  # (tid, target, field, reason)
+    duplicate_ids: List[int] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+    
+    def issue_count(self) -> int:
+        return (len(self.orphans) + len(self.cycles) + len(self.broken_units)
+                + len(self.leads_to_mismatches) + len(self.duplicate_ids))
+
+
+@dataclass
+class GraphMetrics:
+    """Batched structural metrics over the prerequisite DAG"""
+    idom: Dict[int, int] = field(default_factory=dict)          # Immediate dominator (0 = virtual root)
+    dominated: Dict[int, int] = field(default_factory=dict)     # Techs whose every path runs through this one
+    descendants: Dict[int, int] = field(default_factory=dict)   # Techs that eventually require this one
+    criticality: Dict[int, float] = field(default_factory=dict) # Share of root-to-leaf paths through this one
+
+
+@dataclass
+class ResearchSchedule:
+    """Result of schedule_research: who researches what, when, in which slot"""
+    slots: int = 1
+    entries: List[Tuple[int, int, int, int]] = field(default_factory=list)  # (tid, slot, start, end)
+    makespan: int = 0
+    total_cost: float = 0.0
+    critical_path: List[int] = field(default_factory=list)
+    critical_time: int = 0
+    unscheduled: List[int] = field(default_factory=list)  # Over budget or blocked by a cycle
+    unscheduled_targets: Dict[int, str] = field(default_factory=dict)  # Target id -> why it was not reached
+    targets: List[int] = field(default_factory=list)
+
+
+@dataclass
+class CostPlanes:
+    """Tech costs laid over ReachabilityIndex bit positions, so a bitset is priced without expanding it"""
+    planes: List[int] = field(default_factory=list)            # Plane b holds bit b of every whole-dollar cost
+    nonfinite: Dict[int, float] = field(default_factory=dict)  # Bit position -> inf/nan cost, kept out of the planes
+    
+    def total(self, bits: int) -> float:
+        """One AND + popcount per plane instead of a walk over the ids"""
+        total = float(sum((bits & plane).bit_count() << bit for bit, plane in enumerate(self.planes)))
+        for i, cost in self.nonfinite.items():
+            if bits >> i & 1:
+                total += cost
+        return total
+
+
+@dataclass
+class MultiTargetPlan:
+    """Research plan covering several targets with shared prerequisites counted once"""
+    targets: List[int] = field(default_factory=list)
+    order: List[int] = field(default_factory=list)  # Prerequisites first
+    total_cost: float = 0.0
+    total_time: int = 0  # Sequential research days
+    standalone_cost: Dict[int, float] = field(default_factory=dict)  # Target's own chain
+    marginal_cost: Dict[int, float] = field(default_factory=dict)    # Saved by dropping the target
+    unreachable: List[int] = field(default_factory=list)  # Missing or on a cycle
+
+
+@dataclass
+class LevelCurves:
+    """Cumulative per-level (year) totals, overall (category 0) and per category"""
+    levels: List[int] = field(default_factory=list)
+    cost: Dict[int, List[float]] = field(default_factory=dict)
+    time: Dict[int, List[float]] = field(default_factory=dict)
+    effect: Dict[int, List[float]] = field(default_factory=dict)
+    
+    def series(self, metric: str, category: int = 0) -> List[Tuple[int, float]]:
+        values = getattr(self, metric).get(category)
+        return list(zip(self.levels, values)) if values else []
+
+
+@dataclass
+class BalanceOutlier:
+    """A tech whose cost or value sits far outside its peers"""
+    tech_id: int = 0
+    kind: str = ""  # 'cost' (vs category curve) or 'value' (normalized effects per cost)
+    score: float = 0.0  # Modified z-score
+    assessment: str = ""
+
+
+@dataclass
+class BalanceReport:
+    """Result of analyze_balance"""
+    effect_scale: Dict[int, float] = field(default_factory=dict)  # Median |value| per effect id
+    cost_curves: Dict[int, Tuple[float, float]] = field(default_factory=dict)  # category -> (intercept, slope) of log10(cost) by level
+    effect_scores: Dict[int, float] = field(default_factory=dict)  # Sum of normalized effect magnitudes
+    cost_z: Dict[int, float] = field(default_factory=dict)
+    value_z: Dict[int, float] = field(default_factory=dict)
+    outliers: List[BalanceOutlier] = field(default_factory=list)
+
+
+@dataclass
+class TreeDelta:
+    """Per-tech differences between two trees, in the diff dialog's shape"""
+    added: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    modified: Dict[int, List[Tuple[str, str, str]]] = field(default_factory=dict)  # tid -> (field, old, new)
+
+
+@dataclass
+class ModDiff:
+    """One mod compared against the base: techs and units"""
+    path: str = ""
+    unit_path: str = ""
+    techs: TreeDelta = field(default_factory=TreeDelta)
+    units: TreeDelta = field(default_factory=TreeDelta)
+    mod_techs: Dict[int, TechData] = field(default_factory=dict)
+    mod_units: Dict[int, UnitData] = field(default_factory=dict)
+    error: str = ""
+
+
+@dataclass
+class MergeConflict:
+    """Two or more mods writing different values to the same tech field"""
+    tech_id: int = 0
+    attr: str = ""  # Attribute name, 'effects', '(added)' or '(removed)'
+    values: List[Tuple[str, str]] = field(default_factory=list)  # (mod name, formatted value) in load order
+    winner: str = ""
+
+
+@dataclass
+class MergeResult:
+    """Merged tree under a load order (later mods win) plus every conflict"""
+    load_order: List[str] = field(default_factory=list)
+    techs: Dict[int, TechData] = field(default_factory=dict)
+    conflicts: List[MergeConflict] = field(default_factory=list)
+    changed_by: Dict[str, int] = field(default_factory=dict)  # Mod -> techs it touched
+    errors: List[str] = field(default_factory=list)
+
+
+@dataclass
+class TreeDrawing:
+    """Flat, Qt-free drawing list of a laid-out tree, shared by the SVG and tile exporters"""
+    nodes: Dict[int, Tuple[float, float, str, str, str, str, str, int, bool]] = field(default_factory=dict)
+    # tid -> (x, y, category color, category icon, title, info line, detail line, unit count, has effects)
+    edges: List[Tuple[float, float, float, float]] = field(default_factory=list)  # Prereq right-middle -> tech left-middle
+    bounds: Tuple[float, float, float, float] = (0.0, 0.0, 0.0, 0.0)  # x, y, w, h including a margin
+
+
+# =============================================================================
+# PROFILING
+# =============================================================================
+
+class PerfRecorder:
+    """Lightweight per-stage timers with an optional cProfile capture"""
+    
+    def __init__(self, capture_profile: bool = False):
+        self.capture_profile = capture_profile
+        self.stages: List[Tuple[str, float]] = []  # (path, ms) in completion order
+        self.meta: Dict[str, object] = {}
+        self.profile_text = ""
+        self._stack: List[str] = []
+    
+    def reset(self):
+        self.stages.clear()
+        self.meta.clear()
+        self.profile_text = ""
+        self._stack.clear()
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block; nested stages are recorded as 'outer/inner'"""
+        self._stack.append(name)
+        path = "/".join(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((path, (time.perf_counter() - start) * 1000))
+            self._stack.pop()
+    
+    @contextmanager
+    def profile(self, top: int = 40):
+        """Run a block under cProfile if capture_profile is set"""
+        if not self.capture_profile:
+            yield
+            return
+        
+        import cProfile, pstats  # deferred: only needed when capturing
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(top)
+            self.profile_text = out.getvalue()
+    
+    def total_ms(self) -> float:
+        return sum(ms for path, ms in self.stages if "/" not in path)
+    
+    def to_dict(self) -> dict:
+        from datetime import datetime  # deferred
+        return {
+            'generated': datetime.now().isoformat(),
+            'version': VERSION,
+            'meta': self.meta,
+            'total_ms': round(self.total_ms(), 3),
+            'stages': [{'name': path, 'ms': round(ms, 3)} for path, ms in self.stages],
+            'profile': self.profile_text or None,
+        }
+    
+    def dump_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def _stage(profiler: Optional[PerfRecorder], name: str):
+    """profiler.stage(name), or a no-op when no recorder is attached"""
+    return profiler.stage(name) if profiler else nullcontext()
+
+
+
+class GridLayoutEngine:
+    """Layout engine che usa tech_level come colonne"""
+    
+    NODE_WIDTH = 200
+    NODE_HEIGHT = 70
+    H_SPACING = 320
+    V_SPACING = 130
+    MARGIN = 50
+    TOP_MARGIN = 120
+    
+    def __init__(self):
+        self.profiler: Optional[PerfRecorder] = None
+    
+    def compute(self, techs: dict, category_filter: int = 0) -> LayoutResult:
+        """Compute all positions at once: one sort, then rows from cumulative counts"""
+        result = LayoutResult()
+        
+        # Single sort by (level, category, title); tid keeps ties deterministic
+        with _stage(self.profiler, 'grid.sort'):
+            keys = sorted(
+                (t.tech_level, t.category, t.short_title, tid)
+                for tid, t in techs.items()
+                if category_filter == 0 or t.category == category_filter
+            )
+        
+        if not keys:
+            return result
+        
+        with _stage(self.profiler, 'grid.positions'):
+            self._assign_positions(result, keys)
+        
+        return result
+    
+    def _assign_positions(self, result: LayoutResult, keys: List[tuple]):
+        
+        # Each level is a contiguous run in `keys`: its first index is the
+        # cumulative count of all previous levels
+        level_counts = Counter(k[0] for k in keys)
+        levels = sorted(level_counts)
+        level_starts = dict(zip(levels, accumulate([0] + [level_counts[l] for l in levels[:-1]])))
+        level_x = {level: self.MARGIN + col * self.H_SPACING for col, level in enumerate(levels)}
+        
+        positions = result.positions
+        top, v_spacing = self.TOP_MARGIN, self.V_SPACING
+        for i, (level, _, _, tid) in enumerate(keys):
+            row = i - level_starts[level]
+            positions[tid] = NodePosition(x=level_x[level], y=top + row * v_spacing,
+                                          layer=level, position_in_layer=row)
+        
+        result.layer_positions = {level: x + self.NODE_WIDTH / 2 for level, x in level_x.items()}
+        
+        max_rows = max(level_counts.values())
+        result.width = level_x[levels[-1]] + self.NODE_WIDTH + self.MARGIN
+        result.height = top + (max_rows - 1) * v_spacing + self.NODE_HEIGHT + self.MARGIN
+
+
+class SugiyamaLayoutEngine:
+    """Sugiyama hierarchical layout con crossing minimization"""
+    
+    NODE_WIDTH = 200
+    NODE_HEIGHT = 70
+    H_SPACING = 280
+    V_SPACING = 100
+    MARGIN = 80
+    TOP_MARGIN = 120
+    
+    def __init__(self, use_tech_level_as_layer: bool = True,
+                 cluster_engine: Optional['CommunityClusterEngine'] = None):
+        self.use_tech_level_as_layer = use_tech_level_as_layer
+        self.cluster_engine = cluster_engine
+        self.profiler: Optional[PerfRecorder] = None
+    
+    def compute(self, techs: dict, category_filter: int = 0) -> LayoutResult:
+        result = LayoutResult()
+        prof = self.profiler
+        
+        filtered = {
+            tid: t for tid, t in techs.items()
+            if category_filter == 0 or t.category == category_filter
+        }
+        
+        if not filtered:
+            return result
+        
+        # Step 1: Layer assignment
+        with _stage(prof, 'sugiyama.layers'):
+            layers = self._assign_layers(filtered)
+        
+        # Step 2: Initial ordering
+        with _stage(prof, 'sugiyama.ordering'):
+            layer_order = self._initial_ordering(filtered, layers)
+        
+        # Step 3: Crossing minimization (4 passes)
+        with _stage(prof, 'sugiyama.crossings'):
+            layer_order = self._minimize_crossings(filtered, layers, layer_order, passes=4)
+        
+        # Step 4: Coordinate assignment
+        with _stage(prof, 'sugiyama.coordinates'):
+            positions = self._assign_coordinates(filtered, layers, layer_order)
+        
+        # Step 5: Detect clusters
+        with _stage(prof, 'sugiyama.clusters'):
+            clusters, cluster_colors, cluster_of = self._detect_clusters(filtered)
+        
+        with _stage(prof, 'sugiyama.finalize'):
+            return self._build_result(layers, layer_order, positions, clusters, cluster_colors, cluster_of)
+    
+    def _build_result(self, layers: Dict[int, int], layer_order: Dict[int, List[int]],
+                      positions: Dict[int, Tuple[float, float]], clusters: Dict[int, Set[int]],
+                      cluster_colors: Dict[int, str], cluster_of: Dict[int, int]) -> LayoutResult:
+        """Finalize the LayoutResult in O(V): positions in layer and clusters are lookups"""
+        result = LayoutResult()
+        
+        pos_in_layer = {tid: i for tids in layer_order.values() for i, tid in enumerate(tids)}
+        for tid, (x, y) in positions.items():
+            result.positions[tid] = NodePosition(
+                x=x, y=y, layer=layers[tid], 
+                position_in_layer=pos_in_layer.get(tid, 0),
+                cluster_id=cluster_of.get(tid, 0)
+            )
+        
+        for layer, tids in layer_order.items():
+            if tids and tids[0] in positions:
+                result.layer_positions[layer] = positions[tids[0]][0] + self.NODE_WIDTH / 2
+        
+        result.clusters = clusters
+        result.cluster_colors = cluster_colors
+        
+        for cid, members in clusters.items():
+            xs = [positions[tid][0] for tid in members if tid in positions]
+            ys = [positions[tid][1] for tid in members if tid in positions]
+            if xs:
+                result.cluster_bounds[cid] = (
+                    min(xs), min(ys),
+                    max(xs) - min(xs) + self.NODE_WIDTH, max(ys) - min(ys) + self.NODE_HEIGHT
+                )
+        
+        if positions:
+            max_x = max(p[0] for p in positions.values())
+            max_y = max(p[1] for p in positions.values())
+            result.width = max_x + self.NODE_WIDTH + self.MARGIN
+            result.height = max_y + self.NODE_HEIGHT + self.MARGIN
+        
+        return result
+    
+    def _assign_layers(self, techs: dict) -> Dict[int, int]:
+        if self.use_tech_level_as_layer:
+            return {tid: t.tech_level for tid, t in techs.items()}
+        
+        layers = {}
+        def get_layer(tid):
+            if tid in layers:
+                return layers[tid]
+            if tid not in techs:
+                return 0
+            tech = techs[tid]
+            prereq_layers = []
+            if tech.prereq_1 and tech.prereq_1 in techs:
+                prereq_layers.append(get_layer(tech.prereq_1))
+            if tech.prereq_2 and tech.prereq_2 in techs:
+                prereq_layers.append(get_layer(tech.prereq_2))
+            layer = (max(prereq_layers) + 1) if prereq_layers else 0
+            layers[tid] = layer
+            return layer
+        
+        for tid in techs:
+            get_layer(tid)
+        return layers
+    
+    def _initial_ordering(self, techs: dict, layers: Dict[int, int]) -> Dict[int, List[int]]:
+        layer_order: Dict[int, List[int]] = defaultdict(list)
+        for tid, layer in layers.items():
+            layer_order[layer].append(tid)
+        
+        for layer in layer_order:
+            layer_order[layer].sort(key=lambda t: (techs[t].category, techs[t].short_title))
+        
+        return dict(layer_order)
+    
+    def _minimize_crossings(self, techs: dict, layers: Dict[int, int], 
+                           layer_order: Dict[int, List[int]], passes: int = 4) -> Dict[int, List[int]]:
+        sorted_layers = sorted(layer_order.keys())
+        
+        # Dependents grouped once, so backward sweeps don't rescan every tech
+        children: Dict[int, List[int]] = defaultdict(list)
+        for tid, tech in techs.items():
+            for prereq in (tech.prereq_1, tech.prereq_2):
+                if prereq and prereq in techs:
+                    children[prereq].append(tid)
+        
+        for _ in range(passes):
+            # Forward sweep
+            for i in range(1, len(sorted_layers)):
+                prev_layer = sorted_layers[i - 1]
+                curr_layer = sorted_layers[i]
+                layer_order[curr_layer] = self._reorder_by_barycenter(
+                    techs, children, layer_order, curr_layer, prev_layer, forward=True
+                )
+            
+            # Backward sweep
+            for i in range(len(sorted_layers) - 2, -1, -1):
+                next_layer = sorted_layers[i + 1]
+                curr_layer = sorted_layers[i]
+                layer_order[curr_layer] = self._reorder_by_barycenter(
+                    techs, children, layer_order, curr_layer, next_layer, forward=False
+                )
+        
+        return layer_order
+    
+    def _reorder_by_barycenter(self, techs: dict, children: Dict[int, List[int]],
+                               layer_order: Dict[int, List[int]], 
+                               curr_layer: int, ref_layer: int, forward: bool) -> List[int]:
+        curr_nodes = layer_order.get(curr_layer, [])
+        ref_nodes = layer_order.get(ref_layer, [])
+        
+        if not curr_nodes or not ref_nodes:
+            return curr_nodes
+        
+        ref_pos = {tid: i for i, tid in enumerate(ref_nodes)}
+        barycenters = []
+        
+        for index, tid in enumerate(curr_nodes):
+            tech = techs[tid]
+            
+            if forward:
+                neighbors = (tech.prereq_1, tech.prereq_2)
+            else:
+                neighbors = children.get(tid, ())
+            connected_positions = [ref_pos[n] for n in neighbors if n and n in ref_pos]
+            
+            if connected_positions:
+                barycenter = sum(connected_positions) / len(connected_positions)
+            else:
+                barycenter = index
+            
+            barycenters.append((tid, barycenter))
+        
+        barycenters.sort(key=lambda x: x[1])
+        return [tid for tid, _ in barycenters]
+    
+    def _assign_coordinates(self, techs: dict, layers: Dict[int, int],
+                           layer_order: Dict[int, List[int]]) -> Dict[int, Tuple[float, float]]:
+        positions = {}
+        sorted_layers = sorted(layer_order.keys())
+        max_in_any_layer = max(len(layer_order[l]) for l in sorted_layers) if sorted_layers else 1
+        
+        for i, layer in enumerate(sorted_layers):
+            x = self.MARGIN + i * self.H_SPACING
+            nodes = layer_order[layer]
+            
+            total_height = len(nodes) * self.V_SPACING
+            start_y = self.TOP_MARGIN + (max_in_any_layer * self.V_SPACING - total_height) / 2
+            
+            for j, tid in enumerate(nodes):
+                y = self._compute_median_y(tid, techs, positions, start_y + j * self.V_SPACING)
+                positions[tid] = (x, y)
+        
+        positions = self._resolve_overlaps(positions, layer_order)
+        return positions
+    
+    def _compute_median_y(self, tid: int, techs: dict, 
+                         existing_positions: Dict[int, Tuple[float, float]],
+                         default_y: float) -> float:
+        tech = techs[tid]
+        connected_ys = []
+        
+        for prereq in [tech.prereq_1, tech.prereq_2]:
+            if prereq and prereq in existing_positions:
+                connected_ys.append(existing_positions[prereq][1])
+        
+        if connected_ys:
+            return sum(connected_ys) / len(connected_ys)
+        return default_y
+    
+    def _resolve_overlaps(self, positions: Dict[int, Tuple[float, float]],
+                         layer_order: Dict[int, List[int]]) -> Dict[int, Tuple[float, float]]:
+        for layer, nodes in layer_order.items():
+            if len(nodes) <= 1:
+                continue
+            
+            nodes_with_y = [(tid, positions[tid][1]) for tid in nodes if tid in positions]
+            nodes_with_y.sort(key=lambda x: x[1])
+            
+            for i in range(1, len(nodes_with_y)):
+                prev_tid, prev_y = nodes_with_y[i - 1]
+                curr_tid, curr_y = nodes_with_y[i]
+                
+                min_y = prev_y + self.V_SPACING
+                if curr_y < min_y:
+                    x = positions[curr_tid][0]
+                    positions[curr_tid] = (x, min_y)
+                    nodes_with_y[i] = (curr_tid, min_y)
+        
+        return positions
+    
+    def _connected_components(self, techs: dict) -> Dict[int, int]:
+        """Weakly connected components via union-find: tid -> cluster_id"""
+        parent = {tid: tid for tid in techs}
+        
+        def find(tid: int) -> int:
+            while parent[tid] != tid:
+                parent[tid] = parent[parent[tid]]  # Path halving
+                tid = parent[tid]
+            return tid
+        
+        for tid, tech in techs.items():
+            for prereq in (tech.prereq_1, tech.prereq_2):
+                if prereq and prereq in parent:
+                    root_a, root_b = find(tid), find(prereq)
+                    if root_a != root_b:
+                        parent[root_a] = root_b
+        
+        # Number components in first-seen order of techs
+        root_to_cluster: Dict[int, int] = {}
+        return {tid: root_to_cluster.setdefault(find(tid), len(root_to_cluster)) for tid in techs}
+    
+    def _detect_clusters(self, techs: dict) -> Tuple[Dict[int, Set[int]], Dict[int, str], Dict[int, int]]:
+        """Clusters from the cluster engine, or weakly connected components.
+        
+        Returns clusters, cluster colors and a tid -> cluster_id lookup.
+        """
+        if self.cluster_engine is not None:
+            cluster_of = self.cluster_engine.compute(techs)
+        else:
+            cluster_of = self._connected_components(techs)
+        
+        clusters: Dict[int, Set[int]] = {}
+        for tid, cid in cluster_of.items():
+            clusters.setdefault(cid, set()).add(tid)
+        
+        cluster_palette = [
+            '#58a6ff20', '#3fb95020', '#f8514920', '#d2992220',
+            '#a371f720', '#db61a220', '#39c5cf20', '#8b949e20'
+        ]
+        
+        cluster_colors = {
+            cid: cluster_palette[cid % len(cluster_palette)]
+            for cid in clusters
+        }
+        
+        return clusters, cluster_colors, cluster_of
+
+
+class ForceLayoutEngine:
+    """Force-directed layout seeded from the hierarchical result.
+    
+    Fruchterman-Reingold with grid-cutoff repulsion: nodes only repel
+    within 2 * IDEAL_LENGTH, found through a bucket grid, so an iteration
+    is O(V + E). A weak spring to the seed keeps tech levels readable.
+    Large trees get fewer iterations (see iterations_for): the seed is
+    already a good layout, and the total work stays bounded.
+    """
+    
+    NODE_WIDTH = 200
+    NODE_HEIGHT = 70
+    MARGIN = 80
+    IDEAL_LENGTH = 260.0
+    ITERATIONS = 60
+    MIN_ITERATIONS = 15
+    FULL_ITERATIONS_UP_TO = 5000  # Nodes; above this iterations shrink as 1/n down to MIN_ITERATIONS
+    FRAME_EVERY = 5
+    ANCHOR_STRENGTH = 0.05
+    # Forward half of the 3x3 neighbourhood: with the own cell, every nearby pair is visited once
+    _FORWARD_CELLS = ((1, -1), (1, 0), (1, 1), (0, 1))
+    
+    def __init__(self, seed_engine: Optional[SugiyamaLayoutEngine] = None):
+        self.seed_engine = seed_engine or SugiyamaLayoutEngine(use_tech_level_as_layer=True)
+        self.profiler: Optional[PerfRecorder] = None
+    
+    def compute(self, techs: dict, category_filter: int = 0) -> LayoutResult:
+        """Seed and run all iterations synchronously"""
+        with _stage(self.profiler, 'force.seed'):
+            seed = self.seed_engine.compute(techs, category_filter)
+        
+        positions = {tid: (p.x, p.y) for tid, p in seed.positions.items()}
+        with _stage(self.profiler, 'force.iterations'):
+            for positions in self.iterate(techs, seed):
+                pass
+        
+        with _stage(self.profiler, 'force.finalize'):
+            return self.build_result(seed, positions)
+    
+    def iterations_for(self, n: int) -> int:
+        if n <= self.FULL_ITERATIONS_UP_TO:
+            return self.ITERATIONS
+        return max(self.MIN_ITERATIONS, self.ITERATIONS * self.FULL_ITERATIONS_UP_TO // n)
+    
+    def iterate(self, techs: dict, seed: LayoutResult,
+                cancelled: Callable[[], bool] = lambda: False) -> Iterator[Dict[int, Tuple[float, float]]]:
+        """Yield intermediate positions every FRAME_EVERY iterations"""
+        ids = list(seed.positions)
+        if not ids:
+            return
+        index = {tid: i for i, tid in enumerate(ids)}
+        n = len(ids)
+        
+        xs = [seed.positions[tid].x for tid in ids]
+        ys = [seed.positions[tid].y for tid in ids]
+        anchor_x, anchor_y = list(xs), list(ys)
+        edges = [
+            (index[tid], index[prereq])
+            for tid in ids
+            for prereq in (techs[tid].prereq_1, techs[tid].prereq_2)
+            if prereq and prereq in index
+        ]
+        
+        k = self.IDEAL_LENGTH
+        k2 = k * k
+        cutoff = 2 * k
+        cutoff2 = cutoff * cutoff
+        anchor = self.ANCHOR_STRENGTH
+        iterations = self.iterations_for(n)
+        temperature = k
+        cooling = temperature / iterations
+        
+        for iteration in range(1, iterations + 1):
+            if cancelled():
+                return
+            dx = [0.0] * n
+            dy = [0.0] * n
+            
+            # Repulsion between nodes in the same or adjacent grid cells, each pair once
+            cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+            for i in range(n):
+                cells[(int(xs[i] // cutoff), int(ys[i] // cutoff))].append(i)
+            
+            for (cx, cy), members in cells.items():
+                forward = [j for ox, oy in self._FORWARD_CELLS for j in cells.get((cx + ox, cy + oy), ())]
+                for a, i in enumerate(members):
+                    xi, yi = xs[i], ys[i]
+                    fx = fy = 0.0
+                    for j in members[a + 1:] + forward:
+                        ddx = xi - xs[j]
+                        ddy = yi - ys[j]
+                        d2 = ddx * ddx + ddy * ddy
+                        if d2 >= cutoff2:
+                            continue
+                        if d2 < 1.0:
+                            # Coincident nodes: push apart along a stable direction
+                            ddx, ddy, d2 = (1.0 if i > j else -1.0), 0.0, 1.0
+                        f = k2 / d2
+                        fx += ddx * f
+                        fy += ddy * f
+                        dx[j] -= ddx * f
+                        dy[j] -= ddy * f
+                    dx[i] += fx
+                    dy[i] += fy
+            
+            # Attraction along prerequisite edges
+            for i, j in edges:
+                ddx = xs[i] - xs[j]
+                ddy = ys[i] - ys[j]
+                f = math.sqrt(ddx * ddx + ddy * ddy) / k
+                dx[i] -= ddx * f
+                dy[i] -= ddy * f
+                dx[j] += ddx * f
+                dy[j] += ddy * f
+            
+            # Spring to the seed, then move at most `temperature`
+            for i in range(n):
+                mx = dx[i] + (anchor_x[i] - xs[i]) * anchor * k
+                my = dy[i] + (anchor_y[i] - ys[i]) * anchor * k
+                length = math.sqrt(mx * mx + my * my)
+                if length > 0:
+                    step = min(length, temperature) / length
+                    xs[i] += mx * step
+                    ys[i] += my * step
+            
+            temperature = max(temperature - cooling, 1.0)
+            
+            if iteration % self.FRAME_EVERY == 0 or iteration == iterations:
+                yield {tid: (xs[i], ys[i]) for i, tid in enumerate(ids)}
+    
+    def build_result(self, seed: LayoutResult, positions: Dict[int, Tuple[float, float]]) -> LayoutResult:
+        """Final LayoutResult: seed layers and clusters, new coordinates"""
+        result = LayoutResult()
+        if not positions:
+            return result
+        
+        # Shift so the layout starts at the margin like the other engines
+        min_x = min(x for x, _ in positions.values())
+        min_y = min(y for _, y in positions.values())
+        off_x, off_y = self.MARGIN - min_x, self.MARGIN - min_y
+        
+        for tid, (x, y) in positions.items():
+            p = seed.positions[tid]
+            result.positions[tid] = NodePosition(x=x + off_x, y=y + off_y, layer=p.layer,
+                                                 position_in_layer=p.position_in_layer,
+                                                 cluster_id=p.cluster_id)
+        
+        # Timeline ticks follow where each level ended up, not where the seed put it
+        layer_x: Dict[int, List[float]] = defaultdict(list)
+        for p in result.positions.values():
+            layer_x[p.layer].append(p.x)
+        result.layer_positions = {layer: sum(xs) / len(xs) + self.NODE_WIDTH / 2 for layer, xs in layer_x.items()}
+        
+        result.clusters = seed.clusters
+        result.cluster_colors = seed.cluster_colors
+        for cid, members in seed.clusters.items():
+            xs = [result.positions[tid].x for tid in members if tid in result.positions]
+            ys = [result.positions[tid].y for tid in members if tid in result.positions]
+            if xs:
+                result.cluster_bounds[cid] = (
+                    min(xs), min(ys),
+                    max(xs) - min(xs) + self.NODE_WIDTH, max(ys) - min(ys) + self.NODE_HEIGHT
+                )
+        
+        result.width = max(p.x for p in result.positions.values()) + self.NODE_WIDTH + self.MARGIN
+        result.height = max(p.y for p in result.positions.values()) + self.NODE_HEIGHT + self.MARGIN
+        return result
+
+
+class CommunityClusterEngine:
+    """Label propagation over the prerequisite graph.
+    
+    Edges are weighted by category match and effect overlap, so the one
+    giant connected component of the game tree splits into tech families.
+    """
+    
+    BASE_WEIGHT = 0.25
+    SAME_CATEGORY_WEIGHT = 1.0
+    EFFECT_WEIGHT = 1.0  # Scaled by Jaccard similarity of effect ids
+    MAX_ITERATIONS = 30
+    
+    def compute(self, techs: dict) -> Dict[int, int]:
+        """Return tid -> cluster_id, ids numbered by first member in techs"""
+        neighbors = self._weighted_neighbors(techs)
+        label = {tid: tid for tid in techs}
+        
+        # Asynchronous updates in level order converge in a few sweeps
+        order = sorted((tid for tid in techs if neighbors[tid]),
+                       key=lambda t: (techs[t].tech_level, t))
+        for _ in range(self.MAX_ITERATIONS):
+            changed = False
+            for tid in order:
+                votes: Dict[int, float] = defaultdict(float)
+                for other, weight in neighbors[tid]:
+                    votes[label[other]] += weight
+                best = max(votes.items(), key=lambda kv: (kv[1], -kv[0]))[0]
+                if votes.get(label[tid], 0.0) < votes[best]:
+                    label[tid] = best
+                    changed = True
+            if not changed:
+                break
+        
+        renumber: Dict[int, int] = {}
+        return {tid: renumber.setdefault(label[tid], len(renumber)) for tid in techs}
+    
+    def _weighted_neighbors(self, techs: dict) -> Dict[int, List[Tuple[int, float]]]:
+        effect_ids = {tid: {eid for eid, _ in t.effects} for tid, t in techs.items()}
+        neighbors: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+        
+        for tid, tech in techs.items():
+            for prereq in (tech.prereq_1, tech.prereq_2):
+                if not prereq or prereq not in techs:
+                    continue
+                weight = self.BASE_WEIGHT
+                if techs[prereq].category == tech.category:
+                    weight += self.SAME_CATEGORY_WEIGHT
+                a, b = effect_ids[tid], effect_ids[prereq]
+                if a and b:
+                    weight += self.EFFECT_WEIGHT * len(a & b) / len(a | b)
+                neighbors[tid].append((prereq, weight))
+                neighbors[prereq].append((tid, weight))
+        
+        return neighbors
+
+
+class SpatialGrid:
+    """Uniform bucket grid over rectangles for fast viewport queries"""
+    
+    def __init__(self, cell_size: float = 1000.0):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        self.rects: Dict[int, Tuple[float, float, float, float]] = {}
+    
+    def _cell_range(self, x: float, y: float, w: float, h: float):
+        size = self.cell_size
+        for cx in range(int(x // size), int((x + w) // size) + 1):
+            for cy in range(int(y // size), int((y + h) // size) + 1):
+                yield cx, cy
+    
+    def insert(self, key: int, rect: Tuple[float, float, float, float]):
+        self.rects[key] = rect
+        for cell in self._cell_range(*rect):
+            self.cells[cell].add(key)
+    
+    def query(self, rect: Tuple[float, float, float, float]) -> Set[int]:
+        """Keys whose rectangle intersects `rect`"""
+        x, y, w, h = rect
+        hits = set()
+        for cell in self._cell_range(x, y, w, h):
+            for key in self.cells.get(cell, ()):
+                kx, ky, kw, kh = self.rects[key]
+                if kx < x + w and x < kx + kw and ky < y + h and y < ky + kh:
+                    hits.add(key)
+        return hits
+
+
+# =============================================================================
+# PARSERS
+# =============================================================================
+
+def parse_int(v: str) -> int:
+    try: return int(float(v.strip())) if v.strip() else 0
+    except: return 0
+
+def parse_float(v: str) -> float:
+    try: return float(v.strip()) if v.strip() else 0.0
+    except: return 0.0
+
+
+def load_tech_tree(path: str, profiler: Optional[PerfRecorder] = None) -> Dict[int, TechData]:
+    techs = {}
+    try:
+        with _stage(profiler, 'parse.read'), open(path, "r", encoding="Windows-1252", errors="replace") as f:
+            lines = f.readlines()
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        return techs
+    
+    with _stage(profiler, 'parse.rows'):
+        _parse_tech_rows(lines, techs)
+    
+    # Build reverse links and depths
+    print("Building reverse links and depths...")
+    with _stage(profiler, 'parse.finalize'):
+        _finalize_tree(techs)
+    
+    print("Tech tree loaded successfully.") #
+    return techs
+
+
+def _parse_tech_rows(lines: List[str], techs: Dict[int, TechData]):
+    import csv  # deferred
+    start_idx = next((i+1 for i, l in enumerate(lines) if l.strip().startswith("&&TTR")), 0)
+    
+    count = 0  # <--- NUOVO: Inizializza contatore
+    
+    for row in csv.reader(lines[start_idx:], delimiter=","):
+        count += 1  # <--- NUOVO: Incrementa
+        
+        # <--- NUOVO: Stampa ogni 1000 righe per far vedere che è vivo
+        if count % 1000 == 0:
+            print(f"Reading row {count}...") 
+            
+        if len(row) < 30 or not row[0].strip():
+            continue
+        try:
+            tid = parse_int(row[0])
+            if tid <= 0: continue
+            
+            t = TechData(id=tid)
+            t.category = parse_int(row[1])
+            t.tech_level = parse_int(row[2])
+            t.prereq_1 = parse_int(row[4])
+            t.prereq_2 = parse_int(row[5])
+            
+            for ec, vc in [(6,10), (7,11), (8,12), (9,13)]:
+                eid = parse_int(row[ec])
+                if eid > 0:
+                    t.effects.append((eid, parse_float(row[vc])))
+            
+            t.time_to_research = parse_int(row[14])
+            t.cost = parse_float(row[15])
+            t.pop_support = parse_float(row[16])
+            t.set_by_default = parse_int(row[20])
+            
+            if len(row) > 28: t.leads_to_1 = parse_int(row[28])
+            if len(row) > 29: t.leads_to_2 = parse_int(row[29])
+            
+            if "//" in row[-1]:
+                t.short_title = row[-1].split("//")[-1].strip()
+            
+            techs[tid] = t
+        except: continue
+
+
+def _finalize_tree(techs: Dict[int, TechData]):
+    """Rebuild prerequisite_of links and depths, e.g. after merging or editing edges"""
+    for tech in techs.values():
+        tech.prerequisite_of = []
+    for tid, tech in techs.items():
+        for prereq in [tech.prereq_1, tech.prereq_2]:
+            if prereq and prereq in techs:
+                techs[prereq].prerequisite_of.append(tid)
+    _calculate_depths(techs)
+
+
+def _calculate_depths(techs: Dict[int, TechData]):
+    """Calculate depth (distance from root) for each tech - OPTIMIZED"""
+    depth_cache = {}
+    path_visited = set()
+    
+    sys.setrecursionlimit(5000)
+    
+    def get_depth(tid: int) -> int:
+        if tid not in techs:
+            return 0
+            
+        if tid in depth_cache:
+            return depth_cache[tid]
+            
+        if tid in path_visited:
+            return 0
+            
+        path_visited.add(tid)
+        tech = techs[tid]
+        
+        d1 = get_depth(tech.prereq_1) if tech.prereq_1 else 0
+        d2 = get_depth(tech.prereq_2) if tech.prereq_2 else 0
+        
+        res = max(d1, d2) + 1
+        
+        depth_cache[tid] = res
+        path_visited.remove(tid)
+        
+        tech.depth = res
+        return res
+    
+    for tid in techs:
+        get_depth(tid)
+
+
+def load_units(path: str) -> Dict[int, UnitData]:
+    import csv  # deferred
+    units = {}
+    try:
+        with open(path, "r", encoding="latin-1", errors="replace") as f:
+            lines = f.readlines()
+    except: return units
+    
+    start_idx = next((i+1 for i, l in enumerate(lines) if l.strip().startswith("&&UNITS")), 0)
+    
+    for row in csv.reader(lines[start_idx:], delimiter=",", quotechar='"'):
+        if not row or len(row) < 30 or row[0].strip().startswith("//"):
+            continue
+        try:
+            u = UnitData()
+            u.id = parse_int(row[0])
+            u.name = row[1].strip().strip('"')
+            u.class_num = parse_int(row[2])
+            year_val = parse_int(row[4])
+            u.year = str(1900 + year_val) if year_val > 0 else ""
+            
+            # Tech Requirement is at column 23
+            u.req_tech_id = parse_int(row[23]) if len(row) > 23 else 0
+            u.region = row[12].strip() if len(row) > 12 else ""
+            
+            # Strength (numero soldati/veicoli) è alla colonna 13
+            strength = parse_int(row[13]) or 1
+            
+            # --- CORREZIONE DEFINITIVA ---
+            # 1. Usiamo la colonna 26 (come nel tuo file per Pennsylvania, Moltke, ecc.)
+            # 2. Moltiplichiamo per 1.000.000 (il file dice "11.1" per 11.1 Milioni)
+            # 3. Moltiplichiamo per strength (il costo nel file è solitamente per singolo pezzo)
+            cost_per_unit_m = parse_float(row[26]) if len(row) > 26 else 0.0
+            u.cost = cost_per_unit_m * 1000000.0 * strength
+            # -----------------------------
+            
+            if u.id > 0:
+                units[u.id] = u
+        except: continue
+    
+    return units
+
+
+def link_units_to_techs(techs: Dict[int, TechData], units: Dict[int, UnitData]):
+    for u in units.values():
+        if u.req_tech_id and u.req_tech_id in techs:
+            techs[u.req_tech_id].unlocks_units.append(u)
+
+
+# =============================================================================
+# CACHE SYSTEM
+# =============================================================================
+
+CACHE_DIR = Path.home() / "Documents" / "SR2030_Logger" / "cache"
+CACHE_VERSION = 2  # Increment if data structure changes
+
+def _get_file_hash(path: str) -> str:
+    """Get modification time + size as a quick hash"""
+    try:
+        p = Path(path)
+        stat = p.stat()
+        return f"{stat.st_mtime}_{stat.st_size}"
+    except:
+        return ""
+
+def _get_cache_path(ttrx_path: str, unit_path: str) -> Path:
+    """Generate cache filename based on source files"""
+    # Use hash of paths for unique cache file
+    key = f"{ttrx_path}|{unit_path}"
+    import hashlib  # deferred
+    hash_name = hashlib.md5(key.encode()).hexdigest()[:12]
+    return CACHE_DIR / f"techcache_{hash_name}.pkl"
+
+def load_from_cache(ttrx_path: str, unit_path: str) -> Optional[Tuple[Dict[int, TechData], Dict[int, UnitData]]]:
+    """Try to load data from cache if valid"""
+    import pickle  # deferred
+    cache_path = _get_cache_path(ttrx_path, unit_path)
+    
+    if not cache_path.exists():
+        return None
+    
+    try:
+        with open(cache_path, 'rb') as f:
+            cache_data = pickle.load(f)
+        
+        # Validate cache
+        if cache_data.get('version') != CACHE_VERSION:
+            return None
+        if cache_data.get('ttrx_hash') != _get_file_hash(ttrx_path):
+            return None
+        if cache_data.get('unit_hash') != _get_file_hash(unit_path):
+            return None
+        
+        return cache_data['techs'], cache_data['units']
+    except:
+        return None
+
+def save_to_cache(ttrx_path: str, unit_path: str, techs: Dict[int, TechData], units: Dict[int, UnitData]):
+    """Save parsed data to cache"""
+    import pickle  # deferred
+    from datetime import datetime
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        
+        cache_data = {
+            'version': CACHE_VERSION,
+            'ttrx_hash': _get_file_hash(ttrx_path),
+            'unit_hash': _get_file_hash(unit_path),
+            'ttrx_path': ttrx_path,
+            'unit_path': unit_path,
+            'cached_at': datetime.now().isoformat(),
+            'techs': techs,
+            'units': units,
+        }
+        
+        cache_path = _get_cache_path(ttrx_path, unit_path)
+        with open(cache_path, 'wb') as f:
+            pickle.dump(cache_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        return True
+    except Exception as e:
+        print(f"Cache save failed: {e}")
+        return False
+
+def clear_cache():
+    """Clear all cached data"""
+    try:
+        if CACHE_DIR.exists():
+            for f in CACHE_DIR.glob("techcache_*.pkl"):
+                f.unlink()
+        return True
+    except:
+        return False
+
+
+def load_with_cache(ttrx_path: str, unit_path: str) -> Tuple[Dict[int, TechData], Dict[int, UnitData]]:
+    """Load techs and units, going through the cache like the main window does"""
+    cached = load_from_cache(ttrx_path, unit_path)
+    if cached:
+        return cached
+    techs = load_tech_tree(ttrx_path)
+    units = load_units(unit_path) if techs else {}
+    link_units_to_techs(techs, units)
+    if techs:
+        save_to_cache(ttrx_path, unit_path, techs, units)
+    return techs, units
+
+
+# =============================================================================
+# ANALYSIS FUNCTIONS
+# =============================================================================
+
+def get_full_prereq_chain(tech_id: int, techs: Dict[int, TechData]) -> Set[int]:
+    """Get all prerequisites recursively"""
+    chain = set()
+    visited = set()
+    
+    def traverse(tid):
+        if tid in visited or tid not in techs:
+            return
+        visited.add(tid)
+        chain.add(tid)
+        t = techs[tid]
+        if t.prereq_1: traverse(t.prereq_1)
+        if t.prereq_2: traverse(t.prereq_2)
+    
+    if tech_id in techs:
+        t = techs[tech_id]
+        if t.prereq_1: traverse(t.prereq_1)
+        if t.prereq_2: traverse(t.prereq_2)
+    
+    return chain
+
+
+def get_all_descendants(tech_id: int, techs: Dict[int, TechData]) -> Set[int]:
+    """Get all techs that eventually require this one"""
+    descendants = set()
+    visited = set()
+    
+    def traverse(tid):
+        if tid in visited or tid not in techs:
+            return
+        visited.add(tid)
+        descendants.add(tid)
+        for child in techs[tid].prerequisite_of:
+            traverse(child)
+    
+    if tech_id in techs:
+        for child in techs[tech_id].prerequisite_of:
+            traverse(child)
+    
+    return descendants
+
+
+def topological_order(techs: Dict[int, TechData]) -> List[int]:
+    """Prerequisites-first order (Kahn); techs on a cycle are left out"""
+    indegree = {tid: 0 for tid in techs}
+    children: Dict[int, List[int]] = defaultdict(list)
+    for tid, tech in techs.items():
+        for p in (tech.prereq_1, tech.prereq_2):
+            if p and p in techs and p != tid:
+                indegree[tid] += 1
+                children[p].append(tid)
+    
+    order = [tid for tid, d in indegree.items() if d == 0]
+    for tid in order:  # Grows while iterating
+        for child in children[tid]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                order.append(child)
+    return order
+
+
+class ReachabilityIndex:
+    """Transitive closure of the prerequisite DAG as one bitset (int) per tech"""
+    
+    def __init__(self, techs: Dict[int, TechData]):
+        self.order = topological_order(techs)
+        self.index = {tid: i for i, tid in enumerate(self.order)}
+        self._ancestors: Dict[int, int] = {}
+        self._descendants: Dict[int, int] = {}
+        
+        parents = {tid: [p for p in (techs[tid].prereq_1, techs[tid].prereq_2)
+                         if p in self.index and p != tid]
+                   for tid in self.order}
+        
+        for tid in self.order:
+            bits = 0
+            for p in parents[tid]:
+                bits |= self._ancestors[p] | (1 << self.index[p])
+            self._ancestors[tid] = bits
+        
+        desc = {tid: 0 for tid in self.order}
+        for tid in reversed(self.order):
+            bit = desc[tid] | (1 << self.index[tid])
+            for p in parents[tid]:
+                desc[p] |= bit
+        self._descendants = desc
+    
+    def ids_from_bits(self, bits: int) -> List[int]:
+        """Tech ids of a bitset, in topological order"""
+        digits = bin(bits)[:1:-1]  # Lowest bit first
+        ids = []
+        i = digits.find('1')
+        while i != -1:
+            ids.append(self.order[i])
+            i = digits.find('1', i + 1)
+        return ids
+    
+    def ancestors(self, tid: int) -> Set[int]:
+        return set(self.ids_from_bits(self._ancestors.get(tid, 0)))
+    
+    def descendants(self, tid: int) -> Set[int]:
+        return set(self.ids_from_bits(self._descendants.get(tid, 0)))
+    
+    def ancestor_bits(self, tid: int) -> int:
+        return self._ancestors.get(tid, 0)
+    
+    def descendant_count(self, tid: int) -> int:
+        return self._descendants.get(tid, 0).bit_count()
+    
+    def requires(self, tid: int, prereq: int) -> bool:
+        """True if researching tid needs prereq somewhere in its chain"""
+        i = self.index.get(prereq)
+        return i is not None and bool(self._ancestors.get(tid, 0) >> i & 1)
+    
+    def cost_planes(self, techs: Dict[int, TechData]) -> 'CostPlanes':
+        """Costs (whole dollars) split into bit planes over this index's bit positions"""
+        result = CostPlanes()
+        costs = []
+        for i, tid in enumerate(self.order):
+            cost = techs[tid].cost
+            if math.isfinite(cost):
+                costs.append(max(0, round(cost)))
+            else:
+                result.nonfinite[i] = cost
+                costs.append(0)
+        width = max(costs, default=0).bit_length()
+        if width:
+            # Column j of the fixed-width binary strings is plane width-1-j; highest index first
+            rows = [format(c, f'0{width}b') for c in reversed(costs)]
+            result.planes = [int("".join(column), 2) for column in zip(*rows)][::-1]
+        return result
+    
+    def chain_costs(self, techs: Dict[int, TechData]) -> Dict[int, float]:
+        """Each tech's cost plus all of its prerequisites', for the whole tree"""
+        planes = self.cost_planes(techs)
+        return {tid: planes.total(self._ancestors[tid] | (1 << i)) for i, tid in enumerate(self.order)}
+
+
+def compute_graph_metrics(techs: Dict[int, TechData],
+                          reach: Optional[ReachabilityIndex] = None) -> GraphMetrics:
+    """Dominator tree, closure sizes and path criticality in one batched pass"""
+    reach = reach or ReachabilityIndex(techs)
+    order = reach.order
+    metrics = GraphMetrics()
+    
+    parents = {tid: [p for p in (techs[tid].prereq_1, techs[tid].prereq_2)
+                     if p in reach.index and p != tid]
+               for tid in order}
+    
+    # Dominators: in topological order idom(v) is the LCA of its parents in the
+    # dominator tree built so far; techs without prerequisites hang off root 0
+    idom = metrics.idom
+    dom_depth = {0: 0}
+    for tid in order:
+        dom = None
+        for p in parents[tid]:
+            if dom is None:
+                dom = p
+                continue
+            a, b = dom, p
+            while a != b:
+                if dom_depth[a] >= dom_depth[b]:
+                    a = idom[a]
+                else:
+                    b = idom[b]
+            dom = a
+        idom[tid] = dom if dom is not None else 0
+        dom_depth[tid] = dom_depth[idom[tid]] + 1
+    
+    dominated = {tid: 0 for tid in order}
+    for tid in reversed(order):
+        parent = idom[tid]
+        if parent:
+            dominated[parent] += dominated[tid] + 1
+    metrics.dominated = dominated
+    
+    metrics.descendants = {tid: reach.descendant_count(tid) for tid in order}
+    
+    # Path counts (floats, they grow exponentially with depth)
+    from_roots: Dict[int, float] = {}
+    for tid in order:
+        from_roots[tid] = sum(from_roots[p] for p in parents[tid]) or 1.0
+    to_leaves = {tid: 0.0 for tid in order}
+    for tid in reversed(order):
+        if to_leaves[tid] == 0.0:
+            to_leaves[tid] = 1.0
+        for p in parents[tid]:
+            to_leaves[p] += to_leaves[tid]
+    
+    total_paths = sum(from_roots[tid] for tid in order if metrics.descendants[tid] == 0)
+    if total_paths:
+        metrics.criticality = {tid: from_roots[tid] * to_leaves[tid] / total_paths for tid in order}
+    
+    return metrics
+
+
+def schedule_research(targets: List[int], techs: Dict[int, TechData], slots: int = 1,
+                      budget: Optional[float] = None, priority: str = 'time',
+                      completed: Optional[Set[int]] = None) -> ResearchSchedule:
+    """List-schedule every tech needed for targets over N parallel research slots
+    
+    priority='time' runs the longest remaining chain first (critical path),
+    priority='cost' runs the cheapest first to stretch a budget. Techs that
+    would push spending past budget are skipped, and so is everything after them;
+    unscheduled_targets says why each target missed.
+    """
+    completed = completed or set()
+    schedule = ResearchSchedule(slots=max(1, slots), targets=[t for t in targets if t in techs])
+    for tid in targets:
+        if tid not in techs:
+            schedule.unscheduled_targets[tid] = "not in the tech tree"
+    
+    # Everything still to research, shared across targets
+    required: Set[int] = set()
+    stack = [t for t in schedule.targets if t not in completed]
+    while stack:
+        tid = stack.pop()
+        if tid in required:
+            continue
+        required.add(tid)
+        tech = techs[tid]
+        for p in (tech.prereq_1, tech.prereq_2):
+            if p and p in techs and p not in completed and p not in required:
+                stack.append(p)
+    
+    parents = {tid: [p for p in (techs[tid].prereq_1, techs[tid].prereq_2)
+                     if p in required and p != tid]
+               for tid in required}
+    children: Dict[int, List[int]] = defaultdict(list)
+    for tid, ps in parents.items():
+        for p in ps:
+            children[p].append(tid)
+    
+    # Topological order of the required subgraph
+    indegree = {tid: len(ps) for tid, ps in parents.items()}
+    order = [tid for tid, d in indegree.items() if d == 0]
+    remaining = dict(indegree)
+    for tid in order:
+        for child in children[tid]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                order.append(child)
+    
+    duration = {tid: max(0, techs[tid].time_to_research) for tid in required}
+    
+    # Critical path: longest time chain ending at any target
+    finish: Dict[int, int] = {}
+    via: Dict[int, int] = {}
+    for tid in order:
+        best = max(parents[tid], key=lambda p: finish[p], default=None)
+        finish[tid] = duration[tid] + (finish[best] if best is not None else 0)
+        if best is not None:
+            via[tid] = best
+    if finish:
+        end = max((t for t in schedule.targets if t in finish), key=finish.get, default=None)
+        if end is not None:
+            schedule.critical_time = finish[end]
+            path = [end]
+            while path[-1] in via:
+                path.append(via[path[-1]])
+            schedule.critical_path = path[::-1]
+    
+    # Priorities: bottom level (longest chain still ahead) or plain cost
+    if priority == 'cost':
+        rank = {tid: -techs[tid].cost for tid in required}
+    else:
+        rank = {}
+        for tid in reversed(order):
+            rank[tid] = duration[tid] + max((rank[c] for c in children[tid]), default=0)
+    
+    ready = [(-rank[tid], tid) for tid in order if indegree[tid] == 0]
+    heapq.heapify(ready)
+    free_slots = list(range(schedule.slots))
+    running: List[Tuple[int, int, int]] = []  # (end, slot, tid)
+    now = 0
+    spent = 0.0
+    over_budget: Dict[int, float] = {}  # Skipped tech -> budget left when it came up
+    
+    while ready or running:
+        while ready and free_slots:
+            _, tid = heapq.heappop(ready)
+            cost = techs[tid].cost
+            if budget is not None and spent + cost > budget:
+                over_budget[tid] = budget - spent
+                continue  # Dependents never become ready
+            spent += cost
+            slot = heapq.heappop(free_slots)
+            end = now + duration[tid]
+            schedule.entries.append((tid, slot, now, end))
+            heapq.heappush(running, (end, slot, tid))
+        
+        if not running:
+            break
+        now = running[0][0]
+        while running and running[0][0] == now:
+            _, slot, tid = heapq.heappop(running)
+            heapq.heappush(free_slots, slot)
+            for child in children[tid]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    heapq.heappush(ready, (-rank[child], child))
+    
+    scheduled = {e[0] for e in schedule.entries}
+    schedule.unscheduled = sorted(required - scheduled)
+    
+    # Blame each missed target on the first over-budget tech in its chain; techs
+    # left out of the topological order sit on or behind a cycle
+    blocker: Dict[int, int] = {}
+    for tid in order:
+        if tid in over_budget:
+            blocker[tid] = tid
+        elif tid not in scheduled:
+            blocker[tid] = next(blocker[p] for p in parents[tid] if p in blocker)
+    for tid in schedule.targets:
+        if tid not in required or tid in scheduled:
+            continue
+        if tid not in blocker:
+            schedule.unscheduled_targets[tid] = "blocked by a circular dependency"
+        elif blocker[tid] == tid:
+            schedule.unscheduled_targets[tid] = (f"over budget: costs ${techs[tid].cost/1e9:.2f}B, "
+                                                 f"${over_budget[tid]/1e9:.2f}B left")
+        else:
+            schedule.unscheduled_targets[tid] = f"needs tech {blocker[tid]}, which is over budget"
+    schedule.makespan = max((e[3] for e in schedule.entries), default=0)
+    schedule.total_cost = spent
+    return schedule
+
+
+def targets_for_unit_class(class_num: int, techs: Dict[int, TechData]) -> List[int]:
+    """Techs that unlock at least one unit of the given class"""
+    return sorted(tid for tid, tech in techs.items()
+                  if any(u.class_num == class_num for u in tech.unlocks_units))
+
+
+def targets_for_effect(effect_id: int, techs: Dict[int, TechData]) -> List[int]:
+    """Techs carrying the given effect"""
+    return sorted(tid for tid, _ in find_techs_by_effect(effect_id, techs))
+
+
+def plan_multi_target(targets: List[int], techs: Dict[int, TechData],
+                      reach: Optional[ReachabilityIndex] = None,
+                      completed: Optional[Set[int]] = None) -> MultiTargetPlan:
+    """Union the targets' closures once and price each target's share of it
+    
+    Shares are priced on bitsets (whole dollars, like chain_costs); ids are
+    expanded only once, for the final research order.
+    """
+    reach = reach or ReachabilityIndex(techs)
+    plan = MultiTargetPlan()
+    
+    done_mask = 0
+    for tid in completed or ():
+        if tid in reach.index:
+            done_mask |= 1 << reach.index[tid]
+    
+    closures = []
+    for tid in dict.fromkeys(targets):
+        if tid not in reach.index:
+            plan.unreachable.append(tid)
+            continue
+        plan.targets.append(tid)
+        closures.append((reach.ancestor_bits(tid) | (1 << reach.index[tid])) & ~done_mask)
+    
+    cost_of = reach.cost_planes(techs).total
+    
+    # Marginal cost: what only this target needs, via prefix/suffix unions of the others
+    count = len(closures)
+    prefix = [0] * (count + 1)
+    suffix = [0] * (count + 1)
+    for i in range(count):
+        prefix[i + 1] = prefix[i] | closures[i]
+        suffix[count - 1 - i] = suffix[count - i] | closures[count - 1 - i]
+    
+    for i, tid in enumerate(plan.targets):
+        others = prefix[i] | suffix[i + 1]
+        plan.standalone_cost[tid] = cost_of(closures[i])
+        plan.marginal_cost[tid] = cost_of(closures[i] & ~others)
+    
+    # Bit positions follow the topological order, so the union is already sorted
+    plan.order = reach.ids_from_bits(prefix[count])
+    plan.total_cost = sum(techs[tid].cost for tid in plan.order)
+    plan.total_time = sum(techs[tid].time_to_research for tid in plan.order)
+    return plan
+
+
+def cumulative_level_curves(techs: Dict[int, TechData], effect_id: int = 0) -> LevelCurves:
+    """Bucket cost, time and effect by tech level, then prefix-sum each bucket array
+    
+    effect_id=0 sums the magnitude of every effect.
+    """
+    curves = LevelCurves(levels=sorted({t.tech_level for t in techs.values()}))
+    slot = {level: i for i, level in enumerate(curves.levels)}
+    size = len(curves.levels)
+    cost: Dict[int, List[float]] = defaultdict(lambda: [0.0] * size)
+    days: Dict[int, List[float]] = defaultdict(lambda: [0.0] * size)
+    effect: Dict[int, List[float]] = defaultdict(lambda: [0.0] * size)
+    
+    for tech in techs.values():
+        i = slot[tech.tech_level]
+        if effect_id:
+            value = sum(val for eid, val in tech.effects if eid == effect_id)
+        else:
+            value = sum(abs(val) for _, val in tech.effects)
+        for cat in (0, tech.category):
+            cost[cat][i] += tech.cost
+            days[cat][i] += tech.time_to_research
+            effect[cat][i] += value
+    
+    curves.cost = {cat: list(accumulate(v)) for cat, v in cost.items()}
+    curves.time = {cat: list(accumulate(v)) for cat, v in days.items()}
+    curves.effect = {cat: list(accumulate(v)) for cat, v in effect.items()}
+    return curves
+
+
+def tree_fingerprint(techs: Dict[int, TechData]) -> str:
+    """Content hash of the fields analyses depend on"""
+    import hashlib  # deferred
+    h = hashlib.blake2b(digest_size=16)
+    for tid in sorted(techs):
+        t = techs[tid]
+        h.update(repr((tid, t.category, t.tech_level, t.prereq_1, t.prereq_2,
+                       t.cost, t.time_to_research, t.effects)).encode())
+    return h.hexdigest()
+
+
+def _median(values) -> float:
+    """Median without pulling in the statistics module at import time"""
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def _modified_z(values: Dict[int, float]) -> Dict[int, float]:
+    """Iglewicz-Hoaglin modified z-scores (median/MAD, robust to the outliers themselves)"""
+    if len(values) < 3:
+        return {k: 0.0 for k in values}
+    med = _median(values.values())
+    deviations = [abs(v - med) for v in values.values()]
+    mad = _median(deviations)
+    if mad:
+        scale = 0.6745 / mad
+    else:
+        mean_dev = sum(deviations) / len(deviations)
+        scale = 0.7979 / mean_dev if mean_dev else 0.0  # MAD is 0 when over half the values tie
+    return {k: (v - med) * scale for k, v in values.items()}
+
+
+def _fit_line(points: List[Tuple[float, float]]) -> Tuple[float, float]:
+    """Least-squares (intercept, slope)"""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / sxx if sxx else 0.0
+    return mean_y - slope * mean_x, slope
+
+
+OUTLIER_Z = 3.5
+
+
+def analyze_balance(techs: Dict[int, TechData]) -> BalanceReport:
+    """Normalize effects per id, fit cost-by-level curves per category, flag robust outliers
+    
+    Not memoised: the GUI runs it through TaskRunner, which caches per tree fingerprint.
+    """
+    report = BalanceReport()
+    
+    # Per-effect scale: a typical magnitude of each effect counts as 1.0
+    magnitudes: Dict[int, List[float]] = defaultdict(list)
+    for tech in techs.values():
+        for eid, val in tech.effects:
+            if val:
+                magnitudes[eid].append(abs(val))
+    report.effect_scale = {eid: _median(vals) for eid, vals in magnitudes.items()}
+    
+    for tid, tech in techs.items():
+        report.effect_scores[tid] = sum((abs(val) / report.effect_scale[eid]
+                                         for eid, val in tech.effects if val), 0.0)
+    
+    # Cost curves: log10(cost) is close to linear in tech level within a category
+    priced = {tid: t for tid, t in techs.items() if t.cost > 0}
+    by_category: Dict[int, List[Tuple[float, float]]] = defaultdict(list)
+    for tech in priced.values():
+        by_category[tech.category].append((tech.tech_level, math.log10(tech.cost)))
+    report.cost_curves = {cat: _fit_line(points) for cat, points in by_category.items()}
+    
+    residuals: Dict[int, Dict[int, float]] = defaultdict(dict)
+    for tid, tech in priced.items():
+        intercept, slope = report.cost_curves[tech.category]
+        residuals[tech.category][tid] = math.log10(tech.cost) - (intercept + slope * tech.tech_level)
+    for per_category in residuals.values():
+        report.cost_z.update(_modified_z(per_category))
+    
+    # Value: normalized effects per unit of cost, on a log scale
+    report.value_z = _modified_z({
+        tid: math.log10(report.effect_scores[tid] / tech.cost)
+        for tid, tech in priced.items() if report.effect_scores[tid] > 0
+    })
+    
+    for tid, z in report.cost_z.items():
+        if abs(z) > OUTLIER_Z:
+            report.outliers.append(BalanceOutlier(
+                tid, 'cost', z, "Overpriced for its level" if z > 0 else "Underpriced for its level"))
+    for tid, z in report.value_z.items():
+        if abs(z) > OUTLIER_Z:
+            report.outliers.append(BalanceOutlier(
+                tid, 'value', z, "Great value" if z > 0 else "Poor value"))
+    report.outliers.sort(key=lambda o: abs(o.score), reverse=True)
+    return report
+
+
+def export_balance_csv(report: BalanceReport, techs: Dict[int, TechData], path: str):
+    """Every scored tech, outliers flagged"""
+    import csv  # deferred
+    flags = defaultdict(list)
+    for o in report.outliers:
+        flags[o.tech_id].append(o.assessment)
+    
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "category", "level", "cost", "effect_score", "cost_z", "value_z", "flags"])
+        for tid in sorted(techs):
+            t = techs[tid]
+            writer.writerow([
+                tid, t.short_title, t.category, t.tech_level, f"{t.cost:.0f}",
+                f"{report.effect_scores.get(tid, 0.0):.3f}",
+                f"{report.cost_z[tid]:.2f}" if tid in report.cost_z else "",
+                f"{report.value_z[tid]:.2f}" if tid in report.value_z else "",
+                "; ".join(flags.get(tid, []))
+            ])
+
+
+def _format_cost(cost: float) -> str:
+    return f"${cost/1e9:.2f}B" if abs(cost) >= 1e9 else f"${cost/1e6:.1f}M"
+
+
+class WhatIfOverlay:
+    """In-memory edits over loaded techs, propagated to the affected descendants only
+    
+    The base techs are never modified. Chain cost is tracked as a delta against
+    the base closure, so only the part of each closure that actually changed
+    is summed; depth and path time (longest research-time chain) are recomputed
+    in topological order over the affected set.
+    """
+    
+    EDITABLE = ('cost', 'time_to_research', 'prereq_1', 'prereq_2')
+    
+    def __init__(self, techs: Dict[int, TechData], reach: Optional[ReachabilityIndex] = None):
+        self.techs = techs
+        self.reach = reach or ReachabilityIndex(techs)
+        self.edits: Dict[int, Dict[str, float]] = {}
+        
+        # Baselines, once
+        self.base_finish: Dict[int, float] = {}
+        for tid in self.reach.order:
+            t = techs[tid]
+            self.base_finish[tid] = t.time_to_research + max(
+                (self.base_finish[p] for p in (t.prereq_1, t.prereq_2) if p in self.base_finish and p != tid),
+                default=0)
+        self._base_chain: Dict[int, float] = {}
+        
+        # Results of the last recompute
+        self.affected: List[int] = []
+        self.chain_delta: Dict[int, float] = {}
+        self.depth: Dict[int, int] = {}
+        self.finish: Dict[int, float] = {}
+    
+    def value(self, tid: int, field_name: str):
+        return self.edits.get(tid, {}).get(field_name, getattr(self.techs[tid], field_name))
+    
+    def set_edit(self, tid: int, field_name: str, value):
+        """Apply one edit; raises ValueError (edit dropped) if it would create a cycle"""
+        if field_name not in self.EDITABLE or tid not in self.techs:
+            raise ValueError(f"Cannot edit {field_name} of tech {tid}")
+        if field_name in ('prereq_1', 'prereq_2') and value == tid:
+            raise ValueError("Edit would create a circular dependency")
+        previous = self.edits.get(tid, {}).get(field_name)
+        if value == getattr(self.techs[tid], field_name):
+            self.edits.get(tid, {}).pop(field_name, None)
+        else:
+            self.edits.setdefault(tid, {})[field_name] = value
+        if not self.edits.get(tid):
+            self.edits.pop(tid, None)
+        try:
+            self.recompute()
+        except ValueError:
+            if previous is None:
+                self.edits.get(tid, {}).pop(field_name, None)
+                if not self.edits.get(tid):
+                    self.edits.pop(tid, None)
+            else:
+                self.edits[tid][field_name] = previous
+            self.recompute()
+            raise
+    
+    def clear_edits(self, tid: Optional[int] = None):
+        if tid is None:
+            self.edits.clear()
+        else:
+            self.edits.pop(tid, None)
+        self.recompute()
+    
+    def base_chain_cost(self, tid: int) -> float:
+        if tid not in self._base_chain:
+            ids = self.reach.ids_from_bits(self.reach.ancestor_bits(tid))
+            self._base_chain[tid] = self.techs[tid].cost + sum(self.techs[a].cost for a in ids)
+        return self._base_chain[tid]
+    
+    def _parents(self, tid: int) -> List[int]:
+        ps = (self.value(tid, 'prereq_1'), self.value(tid, 'prereq_2'))
+        return [p for p in ps if p and p in self.reach.index]
+    
+    def recompute(self):
+        reach, techs = self.reach, self.techs
+        index = reach.index
+        edited = [tid for tid in self.edits if tid in index]
+        
+        # Affected: edited techs and their (base) descendants; new edges only point into edited techs
+        affected_bits = 0
+        for tid in edited:
+            affected_bits |= reach._descendants[tid] | (1 << index[tid])
+        affected = set(reach.ids_from_bits(affected_bits))
+        
+        # Topological order of the affected set under the edited edges
+        indegree = {tid: sum(1 for p in self._parents(tid) if p in affected) for tid in affected}
+        children: Dict[int, List[int]] = defaultdict(list)
+        for tid in affected:
+            for p in self._parents(tid):
+                if p in affected:
+                    children[p].append(tid)
+        order = sorted((tid for tid, d in indegree.items() if d == 0), key=index.get)
+        for tid in order:
+            for child in children[tid]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    order.append(child)
+        if len(order) < len(affected):
+            raise ValueError("Edit would create a circular dependency")
+        
+        cost_mask = 0
+        for tid in edited:
+            if 'cost' in self.edits[tid]:
+                cost_mask |= 1 << index[tid]
+        
+        def cost_change(tid: int) -> float:
+            return self.value(tid, 'cost') - techs[tid].cost
+        
+        ancestors_new: Dict[int, int] = {}
+        self.affected = order
+        self.chain_delta, self.depth, self.finish = {}, {}, {}
+        for tid in order:
+            parents = self._parents(tid)
+            bits = 0
+            depth = 0
+            finish = 0.0
+            for p in parents:
+                bits |= ancestors_new.get(p, reach.ancestor_bits(p)) | (1 << index[p])
+                depth = max(depth, self.depth.get(p, techs[p].depth))
+                finish = max(finish, self.finish.get(p, self.base_finish[p]))
+            ancestors_new[tid] = bits
+            self.depth[tid] = depth + 1
+            self.finish[tid] = finish + self.value(tid, 'time_to_research')
+            
+            base_bits = reach.ancestor_bits(tid)
+            delta = sum(self.value(a, 'cost') for a in reach.ids_from_bits(bits & ~base_bits))
+            delta -= sum(techs[a].cost for a in reach.ids_from_bits(base_bits & ~bits))
+            delta += sum(cost_change(a) for a in reach.ids_from_bits(bits & base_bits & cost_mask))
+            delta += cost_change(tid)
+            self.chain_delta[tid] = delta
+    
+    def delta(self, limit: Optional[int] = None) -> TreeDelta:
+        """Edits plus every derived change, biggest chain-cost impact first"""
+        result = TreeDelta()
+        labels = {'cost': "Cost", 'time_to_research': "Time", 'prereq_1': "Prereq 1", 'prereq_2': "Prereq 2"}
+        ranked = sorted(self.affected, key=lambda t: abs(self.chain_delta[t]), reverse=True)
+        for tid in ranked[:limit]:
+            tech = self.techs[tid]
+            rows = []
+            for field_name, value in self.edits.get(tid, {}).items():
+                old = getattr(tech, field_name)
+                if field_name == 'cost':
+                    rows.append((labels[field_name], _format_cost(old), _format_cost(value)))
+                elif field_name == 'time_to_research':
+                    rows.append((labels[field_name], f"{old}d", f"{value}d"))
+                else:
+                    rows.append((labels[field_name], str(old), str(value)))
+            if self.chain_delta[tid]:
+                old = self.base_chain_cost(tid)
+                rows.append(("Chain Cost", _format_cost(old), _format_cost(old + self.chain_delta[tid])))
+            if self.depth[tid] != tech.depth:
+                rows.append(("Depth", str(tech.depth), str(self.depth[tid])))
+            if self.finish[tid] != self.base_finish[tid]:
+                rows.append(("Path Time", f"{self.base_finish[tid]:.0f}d", f"{self.finish[tid]:.0f}d"))
+            if rows:
+                result.modified[tid] = rows
+        return result
+
+
+def format_effect_value(val: float) -> str:
+    """Effects below 10 are fractions, shown as percentages; larger ones are absolute"""
+    sign = '+' if val >= 0 else ''
+    return f"{sign}{val*100:.0f}%" if abs(val) < 10 else f"{sign}{val:.1f}"
+
+
+# (attribute, label, formatter) of every field a diff compares
+TECH_DIFF_FIELDS = [
+    ('short_title', "Title", str),
+    ('category', "Category", lambda c: CATEGORIES.get(c, {'name': str(c)})['name']),
+    ('tech_level', "Level", str),
+    ('prereq_1', "Prereq 1", str),
+    ('prereq_2', "Prereq 2", str),
+    ('leads_to_1', "Leads To 1", str),
+    ('leads_to_2', "Leads To 2", str),
+    ('time_to_research', "Time", lambda v: f"{v}d"),
+    ('cost', "Cost", lambda v: f"${v/1e6:.0f}M"),
+    ('pop_support', "Pop Support", lambda v: f"{v*100:.1f}%"),
+    ('set_by_default', "Set By Default", str),
+]
+
+UNIT_DIFF_FIELDS = [
+    ('name', "Name", str),
+    ('class_num', "Class", lambda c: CLASS_INFO.get(c, {'name': str(c)})['name']),
+    ('year', "Year", str),
+    ('req_tech_id', "Required Tech", str),
+    ('cost', "Cost", lambda v: f"${v/1e6:.1f}M"),
+    ('region', "Region", str),
+]
+
+
+def _row_key(obj, fields) -> tuple:
+    key = tuple(getattr(obj, attr) for attr, _, _ in fields)
+    effects = getattr(obj, 'effects', None)
+    return key if effects is None else key + (tuple(effects),)
+
+
+def _row_hashes(rows: dict, fields) -> Dict[int, int]:
+    return {rid: hash(_row_key(obj, fields)) for rid, obj in rows.items()}
+
+
+def _effect_changes(old: List[Tuple[int, float]], new: List[Tuple[int, float]]) -> List[Tuple[str, str, str]]:
+    """Per-effect rows; repeated ids are summed"""
+    before: Dict[int, float] = defaultdict(float)
+    after: Dict[int, float] = defaultdict(float)
+    for eid, val in old:
+        before[eid] += val
+    for eid, val in new:
+        after[eid] += val
+    
+    rows = []
+    for eid in sorted(set(before) | set(after)):
+        if before.get(eid) != after.get(eid):
+            name = EFFECT_DEFINITIONS.get(eid, {'name': f'Effect {eid}'})['name']
+            rows.append((f"Effect: {name}",
+                         format_effect_value(before[eid]) if eid in before else "—",
+                         format_effect_value(after[eid]) if eid in after else "—"))
+    return rows
+
+
+def diff_rows(base: dict, mod: dict, fields, base_hashes: Optional[Dict[int, int]] = None) -> TreeDelta:
+    """Field-level diff of two id -> record maps; identical rows are skipped by hash"""
+    base_hashes = base_hashes if base_hashes is not None else _row_hashes(base, fields)
+    delta = TreeDelta(
+        added=sorted(mod.keys() - base.keys()),
+        removed=sorted(base.keys() - mod.keys()),
+    )
+    
+    for rid in sorted(base.keys() & mod.keys()):
+        old, new = base[rid], mod[rid]
+        if base_hashes[rid] == hash(_row_key(new, fields)) and _row_key(old, fields) == _row_key(new, fields):
+            continue
+        changes = [
+            (label, fmt(getattr(old, attr)), fmt(getattr(new, attr)))
+            for attr, label, fmt in fields
+            if getattr(old, attr) != getattr(new, attr)
+        ]
+        if hasattr(old, 'effects') and old.effects != new.effects:
+            changes.extend(_effect_changes(old.effects, new.effects))
+        if changes:
+            delta.modified[rid] = changes
+    return delta
+
+
+def diff_mods(base_techs: Dict[int, TechData], base_units: Dict[int, UnitData],
+              mods: List[Tuple[str, str]], progress: Optional[Callable[[int, int], None]] = None,
+              cancelled: Callable[[], bool] = lambda: False) -> List[ModDiff]:
+    """Load and diff several (ttrx, unit) mods against one base; base hashes are computed once.
+    
+    progress gets (mods done, total); once cancelled() is true the remaining mods are skipped.
+    """
+    tech_hashes = _row_hashes(base_techs, TECH_DIFF_FIELDS)
+    unit_hashes = _row_hashes(base_units, UNIT_DIFF_FIELDS)
+    
+    results = []
+    for done, (ttrx_path, unit_path) in enumerate(mods):
+        if cancelled():
+            break
+        if progress:
+            progress(done, len(mods))
+        result = ModDiff(path=ttrx_path, unit_path=unit_path)
+        result.mod_techs = load_tech_tree(ttrx_path)
+        if not result.mod_techs:
+            result.error = f"Failed to load {ttrx_path}"
+            results.append(result)
+            continue
+        result.techs = diff_rows(base_techs, result.mod_techs, TECH_DIFF_FIELDS, tech_hashes)
+        if unit_path:
+            result.mod_units = load_units(unit_path)
+            result.units = diff_rows(base_units, result.mod_units, UNIT_DIFF_FIELDS, unit_hashes)
+        results.append(result)
+    return results
+
+
+def find_unit_file(ttrx_path: str) -> str:
+    """The .UNIT file sitting next to a TTRX, if any"""
+    path = Path(ttrx_path)
+    for suffix in ('.UNIT', '.unit', '.Unit'):
+        candidate = path.with_suffix(suffix)
+        if candidate.exists():
+            return str(candidate)
+    return ""
+
+
+MERGE_FIELDS = [attr for attr, _, _ in TECH_DIFF_FIELDS] + ['effects']
+
+_merge_base: Dict[int, TechData] = {}
+
+
+def _init_merge_worker(base: Dict[int, TechData]):
+    global _merge_base
+    _merge_base = base
+
+
+def _mod_changes(path: str) -> Tuple[str, Optional[dict]]:
+    """Worker: load one mod and keep only what differs from the base, so the tree can be dropped"""
+    with redirect_stdout(io.StringIO()):
+        mod = load_tech_tree(path)
+    if not mod:
+        return path, None
+    
+    base = _merge_base
+    changes = {'added': {}, 'removed': sorted(base.keys() - mod.keys()), 'modified': {}}
+    for tid, tech in mod.items():
+        old = base.get(tid)
+        if old is None:
+            tech.prerequisite_of = []
+            changes['added'][tid] = tech
+            continue
+        fields = {attr: getattr(tech, attr) for attr in MERGE_FIELDS if getattr(tech, attr) != getattr(old, attr)}
+        if fields:
+            changes['modified'][tid] = fields
+    return path, changes
+
+
+def _copy_tech(tech: TechData) -> TechData:
+    return dataclasses.replace(tech, effects=list(tech.effects), unlocks_units=list(tech.unlocks_units), prerequisite_of=[])
+
+
+def merge_mods(base: Dict[int, TechData], mod_paths: List[str], max_workers: Optional[int] = None,
+               progress: Optional[Callable[[int, int], None]] = None,
+               cancelled: Callable[[], bool] = lambda: False) -> MergeResult:
+    """Load mods in a process pool and merge them over the base, in mod_paths order
+    
+    Workers return only their deltas; results are folded in as they arrive, so
+    memory stays around one tree plus the deltas whatever the number of mods.
+    progress gets (mods loaded, total); cancelling drops the mods not yet
+    started and returns the result empty. A mod listed twice has no single
+    place in the load order, so it raises ValueError.
+    """
+    seen: Dict[str, str] = {}
+    for path in mod_paths:
+        key = os.path.normcase(os.path.abspath(path))
+        if key in seen:
+            raise ValueError(f"{path} is listed twice in the load order")
+        seen[key] = path
+    result = MergeResult(load_order=[Path(p).name for p in mod_paths])
+    rank = {path: i for i, path in enumerate(mod_paths)}
+    deltas: Dict[int, dict] = {}
+    
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    workers = max_workers or min(len(mod_paths), os.cpu_count() or 1)
+    # spawn: forking a process that runs Qt threads is not safe
+    with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_merge_worker, initargs=(base,)) as pool:
+        futures = [pool.submit(_mod_changes, path) for path in mod_paths]
+        for done, future in enumerate(as_completed(futures), 1):
+            if cancelled():
+                for pending in futures:
+                    pending.cancel()
+                return result
+            path, changes = future.result()
+            if changes is None:
+                result.errors.append(f"Failed to load {path}")
+            else:
+                deltas[rank[path]] = changes
+            if progress:
+                progress(done, len(mod_paths))
+    
+    # Who writes what, in load order
+    writes: Dict[Tuple[int, str], List[Tuple[int, object]]] = defaultdict(list)
+    for i in sorted(deltas):
+        changes = deltas[i]
+        name = result.load_order[i]
+        result.changed_by[name] = len(changes['added']) + len(changes['removed']) + len(changes['modified'])
+        for tid, tech in changes['added'].items():
+            writes[(tid, '(added)')].append((i, tech))
+        for tid in changes['removed']:
+            writes[(tid, '(removed)')].append((i, None))
+        for tid, fields in changes['modified'].items():
+            for attr, value in fields.items():
+                writes[(tid, attr)].append((i, value))
+    
+    formatters = {attr: fmt for attr, _, fmt in TECH_DIFF_FIELDS}
+    formatters['effects'] = lambda effects: ", ".join(
+        f"{EFFECT_DEFINITIONS.get(eid, {'name': eid})['name']} {format_effect_value(val)}" for eid, val in effects) or "none"
+    formatters['(added)'] = lambda tech: f"{tech.short_title} (lvl {tech.tech_level}, ${tech.cost/1e6:.0f}M)"
+    formatters['(removed)'] = lambda _: "removed"
+    
+    merged = {tid: _copy_tech(tech) for tid, tech in base.items()}
+    removed: Set[int] = set()
+    for (tid, attr), entries in sorted(writes.items(), key=lambda kv: kv[0]):
+        last_rank, value = entries[-1]
+        fmt = formatters[attr]
+        if len({fmt(v) for _, v in entries}) > 1:
+            result.conflicts.append(MergeConflict(
+                tid, attr, [(result.load_order[i], fmt(v)) for i, v in entries], result.load_order[last_rank]))
+        if attr == '(added)':
+            merged[tid] = _copy_tech(value)
+        elif attr == '(removed)':
+            removed.add(tid)
+        else:
+            setattr(merged[tid], attr, list(value) if attr == 'effects' else value)
+    
+    # Removal against edits: the latest in load order wins
+    edited_by: Dict[int, Set[int]] = defaultdict(set)
+    for (tid, attr), entries in writes.items():
+        if tid in removed and attr != '(removed)':
+            edited_by[tid].update(i for i, _ in entries)
+    for tid in removed:
+        removals = [i for i, _ in writes[(tid, '(removed)')]]
+        edits = sorted(edited_by.get(tid, ()))
+        if edits:
+            votes = sorted([(i, "removed") for i in removals] + [(i, "edited") for i in edits])
+            result.conflicts.append(MergeConflict(
+                tid, '(removed)', [(result.load_order[i], what) for i, what in votes],
+                result.load_order[votes[-1][0]]))
+        if not edits or edits[-1] < removals[-1]:
+            merged.pop(tid, None)
+    
+    _finalize_tree(merged)
+    result.techs = merged
+    return result
+
+
+def calculate_chain_cost(tech_id: int, techs: Dict[int, TechData]) -> float:
+    """Calculate total cost including all prerequisites"""
+    chain = get_full_prereq_chain(tech_id, techs)
+    chain.add(tech_id)
+    return sum(techs[tid].cost for tid in chain if tid in techs)
+
+
+def find_orphan_techs(techs: Dict[int, TechData]) -> List[int]:
+    """Find techs with missing prerequisites"""
+    orphans = []
+    for tid, tech in techs.items():
+        if tech.prereq_1 and tech.prereq_1 not in techs:
+            orphans.append((tid, tech.prereq_1, 'prereq_1'))
+        if tech.prereq_2 and tech.prereq_2 not in techs:
+            orphans.append((tid, tech.prereq_2, 'prereq_2'))
+    return orphans
+
+
+class EffectIndex:
+    """Inverted index: effect id -> (tech_id, value) pairs sorted by tech id, built once at load"""
+    
+    def __init__(self, techs: Dict[int, TechData]):
+        self.techs = techs
+        postings: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+        for tid in sorted(techs):
+            for eid, val in techs[tid].effects:
+                postings[eid].append((tid, val))
+        self.postings = dict(postings)
+        self._tech_sets: Dict[int, Set[int]] = {}
+        self._by_value: Dict[int, List[Tuple[int, float]]] = {}
+    
+    def effect_ids(self) -> List[int]:
+        return sorted(self.postings)
+    
+    def techs_with(self, effect_id: int) -> Set[int]:
+        if effect_id not in self._tech_sets:
+            self._tech_sets[effect_id] = {tid for tid, _ in self.postings.get(effect_id, ())}
+        return self._tech_sets[effect_id]
+    
+    def by_value(self, effect_id: int) -> List[Tuple[int, float]]:
+        """Postings sorted by value, strongest first"""
+        if effect_id not in self._by_value:
+            self._by_value[effect_id] = sorted(self.postings.get(effect_id, ()), key=lambda x: x[1], reverse=True)
+        return self._by_value[effect_id]
+    
+    def top_k(self, effect_id: int, k: int = 10) -> List[Tuple[int, float]]:
+        return self.by_value(effect_id)[:k]
+    
+    def totals_by_level(self, effect_id: int) -> List[Tuple[int, float, float]]:
+        """(tech_level, total at that level, cumulative total up to it), by level"""
+        per_level: Dict[int, float] = defaultdict(float)
+        for tid, val in self.postings.get(effect_id, ()):
+            per_level[self.techs[tid].tech_level] += val
+        levels = sorted(per_level)
+        totals = [per_level[lvl] for lvl in levels]
+        return list(zip(levels, totals, accumulate(totals)))
+    
+    def chain_totals(self, effect_id: int, reach: 'ReachabilityIndex') -> Dict[int, float]:
+        """Effect accumulated along each carrier's full prerequisite chain, itself included"""
+        values: Dict[int, float] = defaultdict(float)
+        mask = 0
+        for tid, val in self.postings.get(effect_id, ()):
+            values[tid] += val
+            if tid in reach.index:
+                mask |= 1 << reach.index[tid]
+        return {
+            tid: values[tid] + sum(values[a] for a in reach.ids_from_bits(reach.ancestor_bits(tid) & mask))
+            for tid in values
+        }
+
+
+class UnitIndex:
+    """Multi-key index over units: class, region, year and unlocking tech
+    
+    Built from req_tech_id rather than TechData.unlocks_units, so a fresh index
+    per load is always consistent with the units it was given.
+    """
+    
+    def __init__(self, units: Dict[int, UnitData]):
+        self.units = units
+        self.by_class: Dict[int, List[int]] = defaultdict(list)
+        self.by_region: Dict[str, List[int]] = defaultdict(list)
+        self.by_tech: Dict[int, List[int]] = defaultdict(list)
+        by_year = []
+        for uid in sorted(units):
+            u = units[uid]
+            self.by_class[u.class_num].append(uid)
+            self.by_region[u.region].append(uid)
+            if u.req_tech_id:
+                self.by_tech[u.req_tech_id].append(uid)
+            by_year.append((self.year_of(u), uid))
+        by_year.sort()
+        self._years = [y for y, _ in by_year]
+        self._year_ids = [uid for _, uid in by_year]
+    
+    @staticmethod
+    def year_of(unit: UnitData) -> int:
+        return int(unit.year) if unit.year.isdigit() else 0
+    
+    def for_tech(self, tech_id: int) -> List[UnitData]:
+        return [self.units[uid] for uid in self.by_tech.get(tech_id, ())]
+    
+    def regions(self) -> List[str]:
+        return sorted(r for r in self.by_region if r)
+    
+    def query(self, class_num: Optional[int] = None, region: Optional[str] = None,
+              year_from: Optional[int] = None, year_to: Optional[int] = None,
+              tech_id: Optional[int] = None, name: str = "") -> List[UnitData]:
+        """Units matching every given key, by id; year bounds are inclusive"""
+        candidates: List[Set[int]] = []
+        if class_num is not None:
+            candidates.append(set(self.by_class.get(class_num, ())))
+        if region is not None:
+            candidates.append(set(self.by_region.get(region, ())))
+        if tech_id is not None:
+            candidates.append(set(self.by_tech.get(tech_id, ())))
+        if year_from is not None or year_to is not None:
+            lo = bisect.bisect_left(self._years, year_from) if year_from is not None else 0
+            hi = bisect.bisect_right(self._years, year_to) if year_to is not None else len(self._years)
+            candidates.append(set(self._year_ids[lo:hi]))
+        
+        if candidates:
+            candidates.sort(key=len)
+            ids = candidates[0].intersection(*candidates[1:])
+        else:
+            ids = self.units.keys()
+        
+        if name:
+            q = name.lower()
+            ids = [uid for uid in ids if q in self.units[uid].name.lower()]
+        return [self.units[uid] for uid in sorted(ids)]
+
+
+def find_techs_by_effect(effect_id: int, techs: Dict[int, TechData],
+                         index: Optional[EffectIndex] = None) -> List[Tuple[int, float]]:
+    """Find all techs that have a specific effect"""
+    if index is not None:
+        return list(index.by_value(effect_id))
+    results = []
+    for tid, tech in techs.items():
+        for eid, val in tech.effects:
+            if eid == effect_id:
+                results.append((tid, val))
+    return sorted(results, key=lambda x: x[1], reverse=True)
+
+
+def find_duplicate_ids(path: str) -> List[int]:
+    """Tech ids defined more than once in a TTRX file (load_tech_tree keeps the last)"""
+    import csv  # deferred
+    try:
+        with open(path, "r", encoding="Windows-1252", errors="replace") as f:
+            lines = f.readlines()
+    except Exception:
+        return []
+    
+    start_idx = next((i+1 for i, l in enumerate(lines) if l.strip().startswith("&&TTR")), 0)
+    counts = Counter(
+        parse_int(row[0])
+        for row in csv.reader(lines[start_idx:], delimiter=",")
+        if len(row) >= 30 and row[0].strip()
+    )
+    return sorted(tid for tid, n in counts.items() if tid > 0 and n > 1)
+
+
+def find_cycles(techs: Dict[int, TechData]) -> List[List[int]]:
+    """All prerequisite cycles, as strongly connected components (iterative Tarjan)"""
+    index: Dict[int, int] = {}
+    lowlink: Dict[int, int] = {}
+    on_stack: Set[int] = set()
+    stack: List[int] = []
+    cycles: List[List[int]] = []
+    counter = 0
+    
+    def prereqs(tid: int) -> List[int]:
+        t = techs[tid]
+        return [p for p in (t.prereq_1, t.prereq_2) if p and p in techs]
+    
+    for root in techs:
+        if root in index:
+            continue
+        work = [(root, iter(prereqs(root)))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        
+        while work:
+            tid, edges = work[-1]
+            advanced = False
+            for nxt in edges:
+                if nxt not in index:
+                    index[nxt] = lowlink[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack.add(nxt)
+                    work.append((nxt, iter(prereqs(nxt))))
+                    advanced = True
+                    break
+                if nxt in on_stack:
+                    lowlink[tid] = min(lowlink[tid], index[nxt])
+            if advanced:
+                continue
+            
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[tid])
+            
+            if lowlink[tid] == index[tid]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == tid:
+                        break
+                if len(component) > 1 or tid in prereqs(tid):
+                    cycles.append(sorted(component))
+    
+    return cycles
+
+
+def validate_tech_tree(techs: Dict[int, TechData], units: Dict[int, UnitData],
+                       ttrx_path: str = "") -> ValidationReport:
+    """Run every structural check in one sweep over the tree"""
+    start = time.perf_counter()
+    report = ValidationReport()
+    
+    for tid, tech in techs.items():
+        for field_name in ('prereq_1', 'prereq_2'):
+            prereq = getattr(tech, field_name)
+            if prereq and prereq not in techs:
+                report.orphans.append((tid, prereq, field_name))
+        
+        for field_name in ('leads_to_1', 'leads_to_2'):
+            target = getattr(tech, field_name)
+            if not target:
+                continue
+            if target not in techs:
+                report.leads_to_mismatches.append((tid, target, field_name, "target tech missing"))
+            elif tid not in (techs[target].prereq_1, techs[target].prereq_2):
+                report.leads_to_mismatches.append((tid, target, field_name, "target does not require this tech"))
+    
+    report.cycles = find_cycles(techs)
+    report.broken_units = [
+        (u.id, u.req_tech_id) for u in units.values()
+        if u.req_tech_id and u.req_tech_id not in techs
+    ]
+    if ttrx_path:
+        report.duplicate_ids = find_duplicate_ids(ttrx_path)
+    
+    report.elapsed_ms = (time.perf_counter() - start) * 1000
+    return report
+
+
+# =============================================================================
+# EXPORTS
+# =============================================================================
+
+EXPORT_PROGRESS_EVERY = 2000  # Rows between progress callbacks
+EXPORT_BUFFER = 1 << 16
+
+
+class ExportCancelled(Exception):
+    """Raised by an export once its cancelled() predicate turns true"""
+
+
+@contextmanager
+def open_export(path: str, newline: Optional[str] = None) -> Iterator:
+    """Buffered text handle for an export; paths ending in .gz are gzip-compressed.
+    
+    If the export fails or is cancelled the partial file is removed.
+    """
+    if str(path).lower().endswith('.gz'):
+        import gzip  # deferred: only needed for compressed exports
+        f = gzip.open(path, 'wt', encoding='utf-8', newline=newline, compresslevel=6)
+    else:
+        f = open(path, 'w', encoding='utf-8', newline=newline, buffering=EXPORT_BUFFER)
+    try:
+        with f:
+            yield f
+    except BaseException:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+
+
+def _tracked(items: list, progress: Optional[Callable[[int, int], None]],
+             cancelled: Callable[[], bool] = lambda: False) -> Iterator:
+    """Iterate items, reporting (done, total) every EXPORT_PROGRESS_EVERY rows and at the end;
+    raises ExportCancelled as soon as cancelled() is true"""
+    total = len(items)
+    for done, item in enumerate(items, 1):
+        if cancelled():
+            raise ExportCancelled()
+        yield item
+        if progress and (done % EXPORT_PROGRESS_EVERY == 0 or done == total):
+            progress(done, total)
+
+
+def export_techs_csv(techs: Dict[int, TechData], path: str,
+                     progress: Optional[Callable[[int, int], None]] = None,
+                     cancelled: Callable[[], bool] = lambda: False):
+    """Flat tech list, one row per tech, written as it goes"""
+    import csv  # deferred
+    with open_export(path, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'Name', 'Category', 'Level', 'Cost', 'Time', 'Prereq1', 'Prereq2', 'Effects', 'Units'])
+        
+        for tech in _tracked(sorted(techs.values(), key=lambda t: t.id), progress, cancelled):
+            cat = CATEGORIES.get(tech.category, {'name': '?'})
+            effects_str = "; ".join(f"{eid}:{val}" for eid, val in tech.effects)
+            units_str = "; ".join(u.name for u in tech.unlocks_units)
+            
+            writer.writerow([
+                tech.id, tech.short_title, cat['name'], tech.tech_level,
+                tech.cost, tech.time_to_research, tech.prereq_1, tech.prereq_2,
+                effects_str, units_str
+            ])
+
+
+def export_techs_json(techs: Dict[int, TechData], units: Dict[int, UnitData], path: str,
+                      progress: Optional[Callable[[int, int], None]] = None,
+                      cancelled: Callable[[], bool] = lambda: False):
+    """Tech report with stats, prerequisites, effects and unlocked units
+    
+    Written one tech at a time; the output is what json.dump(report, indent=2)
+    of the whole report would give, without holding that report in memory.
+    """
+    from datetime import datetime  # deferred
+    header = json.dumps({
+        'generated': datetime.now().isoformat(),
+        'stats': {
+            'total_techs': len(techs),
+            'total_units': len(units),
+            'linked_units': sum(len(t.unlocks_units) for t in techs.values()),
+        },
+    }, indent=2)
+    
+    encode = json.JSONEncoder(indent=2).encode
+    with open_export(path) as f:
+        f.write(header[:-2] + ',\n  "techs": {')  # Reopen the object after "stats"
+        sep = '\n    '
+        for tid, tech in _tracked(list(techs.items()), progress, cancelled):
+            entry = {
+                'name': tech.short_title,
+                'category': CATEGORIES.get(tech.category, {'name': '?'})['name'],
+                'level': tech.tech_level,
+                'cost': tech.cost,
+                'time': tech.time_to_research,
+                'prereqs': [p for p in [tech.prereq_1, tech.prereq_2] if p],
+                'effects': [{'id': eid, 'value': val} for eid, val in tech.effects],
+                'units': [{'id': u.id, 'name': u.name} for u in tech.unlocks_units],
+            }
+            f.write(f'{sep}"{tid}": ' + encode(entry).replace('\n', '\n    '))
+            sep = ',\n    '
+        f.write('\n  }\n}' if techs else '}\n}')
+
+
+def write_html_report(techs: Dict[int, TechData], units: Dict[int, UnitData], path: str,
+                      progress: Optional[Callable[[int, int], None]] = None,
+                      cancelled: Callable[[], bool] = lambda: False):
+    """Stream the HTML report to path, row by row"""
+    with open_export(path) as f:
+        f.writelines(_html_report_chunks(techs, units, progress, cancelled))
+
+
+def _html_report_chunks(techs: Dict[int, TechData], units: Dict[int, UnitData],
+                        progress: Optional[Callable[[int, int], None]] = None,
+                        cancelled: Callable[[], bool] = lambda: False) -> Iterator[str]:
+    """Standalone HTML report in pieces: summary stats, category breakdown, then one row per tech"""
+    from datetime import datetime  # deferred
+    yield f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Tech Tree Report</title>
+    <style>
+        body {{ font-family: 'Segoe UI', sans-serif; background: #0d1117; color: #f0f6fc; padding: 40px; }}
+        h1 {{ color: #58a6ff; border-bottom: 2px solid #30363d; padding-bottom: 10px; }}
+        h2 {{ color: #8b949e; margin-top: 30px; }}
+        table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
+        th, td {{ border: 1px solid #30363d; padding: 12px; text-align: left; }}
+        th {{ background: #161b22; color: #58a6ff; }}
+        tr:hover {{ background: #21262d; }}
+        .stat {{ display: inline-block; background: #161b22; padding: 20px; margin: 10px; border-radius: 12px; min-width: 150px; text-align: center; }}
+        .stat-value {{ font-size: 32px; font-weight: bold; color: #58a6ff; }}
+        .stat-label {{ color: #8b949e; font-size: 14px; }}
+        .cat-1 {{ color: #f85149; }} .cat-2 {{ color: #58a6ff; }} .cat-3 {{ color: #3fb950; }}
+        .cat-4 {{ color: #d29922; }} .cat-5 {{ color: #a371f7; }} .cat-6 {{ color: #db61a2; }}
+    </style>
+</head>
+<body>
+    <h1>🔬 Supreme Ruler Tech Tree Report</h1>
+    <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
+    
+    <div class="stats">
+        <div class="stat"><div class="stat-value">{len(techs)}</div><div class="stat-label">Total Techs</div></div>
+        <div class="stat"><div class="stat-value">{len(units)}</div><div class="stat-label">Total Units</div></div>
+        <div class="stat"><div class="stat-value">{sum(len(t.unlocks_units) for t in techs.values())}</div><div class="stat-label">Tech-Unit Links</div></div>
+    </div>
+    
+    <h2>📊 Category Breakdown</h2>
+    <table>
+        <tr><th>Category</th><th>Count</th><th>With Units</th><th>Total Effects</th></tr>
+"""
+    
+    cat_stats = defaultdict(lambda: {'count': 0, 'with_units': 0, 'effects': 0})
+    for tech in techs.values():
+        cat_stats[tech.category]['count'] += 1
+        if tech.unlocks_units:
+            cat_stats[tech.category]['with_units'] += 1
+        cat_stats[tech.category]['effects'] += len(tech.effects)
+    
+    for cat_id, stats in sorted(cat_stats.items()):
+        cat = CATEGORIES.get(cat_id, {'name': f'Cat {cat_id}', 'icon': '?'})
+        yield f"""<tr class="cat-{cat_id}">
+                <td>{cat['icon']} {cat['name']}</td>
+                <td>{stats['count']}</td>
+                <td>{stats['with_units']}</td>
+                <td>{stats['effects']}</td>
+            </tr>"""
+    
+    yield """</table>
+    
+    <h2>📋 All Technologies</h2>
+    <table>
+        <tr><th>ID</th><th>Name</th><th>Category</th><th>Level</th><th>Cost</th><th>Time</th><th>Effects</th><th>Units</th></tr>
+"""
+    
+    for tid, tech in _tracked(sorted(techs.items()), progress, cancelled):
+        cat = CATEGORIES.get(tech.category, {'name': '?', 'icon': '?'})
+        cost = f"${tech.cost/1e6:.0f}M"
+        effects = len(tech.effects)
+        unit_count = len(tech.unlocks_units)
+        
+        yield f"""<tr>
+                <td>{tid}</td>
+                <td class="cat-{tech.category}">{tech.short_title}</td>
+                <td>{cat['icon']} {cat['name']}</td>
+                <td>{tech.tech_level}</td>
+                <td>{cost}</td>
+                <td>{tech.time_to_research}d</td>
+                <td>{effects}</td>
+                <td>{unit_count}</td>
+            </tr>"""
+    
+    yield """</table>
+</body>
+</html>"""
+
+
+def _gzip_b64_chunks(pieces: Iterator[str]) -> Iterator[str]:
+    """gzip + base64 a stream of text pieces without joining them first"""
+    import base64, zlib  # deferred: only the interactive report needs them
+    packer = zlib.compressobj(9, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    pending = b""
+    for piece in pieces:
+        pending += packer.compress(piece.encode('utf-8'))
+        cut = len(pending) - len(pending) % 3  # base64 needs 3-byte groups to stay concatenable
+        if cut >= 3 << 14:
+            yield base64.b64encode(pending[:cut]).decode('ascii')
+            pending = pending[cut:]
+    yield base64.b64encode(pending + packer.flush()).decode('ascii')
+
+
+def _json_value(v) -> str:
+    if isinstance(v, str):
+        return json.dumps(v)
+    if isinstance(v, float) and not math.isfinite(v):
+        return "null"  # inf/nan (e.g. an "inf" TTRX cost) are not JSON and would break the whole decode
+    return repr(v)
+
+
+def _json_columns(columns: List[Tuple[str, list]], batch: int = 4096) -> Iterator[str]:
+    """A JSON object of parallel arrays, emitted a batch of values at a time"""
+    yield "{"
+    for i, (name, values) in enumerate(columns):
+        yield f'{"," if i else ""}"{name}":['
+        for start in range(0, len(values), batch):
+            chunk = ",".join(_json_value(v) for v in values[start:start + batch])
+            yield ("," if start else "") + chunk
+        yield "]"
+    yield "}"
+
+
+TREE_NODE_SIZE = (SugiyamaLayoutEngine.NODE_WIDTH, SugiyamaLayoutEngine.NODE_HEIGHT)  # Same boxes as the view
+# The viewer's dark theme, for renderers that cannot import the GUI palette
+DRAWING_COLORS = {'background': '#0d1117', 'node': '#161b22', 'border': '#30363d', 'edge': '#30363d',
+                  'title': '#f0f6fc', 'info': '#6e7681', 'detail': '#8b949e', 'effects': '#d29922'}
+
+
+def layout_positions(techs: Dict[int, TechData],
+                     positions: Optional[Dict[int, Tuple[float, float]]] = None) -> Dict[int, Tuple[float, float]]:
+    """Top-left node positions for every tech: the given ones if complete, else a hierarchical layout"""
+    if positions is not None and all(tid in positions for tid in techs):
+        return positions
+    layout = SugiyamaLayoutEngine(use_tech_level_as_layer=True).compute(techs)
+    return {tid: (p.x, p.y) for tid, p in layout.positions.items()}
+
+
+def tree_drawing(techs: Dict[int, TechData], positions: Dict[int, Tuple[float, float]],
+                 margin: float = 50.0) -> TreeDrawing:
+    """Node boxes, their labels and prerequisite edges, with the labels the view shows"""
+    drawing = TreeDrawing()
+    w, h = TREE_NODE_SIZE
+    for tid, tech in techs.items():
+        x, y = positions[tid]
+        title = tech.short_title[:22] + "…" if len(tech.short_title) > 22 else tech.short_title
+        cost = f"${tech.cost/1e9:.1f}B" if tech.cost >= 1e9 else f"${tech.cost/1e6:.0f}M"
+        cat = CATEGORIES.get(tech.category, {'color': '#888888', 'icon': '?'})
+        drawing.nodes[tid] = (x, y, cat['color'], cat['icon'], title,
+                              f"ID: {tech.id}  •  Lvl {tech.tech_level}", f"{cost}  •  {tech.time_to_research}d",
+                              len(tech.unlocks_units), bool(tech.effects))
+        for prereq in (tech.prereq_1, tech.prereq_2):
+            if prereq and prereq in positions and prereq != tid:
+                px, py = positions[prereq]
+                drawing.edges.append((px + w, py + h / 2, x, y + h / 2))
+    
+    if drawing.nodes:
+        xs = [n[0] for n in drawing.nodes.values()]
+        ys = [n[1] for n in drawing.nodes.values()]
+        x0, y0 = min(xs) - margin, min(ys) - margin
+        drawing.bounds = (x0, y0, max(xs) + w + margin - x0, max(ys) + h + margin - y0)
+    return drawing
+
+
+def write_svg(techs: Dict[int, TechData], path: str,
+              positions: Optional[Dict[int, Tuple[float, float]]] = None,
+              progress: Optional[Callable[[int, int], None]] = None,
+              cancelled: Callable[[], bool] = lambda: False):
+    """The whole laid-out tree as one SVG, streamed element by element (.gz paths give svgz)"""
+    from html import escape  # deferred: only the SVG export needs it
+    drawing = tree_drawing(techs, layout_positions(techs, positions))
+    x0, y0, width, height = drawing.bounds
+    w, h = TREE_NODE_SIZE
+    c = DRAWING_COLORS
+    
+    with open_export(path) as f:
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{x0:.0f} {y0:.0f} {width:.0f} {height:.0f}" '
+                f'width="{width:.0f}" height="{height:.0f}">\n'
+                f'<style>text {{ font-family: "Segoe UI", sans-serif; }} '
+                f'.t {{ font-size: 13px; font-weight: bold; fill: {c["title"]}; }} '
+                f'.i {{ font-size: 11px; fill: {c["info"]}; }} .d {{ font-size: 11px; fill: {c["detail"]}; }}</style>\n'
+                f'<rect x="{x0:.0f}" y="{y0:.0f}" width="{width:.0f}" height="{height:.0f}" fill="{c["background"]}"/>\n'
+                f'<g fill="none" stroke="{c["edge"]}" stroke-width="1.5" stroke-opacity="0.8">\n')
+        for x1, y1, x2, y2 in drawing.edges:
+            ctrl = min(abs(x2 - x1) * 0.4, 60)
+            f.write(f'<path d="M{x1:.0f} {y1:.0f}C{x1 + ctrl:.0f} {y1:.0f} {x2 - ctrl:.0f} {y2:.0f} {x2:.0f} {y2:.0f}"/>\n')
+        f.write('</g>\n')
+        
+        for tid in _tracked(sorted(drawing.nodes), progress, cancelled):
+            x, y, color, icon, title, info, detail, units, effects = drawing.nodes[tid]
+            f.write(f'<g transform="translate({x:.0f},{y:.0f})"><title>{escape(techs[tid].short_title)}</title>'
+                    f'<rect width="{w}" height="{h}" rx="8" fill="{c["node"]}" stroke="{c["border"]}"/>'
+                    f'<rect width="4" height="{h}" rx="2" fill="{color}"/>'
+                    f'<text x="25" y="24" font-size="16" text-anchor="middle">{icon}</text>'
+                    f'<text class="t" x="38" y="23">{escape(title)}</text>'
+                    f'<text class="i" x="38" y="38">{escape(info)}</text>'
+                    f'<text class="d" x="38" y="56">{escape(detail)}</text>')
+            if units:
+                f.write(f'<rect x="{w - 35}" y="45" width="28" height="18" rx="4" fill="{color}" opacity="0.8"/>'
+                        f'<text x="{w - 21}" y="58" font-size="11" font-weight="bold" fill="white" '
+                        f'text-anchor="middle">{units}</text>')
+            if effects:
+                f.write(f'<text x="{w - 15}" y="21" font-size="13" fill="{c["effects"]}" text-anchor="middle">⚡</text>')
+            f.write('</g>\n')
+        f.write('</svg>\n')
+
+
+def write_interactive_report(techs: Dict[int, TechData], path: str,
+                             positions: Optional[Dict[int, Tuple[float, float]]] = None,
+                             progress: Optional[Callable[[int, int], None]] = None,
+                             cancelled: Callable[[], bool] = lambda: False):
+    """Self-contained HTML page that browses the whole tree offline on a canvas
+    
+    The graph travels as two gzip+base64 blocks of parallel arrays: geometry
+    (ids, prerequisite indices, levels, categories, positions), decoded on
+    load, and details (titles, costs, chain costs, times), decoded the first
+    time a label, tooltip or search needs them. Both are streamed to disk.
+    positions defaults to a hierarchical layout of every tech.
+    """
+    from datetime import datetime  # deferred
+    positions = layout_positions(techs, positions)
+    order = sorted(techs)
+    index = {tid: i for i, tid in enumerate(order)}
+    chain_costs = ReachabilityIndex(techs).chain_costs(techs)
+    
+    geometry = [
+        ('id', order),
+        ('p1', [index.get(techs[tid].prereq_1, -1) for tid in order]),
+        ('p2', [index.get(techs[tid].prereq_2, -1) for tid in order]),
+        ('lv', [techs[tid].tech_level for tid in order]),
+        ('cat', [techs[tid].category for tid in order]),
+        ('x', [round(positions[tid][0]) for tid in order]),
+        ('y', [round(positions[tid][1]) for tid in order]),
+    ]
+    details = [
+        ('title', [techs[tid].short_title for tid in order]),
+        ('cost', [round(techs[tid].cost / 1e6, 1) for tid in order]),
+        ('chain', [round(chain_costs.get(tid, techs[tid].cost) / 1e6, 1) for tid in order]),
+        ('days', [techs[tid].time_to_research for tid in order]),
+        ('units', [len(techs[tid].unlocks_units) for tid in order]),
+    ]
+    categories = {cid: {'name': c['name'], 'color': c['color']} for cid, c in CATEGORIES.items()}
+    
+    page = (INTERACTIVE_REPORT_TEMPLATE
+            .replace("__TITLE__", f"Tech Tree - {len(techs)} techs")
+            .replace("__GENERATED__", datetime.now().strftime('%Y-%m-%d %H:%M'))
+            .replace("__CATEGORIES__", json.dumps(categories))
+            .replace("__NODE_SIZE__", json.dumps(list(TREE_NODE_SIZE))))
+    head, tail = page.split("__PAYLOAD__")
+    with open_export(path) as f:
+        f.write(head)
+        for step, (block_id, columns) in enumerate((("graph", geometry), ("details", details)), 1):
+            if cancelled():
+                raise ExportCancelled()
+            f.write(f'<script type="application/octet-stream" id="{block_id}">')
+            f.writelines(_gzip_b64_chunks(_json_columns(columns)))
+            f.write('</script>\n')
+            if progress:
+                progress(step, 2)
+        f.write(tail)
+
+
+# Canvas viewer for write_interactive_report; placeholders are filled by plain replace()
+INTERACTIVE_REPORT_TEMPLATE = r"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<title>__TITLE__</title>
+<style>
+    html, body { margin: 0; height: 100%; overflow: hidden; background: #0d1117; color: #f0f6fc; font-family: 'Segoe UI', sans-serif; }
+    #bar { position: fixed; top: 0; left: 0; right: 0; height: 44px; display: flex; align-items: center; gap: 14px; padding: 0 14px;
+           background: #161b22; border-bottom: 1px solid #30363d; z-index: 2; }
+    #bar input { background: #0d1117; color: #f0f6fc; border: 1px solid #30363d; border-radius: 6px; padding: 6px 10px; width: 260px; }
+    #legend span { margin-right: 10px; font-size: 12px; }
+    #status { margin-left: auto; color: #8b949e; font-size: 12px; }
+    #view { position: absolute; top: 44px; left: 0; cursor: grab; }
+    #tip { position: fixed; display: none; pointer-events: none; max-width: 360px; background: #161b22; border: 1px solid #30363d;
+           border-radius: 8px; padding: 8px 10px; font-size: 12px; line-height: 1.5; z-index: 3; }
+</style>
+</head>
+<body>
+<div id="bar"><b>🔬 Tech Tree</b><input id="search" placeholder="Search name or ID, Enter for next match"><div id="legend"></div><div id="status">Decoding...</div></div>
+<canvas id="view"></canvas>
+<div id="tip"></div>
+__PAYLOAD__
+<script>
+const CATEGORIES = __CATEGORIES__;
+const [NODE_W, NODE_H] = __NODE_SIZE__;
+const BAR = 44, CELL = 512;
+
+const canvas = document.getElementById('view'), ctx = canvas.getContext('2d');
+const tip = document.getElementById('tip'), statusLine = document.getElementById('status');
+let G = null, D = null, pendingDetails = null;
+let scale = 1, tx = 0, ty = 0, hover = -1, selected = -1, chain = null, frame = 0, lastMatch = -1;
+const grid = new Map();
+
+async function unpack(id) {
+    const raw = atob(document.getElementById(id).textContent);
+    const bytes = new Uint8Array(raw.length);
+    for (let i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+    return JSON.parse(await new Response(stream).text());
+}
+
+// Titles and costs are only decoded once a label, tooltip or search needs them
+function details() {
+    if (!pendingDetails) pendingDetails = unpack('details').then(d => { D = d; draw(); return d; });
+    return pendingDetails;
+}
+
+const esc = s => String(s).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+const category = i => CATEGORIES[G.cat[i]] || {name: '?', color: '#8b949e'};
+
+function buildGrid() {
+    for (let i = 0; i < G.id.length; i++) {
+        const key = Math.floor(G.x[i] / CELL) + ',' + Math.floor(G.y[i] / CELL);
+        if (!grid.has(key)) grid.set(key, []);
+        grid.get(key).push(i);
+    }
+}
+
+function pick(mx, my) {
+    const wx = (mx - tx) / scale, wy = (my - ty) / scale;
+    const cx = Math.floor(wx / CELL), cy = Math.floor(wy / CELL);
+    for (let gx = cx - 1; gx <= cx; gx++) for (let gy = cy - 1; gy <= cy; gy++) {
+        for (const i of grid.get(gx + ',' + gy) || []) {
+            if (wx >= G.x[i] && wx <= G.x[i] + NODE_W && wy >= G.y[i] && wy <= G.y[i] + NODE_H) return i;
+        }
+    }
+    return -1;
+}
+
+function ancestors(i) {
+    const seen = new Set([i]), stack = [i];
+    while (stack.length) {
+        const k = stack.pop();
+        for (const p of [G.p1[k], G.p2[k]]) if (p >= 0 && !seen.has(p)) { seen.add(p); stack.push(p); }
+    }
+    return seen;
+}
+
+function fit() {
+    let x0 = Infinity, y0 = Infinity, x1 = -Infinity, y1 = -Infinity;
+    for (let i = 0; i < G.id.length; i++) {
+        x0 = Math.min(x0, G.x[i]); y0 = Math.min(y0, G.y[i]);
+        x1 = Math.max(x1, G.x[i] + NODE_W); y1 = Math.max(y1, G.y[i] + NODE_H);
+    }
+    const w = innerWidth, h = innerHeight - BAR;
+    scale = 0.95 * Math.min(w / Math.max(1, x1 - x0), h / Math.max(1, y1 - y0));
+    tx = (w - (x1 - x0) * scale) / 2 - x0 * scale;
+    ty = (h - (y1 - y0) * scale) / 2 - y0 * scale;
+}
+
+function resize() {
+    canvas.width = innerWidth * devicePixelRatio;
+    canvas.height = (innerHeight - BAR) * devicePixelRatio;
+    canvas.style.width = innerWidth + 'px';
+    canvas.style.height = (innerHeight - BAR) + 'px';
+    draw();
+}
+
+function draw() { if (!frame) frame = requestAnimationFrame(render); }
+
+function render() {
+    frame = 0;
+    if (!G) return;
+    const dpr = devicePixelRatio, X = G.x, Y = G.y;
+    ctx.setTransform(1, 0, 0, 1, 0, 0);
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    ctx.setTransform(scale * dpr, 0, 0, scale * dpr, tx * dpr, ty * dpr);
+
+    const x0 = -tx / scale - NODE_W, y0 = -ty / scale - NODE_H;
+    const x1 = (innerWidth - tx) / scale, y1 = (innerHeight - BAR - ty) / scale;
+    const visible = [];
+    for (let i = 0; i < X.length; i++) if (X[i] >= x0 && X[i] <= x1 && Y[i] >= y0 && Y[i] <= y1) visible.push(i);
+
+    const edge = (p, i) => { ctx.moveTo(X[p] + NODE_W, Y[p] + NODE_H / 2); ctx.lineTo(X[i], Y[i] + NODE_H / 2); };
+    if (visible.length < 6000) {
+        ctx.strokeStyle = 'rgba(139, 148, 158, 0.25)';
+        ctx.lineWidth = 1 / scale;
+        ctx.beginPath();
+        for (const i of visible) for (const p of [G.p1[i], G.p2[i]]) if (p >= 0) edge(p, i);
+        ctx.stroke();
+    }
+    if (chain) {
+        ctx.strokeStyle = '#58a6ff';
+        ctx.lineWidth = 2.5 / scale;
+        ctx.beginPath();
+        for (const i of chain) for (const p of [G.p1[i], G.p2[i]]) if (p >= 0 && chain.has(p)) edge(p, i);
+        ctx.stroke();
+    }
+
+    const labels = scale > 0.3;
+    if (labels && !D) details();
+    for (const i of visible) {
+        const color = category(i).color;
+        ctx.globalAlpha = chain && !chain.has(i) ? 0.2 : 1;
+        if (scale < 0.08) {
+            ctx.fillStyle = color;
+            ctx.fillRect(X[i], Y[i], NODE_W, NODE_H);
+            continue;
+        }
+        ctx.fillStyle = '#161b22';
+        ctx.fillRect(X[i], Y[i], NODE_W, NODE_H);
+        ctx.strokeStyle = i === selected ? '#f0f6fc' : color;
+        ctx.lineWidth = (i === hover || i === selected ? 3 : 1.5) / scale;
+        ctx.strokeRect(X[i], Y[i], NODE_W, NODE_H);
+        ctx.fillStyle = color;
+        ctx.fillRect(X[i], Y[i], 6, NODE_H);
+        if (labels && D) {
+            const title = D.title[i];
+            ctx.fillStyle = '#f0f6fc';
+            ctx.font = 'bold 15px Segoe UI, sans-serif';
+            ctx.fillText(title.length > 22 ? title.slice(0, 21) + '…' : title, X[i] + 14, Y[i] + 28);
+            ctx.fillStyle = '#8b949e';
+            ctx.font = '13px Segoe UI, sans-serif';
+            ctx.fillText(`L${G.lv[i]} · $${D.cost[i] ?? '?'}M · ${D.days[i]}d`, X[i] + 14, Y[i] + 52);
+        }
+    }
+    ctx.globalAlpha = 1;
+    statusLine.textContent = `${X.length} techs · ${visible.length} in view · zoom ${(scale * 100).toFixed(0)}% · generated __GENERATED__`;
+}
+
+async function showTip(i, cx, cy) {
+    const d = await details();
+    if (hover !== i) return;
+    const prereqs = [G.p1[i], G.p2[i]].filter(p => p >= 0).map(p => `${esc(d.title[p])} (${G.id[p]})`);
+    tip.innerHTML = `<b>${esc(d.title[i])}</b> (ID ${G.id[i]})<br>${esc(category(i).name)} · Level ${G.lv[i]}<br>` +
+        `Cost $${d.cost[i] ?? '?'}M · ${d.days[i]} days<br>Chain cost $${d.chain[i] ?? '?'}M<br>Units unlocked: ${d.units[i]}` +
+        (prereqs.length ? `<br>Requires: ${prereqs.join(', ')}` : '');
+    tip.style.left = Math.min(cx + 16, innerWidth - 380) + 'px';
+    tip.style.top = (cy + 16) + 'px';
+    tip.style.display = 'block';
+}
+
+function select(i) {
+    selected = i;
+    chain = i >= 0 ? ancestors(i) : null;
+    draw();
+}
+
+function focusOn(i) {
+    scale = Math.max(scale, 0.6);
+    tx = innerWidth / 2 - (G.x[i] + NODE_W / 2) * scale;
+    ty = (innerHeight - BAR) / 2 - (G.y[i] + NODE_H / 2) * scale;
+    select(i);
+}
+
+let drag = null;
+canvas.addEventListener('mousedown', e => { drag = {x: e.clientX, y: e.clientY, tx, ty, moved: false}; canvas.style.cursor = 'grabbing'; });
+addEventListener('mouseup', e => {
+    if (drag && !drag.moved && G) select(pick(e.clientX, e.clientY - BAR));
+    drag = null;
+    canvas.style.cursor = 'grab';
+});
+addEventListener('mousemove', e => {
+    if (!G) return;
+    if (drag) {
+        drag.moved = drag.moved || Math.abs(e.clientX - drag.x) + Math.abs(e.clientY - drag.y) > 4;
+        tx = drag.tx + e.clientX - drag.x;
+        ty = drag.ty + e.clientY - drag.y;
+        tip.style.display = 'none';
+        draw();
+        return;
+    }
+    const i = e.target === canvas ? pick(e.clientX, e.clientY - BAR) : -1;
+    if (i !== hover) { hover = i; draw(); }
+    if (i >= 0) showTip(i, e.clientX, e.clientY); else tip.style.display = 'none';
+});
+canvas.addEventListener('wheel', e => {
+    e.preventDefault();
+    const k = Math.exp(-e.deltaY * 0.0015), mx = e.clientX, my = e.clientY - BAR;
+    tx = mx - (mx - tx) * k;
+    ty = my - (my - ty) * k;
+    scale *= k;
+    draw();
+}, {passive: false});
+document.getElementById('search').addEventListener('keydown', async e => {
+    if (e.key !== 'Enter' || !G) return;
+    const q = e.target.value.trim().toLowerCase(), d = await details(), n = G.id.length;
+    if (!q) return select(-1);
+    for (let step = 1; step <= n; step++) {
+        const i = (lastMatch + step) % n;
+        if (String(G.id[i]) === q || d.title[i].toLowerCase().includes(q)) { lastMatch = i; return focusOn(i); }
+    }
+    statusLine.textContent = `No match for "${q}"`;
+});
+addEventListener('resize', resize);
+
+document.getElementById('legend').innerHTML = Object.values(CATEGORIES)
+    .map(c => `<span style="color:${c.color}">■ ${esc(c.name)}</span>`).join('');
+unpack('graph').then(g => { G = g; buildGrid(); fit(); resize(); })
+    .catch(err => { statusLine.textContent = 'Could not decode the report in this browser: ' + err; });
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,219 @@
+"""PNG tile pyramid of the whole laid-out tech tree, rendered offscreen in parallel
+
+    python tech_tree_cli.py export-tiles DEFAULT.TTRX --out-dir build --jobs 8
+
+Writes <out_dir>/{z}/{x}/{y}.png plus tiles.json. Zoom max_zoom is 1:1 with the
+viewer; each level below halves the scale, down to a single tile at zoom 0.
+Every tile is painted on its own QImage from the nodes and edges a spatial
+index returns for it, so memory follows the tile size, not the tree size.
+Tiles with nothing on them are not written; viewers should show the
+background colour from the manifest instead. Needs QtGui only (no widgets),
+and uses the offscreen platform when no display is available.
+"""
+
+import os
+import json
+import math
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tech_tree_core import (
+    TechData, TreeDrawing, SpatialGrid, TREE_NODE_SIZE, DRAWING_COLORS, ExportCancelled, layout_positions,
+    tree_drawing
+)
+
+
+TILE_SIZE = 512
+TEXT_MIN_SCALE = 0.35   # Below this labels are unreadable; draw plain boxes
+EDGE_MIN_SCALE = 0.05   # Below this edges are noise; draw the nodes only
+BLOCK_MAX_SCALE = 0.1   # Below this nodes become solid category-coloured blocks
+PNG_QUALITY = 70        # Qt maps this to a light zlib level: ~2x faster encode than the default for ~4% larger files
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+_state: dict = {}
+
+
+def _init_tile_worker(drawing: TreeDrawing, out_dir: str, tile_size: int):
+    """Per-process setup: Qt on the offscreen platform plus spatial indexes over the drawing"""
+    from PyQt5.QtGui import QGuiApplication
+    if QGuiApplication.instance() is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        _state['app'] = QGuiApplication([])
+    
+    w, h = TREE_NODE_SIZE
+    nodes, edges = SpatialGrid(tile_size), SpatialGrid(tile_size)
+    for tid, node in drawing.nodes.items():
+        nodes.insert(tid, (node[0], node[1], w, h))
+    for i, (x1, y1, x2, y2) in enumerate(drawing.edges):
+        # Control points reach at most 60px past the endpoints when an edge runs backwards
+        left, right = min(x1, x2) - 60, max(x1, x2) + 60
+        edges.insert(i, (left, min(y1, y2) - 2, right - left, abs(y2 - y1) + 4))
+    _state.update(drawing=drawing, nodes=nodes, edges=edges, out_dir=out_dir, tile_size=tile_size)
+
+
+def _render_tile(z: int, tx: int, ty: int, scale: float) -> Optional[str]:
+    """Paint one tile; returns its path, or None when the tile is empty and was skipped"""
+    from PyQt5.QtCore import Qt, QRectF, QPointF
+    from PyQt5.QtGui import QImage, QPainter, QPainterPath, QColor, QPen, QBrush, QFont
+    
+    drawing, size = _state['drawing'], _state['tile_size']
+    x0, y0 = drawing.bounds[0], drawing.bounds[1]
+    span = size / scale
+    rect = (x0 + tx * span, y0 + ty * span, span, span)
+    node_ids = sorted(_state['nodes'].query(rect))
+    edge_ids = sorted(_state['edges'].query(rect)) if scale >= EDGE_MIN_SCALE else []
+    if not node_ids and not edge_ids:
+        return None
+    
+    c = DRAWING_COLORS
+    image = QImage(size, size, QImage.Format_RGB32)
+    image.fill(QColor(c['background']))
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.TextAntialiasing)
+    painter.scale(scale, scale)
+    painter.translate(-rect[0], -rect[1])
+    
+    if edge_ids:
+        pen = QPen(QColor(c['edge']), max(1.0, 1.5 * scale))
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.setBrush(Qt.NoBrush)
+        for i in edge_ids:
+            x1, y1, x2, y2 = drawing.edges[i]
+            ctrl = min(abs(x2 - x1) * 0.4, 60)
+            path = QPainterPath(QPointF(x1, y1))
+            path.cubicTo(QPointF(x1 + ctrl, y1), QPointF(x2 - ctrl, y2), QPointF(x2, y2))
+            painter.drawPath(path)
+    
+    w, h = TREE_NODE_SIZE
+    fonts = (QFont("Segoe UI Emoji", 14), QFont("Segoe UI", 10, QFont.Bold), QFont("Segoe UI", 8),
+             QFont("Segoe UI", 9, QFont.Bold), QFont("Segoe UI Emoji", 10))
+    for tid in node_ids:
+        x, y, color, icon, title, info, detail, units, effects = drawing.nodes[tid]
+        cat_color = QColor(color)
+        if scale < BLOCK_MAX_SCALE:
+            painter.fillRect(QRectF(x, y, w, h), cat_color)
+            continue
+        
+        painter.save()
+        painter.translate(x, y)
+        painter.setPen(QPen(QColor(c['border']), 1))
+        painter.setBrush(QBrush(QColor(c['node'])))
+        painter.drawRoundedRect(QRectF(0, 0, w, h), 8, 8)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QBrush(cat_color))
+        painter.drawRoundedRect(QRectF(0, 0, 4, h), 2, 2)
+        
+        if scale >= TEXT_MIN_SCALE:
+            painter.setFont(fonts[0])
+            painter.setPen(QColor(c['title']))
+            painter.drawText(QRectF(10, 6, 30, 24), Qt.AlignCenter, icon)
+            painter.setFont(fonts[1])
+            painter.drawText(QRectF(38, 8, w - 50, 20), Qt.AlignLeft | Qt.AlignVCenter, title)
+            painter.setFont(fonts[2])
+            painter.setPen(QColor(c['info']))
+            painter.drawText(QRectF(38, 26, w - 50, 16), Qt.AlignLeft | Qt.AlignVCenter, info)
+            painter.setPen(QColor(c['detail']))
+            painter.drawText(QRectF(38, 44, w - 70, 16), Qt.AlignLeft | Qt.AlignVCenter, detail)
+            if units:
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(QBrush(cat_color))
+                painter.setOpacity(0.8)
+                painter.drawRoundedRect(QRectF(w - 35, 45, 28, 18), 4, 4)
+                painter.setOpacity(1.0)
+                painter.setFont(fonts[3])
+                painter.setPen(QColor("white"))
+                painter.drawText(QRectF(w - 35, 44, 28, 18), Qt.AlignCenter, str(units))
+            if effects:
+                painter.setFont(fonts[4])
+                painter.setPen(QColor(c['effects']))
+                painter.drawText(QRectF(w - 25, 6, 20, 20), Qt.AlignCenter, "⚡")
+        painter.restore()
+    painter.end()
+    
+    path = os.path.join(_state['out_dir'], str(z), str(tx), f"{ty}.png")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not image.save(path, "PNG", PNG_QUALITY):
+        raise OSError(f"could not write {path}")
+    return path
+
+
+# =============================================================================
+# PYRAMID
+# =============================================================================
+
+def tile_grid(bounds: Tuple[float, float, float, float], tile_size: int = TILE_SIZE) -> List[Tuple[int, int, int, float]]:
+    """Every (zoom, x, y, scale) of the pyramid, coarsest level first"""
+    extent = max(bounds[2], bounds[3], 1.0)
+    max_zoom = max(0, math.ceil(math.log2(extent / tile_size)))
+    jobs = []
+    for z in range(max_zoom + 1):
+        scale = 2.0 ** (z - max_zoom)
+        cols = max(1, math.ceil(bounds[2] * scale / tile_size))
+        rows = max(1, math.ceil(bounds[3] * scale / tile_size))
+        jobs.extend((z, tx, ty, scale) for tx in range(cols) for ty in range(rows))
+    return jobs
+
+
+def export_tiles(techs: Dict[int, TechData], out_dir: str,
+                 positions: Optional[Dict[int, Tuple[float, float]]] = None,
+                 tile_size: int = TILE_SIZE, max_workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None,
+                 cancelled: Callable[[], bool] = lambda: False) -> dict:
+    """Render the tile pyramid into out_dir and return the manifest written to tiles.json
+    
+    Raises ExportCancelled once cancelled() is true; tiles already written stay,
+    but without a tiles.json.
+    """
+    drawing = tree_drawing(techs, layout_positions(techs, positions))
+    jobs = tile_grid(drawing.bounds, tile_size)
+    os.makedirs(out_dir, exist_ok=True)
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    written = 0
+    
+    def done(result, finished):
+        nonlocal written
+        written += result is not None
+        if progress and (finished % 50 == 0 or finished == len(jobs)):
+            progress(finished, len(jobs))
+        if cancelled():
+            raise ExportCancelled()
+    
+    if workers <= 1:
+        _init_tile_worker(drawing, out_dir, tile_size)
+        try:
+            for finished, job in enumerate(jobs, 1):
+                done(_render_tile(*job), finished)
+        finally:
+            for key in ('drawing', 'nodes', 'edges'):  # don't keep the tree alive in the caller's process
+                _state.pop(key, None)
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # Spawn: workers must not inherit a forked Qt; keep a few tiles queued per worker, not the whole pyramid
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_tile_worker, initargs=(drawing, out_dir, tile_size)) as pool:
+            pending, finished = deque(), 0
+            for job in jobs:
+                pending.append(pool.submit(_render_tile, *job))
+                if len(pending) >= workers * 4:
+                    finished += 1
+                    done(pending.popleft().result(), finished)
+            while pending:
+                finished += 1
+                done(pending.popleft().result(), finished)
+    
+    manifest = {
+        'format': 'png', 'path': '{z}/{x}/{y}.png', 'tile_size': tile_size,
+        'min_zoom': 0, 'max_zoom': jobs[-1][0], 'bounds': list(drawing.bounds),
+        'background': DRAWING_COLORS['background'], 'techs': len(drawing.nodes),
+        'tiles': written, 'empty_tiles_skipped': len(jobs) - written,
+    }
+    with open(os.path.join(out_dir, 'tiles.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest